@@ -0,0 +1,9 @@
+"""
+Async (ASGI) variant of the API, built on Quart and motor.
+
+It serves the same /api contract as the Flask app (see aio/app.py for what
+is and is not mounted) and shares its business rules: validation lives in
+utils/validation.py, transitions in models/transitions.py, counter and
+version updates in models/counters.py and models/versions.py. Only the
+Mongo round trips differ.
+"""
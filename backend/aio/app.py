@@ -0,0 +1,144 @@
+"""
+ASGI application: the /api contract of app.py served by Quart, with
+MongoDB reached through motor.
+
+Validation (utils.validation), state transitions (models.transitions),
+counters, ETags and sessions are shared with the WSGI app, so both can
+serve the same database side by side. Audit entries still go through the
+background audit writer thread; the admin dashboard and search run their
+sync aggregations on worker threads.
+
+Only mounted on the WSGI app:
+
+    /api/admin/export/*          CSV/NDJSON exports (streamed sync cursors)
+    /api/admin/import/returns    feed imports (parsed from a sync stream)
+    /api/events                  server-sent events
+"""
+import os
+import time
+from quart import Quart, Response, g, jsonify, request
+from pymongo.errors import PyMongoError
+import db as database
+from aio import db as async_database
+from aio.session import init_sessions
+from config import Config
+from models.audit_writer import shutdown_audit_writer
+from models.dashboard import init_dashboard_cache
+from models.user import init_user_cache
+from utils.metrics import MongoCommandMetrics, registry
+
+CORS_HEADERS = {
+    'Access-Control-Allow-Credentials': 'true',
+    'Access-Control-Allow-Headers': 'Content-Type, Authorization, If-None-Match',
+    'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
+    'Access-Control-Expose-Headers': 'Set-Cookie, X-Next-Cursor, ETag',
+    'Access-Control-Max-Age': '3600',
+}
+
+
+def _init_cors(app):
+    """Same CORS policy flask_cors applies to the WSGI app"""
+    origins = app.config['CORS_ORIGINS']
+
+    @app.after_request
+    async def _cors_headers(response):
+        origin = request.headers.get('Origin')
+        if origin and (origins == '*' or origin in origins):
+            response.headers['Access-Control-Allow-Origin'] = origin
+            response.headers['Vary'] = 'Origin'
+            response.headers.update(CORS_HEADERS)
+        return response
+
+
+def _init_metrics(app, metrics=registry):
+    """Async counterpart of utils.metrics.init_metrics"""
+
+    @app.before_request
+    async def _start_timer():
+        g.metrics_endpoint = request.endpoint or 'unmatched'
+        g.metrics_start = time.perf_counter()
+        g.metrics_status = 500
+        metrics.request_started(g.metrics_endpoint)
+
+    @app.after_request
+    async def _record_status(response):
+        g.metrics_status = response.status_code
+        return response
+
+    @app.teardown_request
+    async def _stop_timer(exc):
+        start = g.pop('metrics_start', None)
+        if start is None:
+            return
+        metrics.request_finished(
+            g.metrics_endpoint, request.method, g.metrics_status, time.perf_counter() - start)
+
+    @app.route('/api/metrics', methods=['GET'])
+    async def metrics_endpoint():
+        token = app.config.get('METRICS_TOKEN')
+        if token and request.headers.get('Authorization') != f'Bearer {token}':
+            return Response('Unauthorized\n', status=401, mimetype='text/plain')
+        return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+
+def create_async_app(config=None):
+    """
+    Build the Quart application.
+
+    Args:
+        config: Config class/object, or a dict of overrides applied on top
+                of Config (same as app.create_app)
+    """
+    app = Quart(__name__)
+    app.config.from_object(Config)
+    if isinstance(config, dict):
+        app.config.update(config)
+    elif config is not None:
+        app.config.from_object(config)
+    app.secret_key = app.config['SECRET_KEY']
+
+    _init_cors(app)
+
+    # motor for request handling; the sync client is still used by the
+    # audit writer thread
+    listeners = [MongoCommandMetrics()]
+    database.configure(app.config, listeners=listeners)
+    async_database.configure(app.config, listeners=listeners)
+    _init_metrics(app)
+
+    init_sessions(app)
+    init_user_cache(app.config)
+    init_dashboard_cache(app.config)
+
+    if app.config['INIT_DB_ON_START']:
+        print("Initializing database...")
+        database.init_db()
+
+    from aio.routes.auth import auth_bp
+    from aio.routes.returns import returns_bp
+    from aio.routes.admin import admin_bp
+
+    app.register_blueprint(auth_bp, url_prefix='/api')
+    app.register_blueprint(returns_bp, url_prefix='/api')
+    app.register_blueprint(admin_bp, url_prefix='/api')
+
+    @app.route('/api/health', methods=['GET'])
+    async def health_check():
+        body = {'status': 'ok', 'message': 'Backend is running', 'pid': os.getpid(), 'server': 'asgi'}
+        code = 200
+        try:
+            start = time.perf_counter()
+            await async_database.get_client().admin.command('ping')
+            body['mongo'] = {'ok': True, 'ping_ms': round((time.perf_counter() - start) * 1000, 2)}
+        except PyMongoError as e:
+            body['status'] = 'degraded'
+            body['mongo'] = {'ok': False, 'error': str(e)}
+            code = 503
+        return jsonify(body), code
+
+    @app.after_serving
+    async def _shutdown():
+        shutdown_audit_writer()
+        async_database.close_client()
+
+    return app
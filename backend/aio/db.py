@@ -0,0 +1,74 @@
+"""
+Async MongoDB connection (motor) for the ASGI app.
+
+Same settings and connection options as db.py. One AsyncIOMotorClient is
+created per process on first use, after the server has forked its
+workers and started their event loops.
+"""
+import os
+from motor.motor_asyncio import AsyncIOMotorClient
+from config import Config, mongo_settings
+from db import client_options
+from utils.pagination import clamp_limit, keyset_query, trim_page
+
+_settings = mongo_settings(Config)
+_client = None
+_client_pid = None
+_listeners = []
+
+
+def configure(config, listeners=None):
+    """Set connection settings for clients created from now on"""
+    global _settings, _listeners
+    _settings = mongo_settings(config)
+    if listeners is not None:
+        _listeners = list(listeners)
+    close_client()
+
+
+def get_client():
+    """Return this process's AsyncIOMotorClient, creating it on first use"""
+    global _client, _client_pid
+    if _client is None or _client_pid != os.getpid():
+        _client = AsyncIOMotorClient(_settings['url'], **client_options(_settings, _listeners))
+        _client_pid = os.getpid()
+    return _client
+
+
+def close_client():
+    global _client, _client_pid
+    if _client is not None and _client_pid == os.getpid():
+        _client.close()
+    _client = None
+    _client_pid = None
+
+
+def get_db():
+    return get_client()[_settings['db_name']]
+
+
+class _LazyDatabase:
+    """Module-level `db` handle that resolves to this process's motor database on use"""
+
+    def __getattr__(self, name):
+        return getattr(get_db(), name)
+
+    def __getitem__(self, name):
+        return get_db()[name]
+
+
+db = _LazyDatabase()
+
+
+async def paginate(collection, query, sort_field, limit=None, cursor=None, direction=-1, projection=None):
+    """utils.pagination.paginate for a motor collection"""
+    limit = clamp_limit(limit)
+    query = keyset_query(query, sort_field, cursor, direction)
+    docs = await (
+        collection
+        .find(query, projection)
+        .sort([(sort_field, direction), ('_id', direction)])
+        .limit(limit + 1)
+        .to_list(length=limit + 1)
+    )
+    return trim_page(docs, limit, sort_field, direction)
@@ -0,0 +1,57 @@
+"""
+Async counterparts of the models.audit read operations. Writing audit
+entries stays on models.audit.log_action (a non-blocking queue put).
+"""
+import asyncio
+from aio.db import db, paginate
+from aio.models.counters import read_system_stats
+from models.activity import activity_query, activity_summary, sum_counts
+from models.audit import (
+    audit_log_dict, build_audit_query, merge_archive, reaches_archive, with_current_names
+)
+from models.risk import REFRESH_STATE_ID, RISK_PROJECTION, refresh_risk_scores, risk_user
+from pymongo import DESCENDING
+
+
+async def get_audit_logs(limit=100, cursor=None, action_filter=None, actor_filter=None,
+                         start=None, end=None, order='desc'):
+    """models.audit.get_audit_logs; archived days are read on a worker thread"""
+    query = build_audit_query(action_filter, actor_filter, start, end)
+    direction = -1 if order == 'desc' else 1
+    logs, next_cursor = await paginate(
+        db.audit_logs, query, 'timestamp',
+        limit=limit, cursor=cursor, direction=direction
+    )
+    if reaches_archive(start, end):
+        logs, next_cursor = await asyncio.to_thread(
+            merge_archive, logs, next_cursor, query, limit, cursor, direction)
+
+    return [audit_log_dict(log) for log in logs], next_cursor
+
+
+async def get_user_activity_summary(user_id, days=30):
+    docs = await db.activity_daily.find(activity_query(user_id, days), {'counts': 1}).to_list(length=None)
+    risk = await db.user_risk.find_one({'user_id': user_id}, RISK_PROJECTION)
+    if risk:
+        # Current names come through the (sync) user cache, as in models.audit
+        risk = (await asyncio.to_thread(with_current_names, [risk_user(risk)]))[0]
+    return activity_summary(user_id, days, sum_counts(docs), risk)
+
+
+async def get_system_stats():
+    return await read_system_stats()
+
+
+async def get_suspicious_users(threshold=5, limit=100):
+    if not await db.counters.find_one({'_id': REFRESH_STATE_ID}):
+        # First call on an empty deployment; scoring runs on the sync driver
+        await asyncio.to_thread(refresh_risk_scores)
+
+    users = await (
+        db.user_risk
+        .find({'return_count': {'$gte': threshold}}, RISK_PROJECTION)
+        .sort('score', DESCENDING)
+        .limit(limit)
+        .to_list(length=limit)
+    )
+    return await asyncio.to_thread(with_current_names, [risk_user(u) for u in users])
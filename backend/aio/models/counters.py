@@ -0,0 +1,52 @@
+"""
+Async counterparts of models.counters / models.versions. The update
+documents come from those modules; only the round trip is awaited.
+"""
+from pymongo.errors import PyMongoError
+from aio.db import db
+from models.counters import (
+    COUNTERS_ID,
+    login_update,
+    return_created_update,
+    return_transitions_update,
+    system_stats
+)
+from models.versions import version_bumps
+
+
+async def _apply(update):
+    # As in models.counters, counters never fail the triggering request
+    try:
+        await db.counters.update_one({'_id': COUNTERS_ID}, update, upsert=True)
+    except PyMongoError as e:
+        print(f"✗ Counter update failed: {str(e)}")
+
+
+async def record_return_created(status, refund_status, created_at=None):
+    await _apply(return_created_update(status, refund_status, created_at))
+
+
+async def record_return_transitions(transitions):
+    update = return_transitions_update(transitions)
+    if update:
+        await _apply(update)
+
+
+async def record_login(at=None):
+    await _apply(login_update(at))
+
+
+async def read_system_stats(now=None):
+    return system_stats(await db.counters.find_one({'_id': COUNTERS_ID}), now)
+
+
+async def bump_return_versions(user_ids):
+    try:
+        await db.return_versions.bulk_write(version_bumps(user_ids), ordered=False)
+    except PyMongoError as e:
+        print(f"✗ Return version bump failed: {str(e)}")
+
+
+async def return_version(scope):
+    doc = await db.return_versions.find_one({'_id': scope})
+    return doc['v'] if doc else 0
@@ -0,0 +1,14 @@
+"""
+Async entry point for the faceted admin dashboard (models.dashboard).
+
+The aggregation and its DashboardCache (single-flight misses, TTL) are
+the sync ones, run on a worker thread so a cache miss never blocks the
+event loop and concurrent misses still share one computation.
+"""
+import asyncio
+from models.dashboard import get_dashboard as sync_get_dashboard
+
+
+async def get_dashboard(limit=None, cursor=None, **filters):
+    """models.dashboard.get_dashboard on a worker thread"""
+    return await asyncio.to_thread(sync_get_dashboard, limit, cursor, **filters)
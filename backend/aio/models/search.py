@@ -0,0 +1,14 @@
+"""
+Async entry point for admin search (models.search).
+
+Text ranking runs as one aggregation bounded by SEARCH_MAX_TIME_MS; it is
+run on a worker thread with the sync driver so both apps rank, page and
+time out identically.
+"""
+import asyncio
+from models.search import SEARCHES
+
+
+async def search(scope, **options):
+    """(results, next_cursor) from models.search.SEARCHES[scope], on a worker thread"""
+    return await asyncio.to_thread(SEARCHES[scope], **options)
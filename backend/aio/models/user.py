@@ -0,0 +1,168 @@
+"""
+Async counterparts of the models.user operations the API needs.
+
+Projections, document shapes and transition rules are the ones defined in
+models.user and models.transitions; these functions only replace pymongo
+round trips with awaited motor calls. Audit entries go through the same
+process-wide audit writer, whose queue never blocks the event loop unless
+AUDIT_BACKPRESSURE=block and the queue is full.
+"""
+from datetime import datetime
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument
+from aio.db import db, paginate
+from aio.models.counters import bump_return_versions, record_return_transitions
+from models.audit import log_action, log_actions
+from models.transitions import (
+    ReturnNotFound, after_transition, build_update, counter_change, get_transition,
+    parse_return_ids, plan_bulk, settle_bulk, transition_failure
+)
+from models.user import Return as SyncReturn, User as SyncUser, hydrate
+from utils.auth import get_password_pool, needs_rehash, PasswordPoolBusy, PasswordPoolTimeout
+
+
+class User:
+    @staticmethod
+    async def authenticate(username, password):
+        """
+        models.user.User.authenticate, awaiting the password pool instead
+        of blocking a thread on it. Raises PasswordPoolBusy /
+        PasswordPoolTimeout when the pool is saturated.
+        """
+        user_data = await db.users.find_one({'username': username}, SyncUser.AUTH_PROJECTION)
+        if not user_data:
+            return None
+
+        pool = get_password_pool()
+        kdf = user_data.get('password_kdf')
+        if not await pool.verify_async(password, user_data['password'], kdf):
+            return None
+
+        if needs_rehash(kdf):
+            await User._rehash(user_data, password)
+        return hydrate(SyncUser, user_data)
+
+    @staticmethod
+    async def _rehash(user_data, password):
+        try:
+            hashed, kdf = await get_password_pool().hash_async(password)
+        except (PasswordPoolBusy, PasswordPoolTimeout):
+            return
+        await db.users.update_one(
+            {'_id': user_data['_id'], 'password': user_data['password']},
+            {'$set': {'password': hashed, 'password_kdf': kdf}}
+        )
+
+    @staticmethod
+    async def find_by_id(user_id):
+        """Find user by ID (without the password hash)"""
+        user_data = await db.users.find_one({'_id': ObjectId(user_id)}, SyncUser.PUBLIC_PROJECTION)
+        if user_data:
+            return hydrate(SyncUser, user_data)
+        return None
+
+
+class Return:
+    @staticmethod
+    async def create(user_id, order_id, reason):
+        """
+        Insert a new Pending return.
+
+        Raises pymongo.errors.DuplicateKeyError when the user already has
+        an open return for the order (unique user_order_open index).
+        """
+        return_request = SyncReturn(user_id=user_id, order_id=order_id, reason=reason)
+        result = await db.returns.insert_one(return_request.document())
+        return_request._id = result.inserted_id
+        await bump_return_versions([user_id])
+        return return_request
+
+    @staticmethod
+    async def transition(return_id, action, admin_id):
+        """models.user.Return.transition: one conditional find_one_and_update"""
+        transition = get_transition(action)
+        try:
+            oid = ObjectId(return_id)
+        except (InvalidId, TypeError):
+            raise ReturnNotFound(f"Return {return_id} not found")
+
+        now = datetime.utcnow()
+        changes, update = build_update(transition, now)
+        before = await db.returns.find_one_and_update(
+            {'_id': oid, **transition['from']},
+            update,
+            projection={'reason': 0},
+            return_document=ReturnDocument.BEFORE
+        )
+
+        if before is None:
+            current = await db.returns.find_one({'_id': oid}, {'status': 1, 'refund_status': 1})
+            raise transition_failure(action, return_id, current)
+
+        await record_return_transitions([counter_change(transition, before)])
+        await bump_return_versions([before.get('user_id')])
+        log_action(
+            action=transition['audit_action'],
+            actor=admin_id,
+            details=transition['audit_details'],
+            target_user=before.get('user_id'),
+            return_id=str(oid)
+        )
+        return after_transition(transition, before, changes)
+
+    @staticmethod
+    async def bulk_transition(return_ids, action, admin_id):
+        """models.user.Return.bulk_transition: one bulk_write of conditional updates"""
+        transition = get_transition(action)
+        object_ids, results = parse_return_ids(return_ids)
+
+        current = {
+            doc['_id']: doc async for doc in db.returns.find(
+                {'_id': {'$in': list(object_ids)}},
+                {'user_id': 1, 'status': 1, 'refund_status': 1}
+            )
+        }
+
+        now = datetime.utcnow()
+        _, update = build_update(transition, now)
+        candidates, operations = plan_bulk(transition, object_ids, current, update, results)
+
+        applied = set()
+        if operations:
+            outcome = await db.returns.bulk_write(operations, ordered=False)
+            if outcome.modified_count == len(operations):
+                applied = set(candidates)
+            else:
+                applied = {doc['_id'] async for doc in db.returns.find(
+                    {'_id': {'$in': candidates}, 'updated_at': now, **transition['to']},
+                    {'_id': 1}
+                )}
+
+        audit_entries, counter_changes, user_ids = settle_bulk(
+            transition, object_ids, candidates, applied, current, admin_id, now, results)
+        log_actions(audit_entries)
+        await record_return_transitions(counter_changes)
+        if user_ids:
+            await bump_return_versions(user_ids)
+        return results
+
+    @staticmethod
+    async def find_page(query, limit=None, cursor=None, view='full', raw=True):
+        """One page of serialized returns, newest first (always the raw path)"""
+        projection = SyncReturn.projection(view)
+        docs, next_cursor = await paginate(
+            db.returns, query, 'created_at',
+            limit=limit, cursor=cursor, projection=projection
+        )
+        return SyncReturn.serialize_page(docs, projection), next_cursor
+
+    @staticmethod
+    async def find_by_user(user_id, limit=None, cursor=None, view='full', raw=True, **filters):
+        query = SyncReturn.build_query(user_id=user_id, **filters)
+        return await Return.find_page(query, limit=limit, cursor=cursor, view=view)
+
+    @staticmethod
+    async def find_all(limit=None, cursor=None, view='full', raw=True, **filters):
+        query = SyncReturn.build_query(**filters)
+        return await Return.find_page(query, limit=limit, cursor=cursor, view=view)
@@ -0,0 +1,137 @@
+from quart import Blueprint, request, jsonify, session
+from bson.errors import InvalidId
+from aio.models.audit import (
+    get_audit_logs,
+    get_system_stats,
+    get_suspicious_users,
+    get_user_activity_summary
+)
+from aio.models.dashboard import get_dashboard
+from aio.models.search import search as run_search
+from aio.session import get_session_store
+from models.audit import log_action
+from models.audit_writer import get_audit_writer
+from models.dashboard import get_dashboard_cache
+from models.search import SearchTimeout
+from models.user import get_user_cache
+from utils.auth import get_password_pool
+from utils.validation import audit_log_options, dashboard_options, search_options, suspicious_options
+
+admin_bp = Blueprint('admin', __name__)
+
+
+def require_admin():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+    if session.get('role') != 'admin':
+        return jsonify({'error': 'Admin access required'}), 403
+    return None
+
+
+@admin_bp.route('/admin/audit-logs', methods=['GET'])
+async def get_audit():
+    auth_error = require_admin()
+    if auth_error:
+        return auth_error
+
+    try:
+        logs, next_cursor = await get_audit_logs(**audit_log_options(request.args))
+        response = jsonify(logs)
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response, 200
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@admin_bp.route('/admin/dashboard', methods=['GET'])
+async def dashboard():
+    auth_error = require_admin()
+    if auth_error:
+        return auth_error
+
+    try:
+        data = await get_dashboard(**dashboard_options(request.args))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    response = jsonify(data)
+    if data['next_cursor']:
+        response.headers['X-Next-Cursor'] = data['next_cursor']
+    return response, 200
+
+
+@admin_bp.route('/admin/search', methods=['GET'])
+async def search():
+    auth_error = require_admin()
+    if auth_error:
+        return auth_error
+
+    try:
+        scope, options = search_options(request.args)
+        results, next_cursor = await run_search(scope, **options)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except SearchTimeout as e:
+        return jsonify({'error': str(e)}), 503
+
+    response = jsonify(results)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response, 200
+
+
+@admin_bp.route('/admin/stats', methods=['GET'])
+async def get_stats():
+    auth_error = require_admin()
+    if auth_error:
+        return auth_error
+    stats = await get_system_stats()
+    stats['audit_pipeline'] = get_audit_writer().stats()
+    stats['password_pool'] = get_password_pool().stats()
+    stats['session_cache'] = get_session_store().stats()
+    stats['user_cache'] = get_user_cache().stats()
+    stats['dashboard_cache'] = get_dashboard_cache().stats()
+    return jsonify(stats), 200
+
+
+@admin_bp.route('/admin/suspicious-users', methods=['GET'])
+async def get_suspicious():
+    auth_error = require_admin()
+    if auth_error:
+        return auth_error
+    threshold, limit = suspicious_options(request.args)
+    return jsonify(await get_suspicious_users(threshold, limit)), 200
+
+
+@admin_bp.route('/admin/users/<user_id>/revoke-sessions', methods=['POST'])
+async def revoke_sessions(user_id):
+    auth_error = require_admin()
+    if auth_error:
+        return auth_error
+
+    try:
+        if not await get_session_store().revoke_user(user_id):
+            return jsonify({'error': 'User not found'}), 404
+    except InvalidId:
+        return jsonify({'error': 'Invalid user id'}), 400
+
+    log_action(
+        action='SESSIONS_REVOKED',
+        actor=session['user_id'],
+        details=f'Revoked all sessions for user {user_id}',
+        target_user=user_id
+    )
+    return jsonify({'message': 'Sessions revoked'}), 200
+
+
+@admin_bp.route('/admin/user-activity/<user_id>', methods=['GET'])
+async def get_user_activity(user_id):
+    auth_error = require_admin()
+    if auth_error:
+        return auth_error
+    days = int(request.args.get('days', 30))
+    return jsonify(await get_user_activity_summary(user_id, days)), 200
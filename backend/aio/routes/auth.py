@@ -0,0 +1,91 @@
+from quart import Blueprint, request, jsonify, session
+from aio.models.counters import record_login
+from aio.models.user import User
+from models.audit import log_action
+from utils.auth import PasswordPoolBusy, PasswordPoolTimeout
+
+auth_bp = Blueprint('auth', __name__)
+
+
+@auth_bp.route('/login', methods=['POST', 'OPTIONS'])
+async def login():
+    if request.method == 'OPTIONS':
+        return '', 204
+
+    try:
+        data = await request.get_json()
+        username = data.get('username')
+
+        try:
+            user = await User.authenticate(username, data['password'])
+        except (PasswordPoolBusy, PasswordPoolTimeout) as e:
+            return jsonify({'error': str(e)}), 503, {'Retry-After': '1'}
+
+        if user:
+            session.permanent = True
+            session['user_id'] = str(user._id)
+            session['username'] = user.username
+            session['role'] = user.role
+
+            log_action(
+                action='LOGIN_SUCCESS',
+                actor=str(user._id),
+                details=f'User {username} logged in successfully'
+            )
+            await record_login()
+
+            return jsonify({
+                'user': {
+                    '_id': str(user._id),
+                    'username': user.username,
+                    'name': user.name,
+                    'role': user.role
+                }
+            }), 200
+
+        log_action(
+            action='LOGIN_FAILED',
+            actor=username or 'unknown',
+            details=f'Failed login attempt for username: {username}'
+        )
+        return jsonify({'error': 'Invalid credentials'}), 401
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
+
+@auth_bp.route('/logout', methods=['POST', 'OPTIONS'])
+async def logout():
+    if request.method == 'OPTIONS':
+        return '', 204
+
+    user_id = session.get('user_id')
+    if user_id:
+        log_action(
+            action='LOGOUT',
+            actor=user_id,
+            details=f"User {session.get('username')} logged out"
+        )
+    session.clear()
+    return jsonify({'message': 'Logged out successfully'}), 200
+
+
+@auth_bp.route('/check-session', methods=['GET', 'OPTIONS'])
+async def check_session():
+    if request.method == 'OPTIONS':
+        return '', 204
+
+    if 'user_id' in session:
+        user = await User.find_by_id(session['user_id'])
+        return jsonify({
+            'logged_in': True,
+            'user': {
+                'user_id': session['user_id'],
+                'username': user.username if user else session.get('username'),
+                'name': user.name if user else None,
+                'role': session.get('role')
+            }
+        }), 200
+    return jsonify({'logged_in': False}), 200
@@ -0,0 +1,171 @@
+from quart import Blueprint, current_app, request, jsonify, session
+from pymongo.errors import DuplicateKeyError
+from aio.models.counters import record_return_created, return_version
+from aio.models.user import Return
+from models.audit import log_action
+from models.transitions import TRANSITIONS, InvalidTransition, ReturnNotFound
+from models.versions import GLOBAL_SCOPE
+from utils.validation import bulk_request, list_options, listing_etag, return_submission
+import traceback
+
+returns_bp = Blueprint('returns', __name__)
+
+# ================= SUBMIT RETURN =================
+
+@returns_bp.route('/returns', methods=['POST'])
+async def submit_return():
+    try:
+        if 'user_id' not in session:
+            return jsonify({'error': 'Unauthorized'}), 401
+
+        try:
+            order_id, reason = return_submission(await request.get_json())
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        try:
+            return_request = await Return.create(session['user_id'], order_id, reason)
+        except DuplicateKeyError:
+            return jsonify({'error': f"A return request for order {order_id} already exists"}), 409
+        await record_return_created(
+            return_request.status,
+            return_request.refund_status,
+            return_request.created_at
+        )
+
+        log_action(
+            action="RETURN_CREATED",
+            actor=session['user_id'],
+            details=f"Return created for order {order_id}",
+            return_id=str(return_request._id)
+        )
+
+        return jsonify({'message': 'Return submitted'}), 201
+
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
+
+# ================= LISTING HELPERS =================
+
+async def _listing_etag(scope):
+    return listing_etag(scope, await return_version(scope), request.query_string)
+
+
+def _not_modified(etag):
+    response = current_app.response_class('', status=304)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def _page_response(returns, next_cursor, etag):
+    response = jsonify(returns)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response, 200
+
+
+# ================= LISTINGS =================
+
+@returns_bp.route('/returns/my', methods=['GET'])
+async def get_my_returns():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    etag = await _listing_etag(session['user_id'])
+    if request.if_none_match.contains(etag):
+        return _not_modified(etag)
+
+    try:
+        returns, next_cursor = await Return.find_by_user(session['user_id'], **list_options(request.args))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return _page_response(returns, next_cursor, etag)
+
+
+@returns_bp.route('/returns/all', methods=['GET'])
+async def get_all_returns():
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return jsonify({'error': 'Admin only'}), 403
+
+    etag = await _listing_etag(GLOBAL_SCOPE)
+    if request.if_none_match.contains(etag):
+        return _not_modified(etag)
+
+    try:
+        returns, next_cursor = await Return.find_all(
+            user_id=request.args.get('user_id'),
+            **list_options(request.args)
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return _page_response(returns, next_cursor, etag)
+
+
+# ================= TRANSITIONS =================
+
+async def _transition(return_id, action):
+    try:
+        if 'user_id' not in session or session.get('role') != 'admin':
+            return jsonify({'error': 'Admin only'}), 403
+
+        await Return.transition(return_id, action, session['user_id'])
+        return jsonify({'message': TRANSITIONS[action]['message']}), 200
+
+    except ReturnNotFound:
+        return jsonify({'error': 'Return not found'}), 404
+    except InvalidTransition as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
+
+@returns_bp.route('/returns/<return_id>/approve', methods=['PUT'])
+async def approve_return(return_id):
+    return await _transition(return_id, 'approve')
+
+
+@returns_bp.route('/returns/<return_id>/reject', methods=['PUT'])
+async def reject_return(return_id):
+    return await _transition(return_id, 'reject')
+
+
+@returns_bp.route('/returns/<return_id>/refund', methods=['PUT'])
+async def complete_refund(return_id):
+    return await _transition(return_id, 'refund')
+
+
+@returns_bp.route('/returns/bulk', methods=['POST'])
+async def bulk_transition():
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return jsonify({'error': 'Admin only'}), 403
+
+    try:
+        action, ids = bulk_request(await request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        results = await Return.bulk_transition(ids, action, session['user_id'])
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
+    summary = {}
+    for result in results.values():
+        summary[result] = summary.get(result, 0) + 1
+
+    return jsonify({
+        'action': action,
+        'summary': summary,
+        'results': [{'id': return_id, 'result': result} for return_id, result in results.items()]
+    }), 200
@@ -0,0 +1,146 @@
+"""
+Mongo-backed sessions for the async app.
+
+Same `sessions` documents, cookie, cache and revocation rules as
+models.session, so a session created by either app is valid in the
+other. Only the store's Mongo round trips are awaited.
+"""
+from datetime import datetime, timedelta
+from bson import ObjectId
+from bson.errors import InvalidId
+from quart.sessions import SessionInterface
+from aio.db import db
+from models.session import (
+    ServerSession,
+    SessionStore,
+    delete_session_cookie,
+    rotate_sid,
+    session_expiry,
+    set_session_cookie
+)
+
+
+async def _user_version(user_id):
+    try:
+        user = await db.users.find_one({'_id': ObjectId(user_id)}, {'session_version': 1})
+    except InvalidId:
+        return None
+    if not user:
+        return None
+    return user.get('session_version', 0)
+
+
+class AsyncSessionStore(SessionStore):
+    """SessionStore whose Mongo calls are coroutines; the LRU is inherited"""
+
+    async def load(self, sid):
+        entry = self._cache_get(sid)
+        now = datetime.utcnow()
+        if entry is not None:
+            data, user_version, expires_at, _ = entry
+            if expires_at > now:
+                self.hits += 1
+                return dict(data), user_version, expires_at
+            self.evict(sid)
+            return None
+
+        self.misses += 1
+        doc = await db.sessions.find_one({'_id': sid})
+        if not doc or doc['expires_at'] <= now:
+            return None
+
+        user_id = doc['data'].get('user_id')
+        if user_id and await _user_version(user_id) != doc.get('user_version'):
+            await self.delete(sid)
+            return None
+
+        self._cache_put(sid, doc['data'], doc.get('user_version'), doc['expires_at'])
+        return doc['data'], doc.get('user_version'), doc['expires_at']
+
+    async def save(self, sid, data, user_version, expires_at):
+        await db.sessions.update_one(
+            {'_id': sid},
+            {'$set': {
+                'data': data,
+                'user_id': data.get('user_id'),
+                'user_version': user_version,
+                'expires_at': expires_at
+            }},
+            upsert=True
+        )
+        self._cache_put(sid, data, user_version, expires_at)
+
+    async def delete(self, sid):
+        await db.sessions.delete_one({'_id': sid})
+        self.evict(sid)
+
+    async def revoke_user(self, user_id):
+        result = await db.users.update_one({'_id': ObjectId(user_id)}, {'$inc': {'session_version': 1}})
+        if result.matched_count == 0:
+            return False
+        await db.sessions.delete_many({'user_id': user_id})
+        self.evict_user(user_id)
+        return True
+
+
+class AsyncMongoSessionInterface(SessionInterface):
+    session_class = ServerSession
+
+    def __init__(self, store, refresh_after=timedelta(hours=1)):
+        self.store = store
+        self.refresh_after = refresh_after
+
+    async def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            loaded = await self.store.load(sid)
+            if loaded is not None:
+                data, user_version, expires_at = loaded
+                return self.session_class(data, sid=sid, user_version=user_version, expires_at=expires_at)
+        return self.session_class()
+
+    async def save_session(self, app, session, response):
+        if response is None:
+            return
+        if not session:
+            if session.sid and session.modified:
+                await self.store.delete(session.sid)
+                delete_session_cookie(self, app, response)
+            return
+
+        expires_at = session_expiry(app, session, self.refresh_after)
+        if expires_at is None:
+            return
+
+        previous_sid = rotate_sid(session)
+        if previous_sid:
+            await self.store.delete(previous_sid)
+        user_id = session.get('user_id')
+        if session.modified and user_id:
+            session.user_version = await _user_version(user_id)
+
+        await self.store.save(session.sid, dict(session), session.user_version, expires_at)
+        set_session_cookie(self, app, session, response)
+
+
+_store = None
+
+
+def get_session_store():
+    global _store
+    if _store is None:
+        _store = AsyncSessionStore()
+    return _store
+
+
+def init_sessions(app):
+    """Install the async Mongo-backed session interface on a Quart app"""
+    global _store
+    _store = AsyncSessionStore(
+        cache_size=app.config['SESSION_CACHE_SIZE'],
+        cache_ttl=app.config['SESSION_CACHE_TTL']
+    )
+    app.session_interface = AsyncMongoSessionInterface(
+        _store,
+        refresh_after=timedelta(seconds=app.config['SESSION_REFRESH_SECONDS'])
+    )
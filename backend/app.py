@@ -1,96 +1,137 @@
-from flask import Flask, session, jsonify, request
+import os
+import time
+from flask import Flask, current_app, jsonify
 from flask_cors import CORS
+from pymongo.errors import PyMongoError
+import db as database
+from config import Config
 from db import init_db
-from datetime import timedelta
-
-app = Flask(__name__)
-app.secret_key = 'your-secret-key-change-in-production-12345'
-
-# Session configuration
-app.config['SESSION_TYPE'] = 'filesystem'
-app.config['SESSION_COOKIE_NAME'] = 'session'
-app.config['SESSION_COOKIE_SAMESITE'] = None
-app.config['SESSION_COOKIE_SECURE'] = False
-app.config['SESSION_COOKIE_HTTPONLY'] = False
-app.config['SESSION_COOKIE_DOMAIN'] = None
-app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(hours=24)
-
-# CORS configuration
-CORS(
-    app,
-    supports_credentials=True,
-    origins=["http://localhost:5173", "http://127.0.0.1:5173"],
-    allow_headers=["Content-Type", "Authorization"],
-    methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-    expose_headers=["Set-Cookie"],
-    max_age=3600
-)
-
-# Initialize database
-print("Initializing database...")
-init_db()
-
-# ✅ REGISTER ALL REQUIRED BLUEPRINTS
-from routes.auth import auth_bp
-from routes.returns import returns_bp
-from routes.admin import admin_bp   # ✅ THIS LINE FIXES REJECT
-
-app.register_blueprint(auth_bp, url_prefix='/api')
-app.register_blueprint(returns_bp, url_prefix='/api')
-app.register_blueprint(admin_bp, url_prefix='/api')  # ✅ REQUIRED
-
-# Debug middleware
-@app.before_request
-def log_request():
-    print("\n" + "=" * 60)
-    print(f"REQUEST: {request.method} {request.path}")
-    print(f"Origin: {request.headers.get('Origin')}")
-    print(f"Cookies: {request.cookies}")
-    print(f"Session before: {dict(session)}")
-    print("=" * 60 + "\n")
-
-@app.after_request
-def log_response(response):
-    print("\n" + "=" * 60)
-    print(f"RESPONSE: {response.status}")
-    print(f"Session after: {dict(session)}")
-    print(f"Set-Cookie: {response.headers.get('Set-Cookie')}")
-    print("=" * 60 + "\n")
-    return response
-
-# Health check
-@app.route('/api/health', methods=['GET'])
-def health_check():
-    return jsonify({'status': 'ok', 'message': 'Backend is running'}), 200
-
-# Root
-@app.route('/')
-def root():
-    return jsonify({
-        'message': 'Return & Refund API',
-        'endpoints': {
-            'health': '/api/health',
-            'login': '/api/login',
-            'logout': '/api/logout',
-            'submit_return': '/api/returns',
-            'my_returns': '/api/returns/my',
-            'all_returns': '/api/returns/all (admin)'
-        }
-    }), 200
-
-# Route list
-@app.route('/api/routes', methods=['GET'])
-def list_routes():
-    routes = []
-    for rule in app.url_map.iter_rules():
-        routes.append({
-            'endpoint': rule.endpoint,
-            'methods': list(rule.methods),
-            'path': str(rule)
-        })
-    return jsonify({'routes': routes}), 200
+from models.dashboard import init_dashboard_cache
+from models.events import init_events
+from models.risk import start_risk_refresher
+from models.session import init_sessions
+from models.user import init_user_cache
+from utils.metrics import MongoCommandMetrics, init_metrics
+
+
+def create_app(config=None):
+    """
+    Build the Flask application.
+
+    Args:
+        config: Config class/object, or a dict of overrides applied on top
+                of Config. MongoDB clients are created lazily per process,
+                so this is safe to call before or after a pre-fork server forks.
+    """
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    if isinstance(config, dict):
+        app.config.update(config)
+    elif config is not None:
+        app.config.from_object(config)
+    app.secret_key = app.config['SECRET_KEY']
+
+    # CORS configuration
+    CORS(
+        app,
+        supports_credentials=True,
+        origins=app.config['CORS_ORIGINS'],
+        allow_headers=["Content-Type", "Authorization", "If-None-Match", "Last-Event-ID"],
+        methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+        expose_headers=["Set-Cookie", "X-Next-Cursor", "ETag"],
+        max_age=3600
+    )
+
+    # Request/Mongo metrics on /api/metrics; registered first so every request is timed
+    database.configure(app.config, listeners=[MongoCommandMetrics()])
+    init_metrics(app)
+
+    # Server-side sessions; the cookie only carries the session id
+    init_sessions(app)
+    init_user_cache(app.config)
+    init_dashboard_cache(app.config)
+    init_events(app.config)
+
+    # Initialize database
+    if app.config['INIT_DB_ON_START']:
+        print("Initializing database...")
+        init_db()
+
+    # Periodically rematerialize user risk scores for /admin/suspicious-users
+    start_risk_refresher(app.config['RISK_REFRESH_INTERVAL'], app.config['RISK_FULL_REFRESH_INTERVAL'])
+
+    # ✅ REGISTER ALL REQUIRED BLUEPRINTS
+    from routes.auth import auth_bp
+    from routes.returns import returns_bp
+    from routes.admin import admin_bp   # ✅ THIS LINE FIXES REJECT
+    from routes.export import export_bp
+    from routes.imports import import_bp
+    from routes.events import events_bp
+
+    app.register_blueprint(auth_bp, url_prefix='/api')
+    app.register_blueprint(returns_bp, url_prefix='/api')
+    app.register_blueprint(admin_bp, url_prefix='/api')  # ✅ REQUIRED
+    app.register_blueprint(export_bp, url_prefix='/api')
+    app.register_blueprint(import_bp, url_prefix='/api')
+    app.register_blueprint(events_bp, url_prefix='/api')
+
+    # Health check
+    @app.route('/api/health', methods=['GET'])
+    def health_check():
+        body = {'status': 'ok', 'message': 'Backend is running', 'pid': os.getpid()}
+        code = 200
+        try:
+            start = time.perf_counter()
+            database.get_client().admin.command('ping')
+            body['mongo'] = {'ok': True, 'ping_ms': round((time.perf_counter() - start) * 1000, 2)}
+        except PyMongoError as e:
+            body['status'] = 'degraded'
+            body['mongo'] = {'ok': False, 'error': str(e)}
+            code = 503
+        body['mongo']['pool'] = database.pool_stats.snapshot() if database.pool_stats else None
+        return jsonify(body), code
+
+    # Root
+    @app.route('/')
+    def root():
+        return jsonify({
+            'message': 'Return & Refund API',
+            'endpoints': {
+                'health': '/api/health',
+                'metrics': '/api/metrics',
+                'login': '/api/login',
+                'logout': '/api/logout',
+                'submit_return': '/api/returns',
+                'my_returns': '/api/returns/my',
+                'all_returns': '/api/returns/all (admin)',
+                'export_returns': '/api/admin/export/returns (admin)',
+                'export_audit_logs': '/api/admin/export/audit-logs (admin)',
+                'import_returns': '/api/admin/import/returns (admin)',
+                'events': '/api/events (server-sent events)'
+            },
+            'pagination': {
+                'params': 'limit, cursor',
+                'next_page': 'X-Next-Cursor response header'
+            }
+        }), 200
+
+    # Route list
+    @app.route('/api/routes', methods=['GET'])
+    def list_routes():
+        routes = []
+        for rule in current_app.url_map.iter_rules():
+            routes.append({
+                'endpoint': rule.endpoint,
+                'methods': list(rule.methods),
+                'path': str(rule)
+            })
+        return jsonify({'routes': routes}), 200
+
+    return app
+
 
 if __name__ == '__main__':
+    app = create_app()
     print("=" * 50)
     print("Starting Flask Backend Server")
     print("=" * 50)
@@ -0,0 +1,11 @@
+"""
+Production ASGI entry point:
+
+    uvicorn asgi:app --workers 4 --port 5000
+
+Collections and indexes are not created here; run `python indexes.py`
+once before starting the workers.
+"""
+from aio.app import create_async_app
+
+app = create_async_app({'INIT_DB_ON_START': False})
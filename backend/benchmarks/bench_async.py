@@ -0,0 +1,140 @@
+"""
+HTTP load test for comparing the WSGI and ASGI servers under many
+concurrent keep-alive clients. Needs nothing beyond the standard library,
+so it can run from any machine that reaches the server.
+
+Start one server at a time on the same database, then point this at it:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+    python -m benchmarks.bench_async --url http://127.0.0.1:5000 --clients 1000
+
+    python indexes.py && uvicorn asgi:app --workers 4 --port 5000
+    python -m benchmarks.bench_async --url http://127.0.0.1:5000 --clients 1000
+
+Each client logs in once (the session cookie is shared) and then issues
+requests back to back on its own connection for --duration seconds.
+Requests that fail to connect or answer with a 5xx count as errors.
+"""
+import argparse
+import asyncio
+import json
+import time
+from urllib.parse import urlsplit
+
+
+class Connection:
+    """Minimal HTTP/1.1 keep-alive client (Content-Length bodies only)"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method, path, headers=None, body=b''):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        lines = [f'{method} {path} HTTP/1.1', f'Host: {self.host}:{self.port}']
+        lines += [f'{name}: {value}' for name, value in (headers or {}).items()]
+        if body:
+            lines.append(f'Content-Length: {len(body)}')
+        self.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError('connection closed')
+        status = int(status_line.split()[1])
+        response_headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            response_headers.setdefault(name.strip().lower(), []).append(value.strip())
+        length = int(response_headers.get('content-length', ['0'])[0])
+        payload = await self.reader.readexactly(length) if length else b''
+        if response_headers.get('connection', [''])[0].lower() == 'close':
+            self.close()
+        return status, response_headers, payload
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+async def login(host, port, username, password):
+    """Session cookie for the given account"""
+    connection = Connection(host, port)
+    body = json.dumps({'username': username, 'password': password}).encode()
+    status, headers, _ = await connection.request(
+        'POST', '/api/login', {'Content-Type': 'application/json'}, body)
+    connection.close()
+    if status != 200:
+        raise SystemExit(f"✗ Login failed with HTTP {status}")
+    return '; '.join(cookie.split(';', 1)[0] for cookie in headers.get('set-cookie', []))
+
+
+async def client(host, port, path, cookie, deadline, latencies, errors):
+    connection = Connection(host, port)
+    headers = {'Cookie': cookie} if cookie else {}
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            status, _, _ = await connection.request('GET', path, headers)
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError):
+            errors.append(1)
+            connection.close()
+            await asyncio.sleep(0.05)
+            continue
+        if status >= 500:
+            errors.append(status)
+        else:
+            latencies.append(time.perf_counter() - start)
+    connection.close()
+
+
+def percentile(ordered, p):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+async def run(args):
+    url = urlsplit(args.url)
+    host, port = url.hostname, url.port or 80
+    cookie = await login(host, port, args.username, args.password) if args.username else None
+
+    latencies = []
+    errors = []
+    start = time.perf_counter()
+    deadline = start + args.duration
+    await asyncio.gather(*(
+        client(host, port, args.path, cookie, deadline, latencies, errors)
+        for _ in range(args.clients)
+    ))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"{args.url}{args.path}  {args.clients} clients, {args.duration}s")
+    print(f"  {len(latencies) / elapsed:10.0f} req/s   "
+          f"p50 {percentile(latencies, 0.50) * 1000:7.1f} ms   "
+          f"p99 {percentile(latencies, 0.99) * 1000:7.1f} ms   "
+          f"{len(errors)} errors")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--path', default='/api/returns/my?limit=20')
+    parser.add_argument('--clients', type=int, default=1000)
+    parser.add_argument('--duration', type=float, default=30)
+    parser.add_argument('--username', default='user1')
+    parser.add_argument('--password', default='user123')
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    main()
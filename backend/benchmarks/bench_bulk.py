@@ -0,0 +1,81 @@
+"""
+Bulk vs per-item return transitions against a scratch database on a
+local mongod (dropped afterwards).
+
+    python -m benchmarks.bench_bulk -n 2000
+"""
+import argparse
+import os
+import time
+from datetime import datetime
+
+os.environ.setdefault('AUDIT_SYNC', '1')
+
+from app import create_app
+from db import db
+
+BENCH_DB = 'return_refund_bench'
+ADMIN_ID = '0' * 24
+
+
+def seed_pending(n, tag):
+    now = datetime.utcnow()
+    result = db.returns.insert_many([{
+        'user_id': f'{i % 500:024x}',
+        'order_id': f'{tag}-{i:08d}',
+        'reason': 'Benchmark return request',
+        'status': 'Pending',
+        'refund_status': 'Not Initiated',
+        'created_at': now,
+        'updated_at': now
+    } for i in range(n)])
+    return [str(oid) for oid in result.inserted_ids]
+
+
+def admin_client(app):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['user_id'] = ADMIN_ID
+        session['username'] = 'bench-admin'
+        session['role'] = 'admin'
+    return client
+
+
+def run(client, ids, action):
+    """Seconds to transition every id through the per-item endpoint"""
+    start = time.perf_counter()
+    for return_id in ids:
+        client.put(f'/api/returns/{return_id}/{action}')
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', type=int, default=2000)
+    args = parser.parse_args()
+
+    app = create_app({'DB_NAME': BENCH_DB, 'RISK_REFRESH_INTERVAL': 0})
+    client = admin_client(app)
+    try:
+        for action in ('approve', 'refund'):
+            ids = seed_pending(args.n, 'single')
+            if action == 'refund':
+                client.post('/api/returns/bulk', json={'action': 'approve', 'ids': ids})
+            single = run(client, ids, action)
+
+            ids = seed_pending(args.n, 'bulk')
+            if action == 'refund':
+                client.post('/api/returns/bulk', json={'action': 'approve', 'ids': ids})
+            start = time.perf_counter()
+            response = client.post('/api/returns/bulk', json={'action': action, 'ids': ids})
+            bulk = time.perf_counter() - start
+
+            print(f"{action} x {args.n}")
+            print(f"  per-item endpoint  {args.n / single:10.0f} returns/s")
+            print(f"  bulk endpoint      {args.n / bulk:10.0f} returns/s   {response.get_json()['summary']}")
+    finally:
+        db.client.drop_database(BENCH_DB)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,476 @@
+"""
+Endpoint benchmark suite: drives every route in routes/auth.py,
+routes/returns.py and routes/admin.py with a weighted mix of concurrent
+clients against a deterministic fixture (see benchmarks.fixtures) on a
+local mongod.
+
+    python -m benchmarks.bench_endpoints --scale 10k --clients 32 --duration 30
+    python -m benchmarks.bench_endpoints --scale 1m --mix my=50,all=20,stats=10
+    python -m benchmarks.bench_endpoints --compare benchmarks/results/10k-<commit>-<time>.json
+
+The `search` operation mixes phrase, unfiltered broad-term, filtered,
+date-bounded, order prefix and audit detail queries against
+/api/admin/search.
+
+Each client is a thread with its own Flask test client, logged in as its
+own fixture user and as the fixture admin, so requests run the full
+routing/session/model stack in process (use benchmarks.bench_async to
+load a running server over HTTP instead). For every endpoint the suite
+reports throughput, p50/p95/p99 latency, response statuses and the MongoDB
+commands issued per request, counted by a pymongo command listener on the
+requesting thread. Commands from background threads (the audit writer)
+are reported separately.
+
+Results are written as JSON to benchmarks/results/ with the commit they
+were measured on. The benchmark mutates its fixture (it approves, rejects
+and submits returns), so the fixture is reloaded before the next run
+unless --reuse is given.
+"""
+import argparse
+import json
+import math
+import os
+import queue
+import random
+import subprocess
+import threading
+import time
+from datetime import datetime, timedelta
+from pymongo import monitoring
+import db as database
+from app import create_app
+from db import db
+from benchmarks import fixtures
+from utils.metrics import MongoCommandMetrics
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+POOL_SIZE = 20_000
+BULK_SIZE = 100
+
+DEFAULT_MIX = {
+    'login': 2,
+    'logout': 1,
+    'check_session': 5,
+    'submit': 5,
+    'my': 30,
+    'all': 10,
+    'approve': 3,
+    'reject': 2,
+    'refund': 2,
+    'bulk': 1,
+    'audit_logs': 5,
+    'stats': 5,
+    'suspicious': 3,
+    'revoke': 1,
+    'user_activity': 5,
+    'search': 3,
+}
+
+SEARCHES = [
+    'q=%22never+arrived%22',
+    'q=damaged',
+    'q=wrong+size',
+    'q=damaged&status=Pending',
+    'q=wrong+size&from={since}',
+    'order_prefix=ORD-00001',
+    'scope=audit_logs&q=login',
+]
+
+_local = threading.local()
+
+
+class RoundTrips(monitoring.CommandListener):
+    """Counts commands per thread; threads not inside a request count as background"""
+
+    def __init__(self):
+        self.background = 0
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        if getattr(_local, 'commands', None) is not None:
+            _local.commands += 1
+        else:
+            with self._lock:
+                self.background += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+class Recorder:
+    """Per-endpoint latencies, statuses and round trips, shared by all workers"""
+
+    def __init__(self):
+        self.latencies = {}
+        self.statuses = {}
+        self.round_trips = {}
+        self.skipped = {}
+        self.recording = False
+        self._lock = threading.Lock()
+
+    def add(self, name, seconds, status, commands):
+        if not self.recording:
+            return
+        with self._lock:
+            self.latencies.setdefault(name, []).append(seconds)
+            statuses = self.statuses.setdefault(name, {})
+            statuses[status] = statuses.get(status, 0) + 1
+            self.round_trips[name] = self.round_trips.get(name, 0) + commands
+
+    def skip(self, name):
+        if self.recording:
+            with self._lock:
+                self.skipped[name] = self.skipped.get(name, 0) + 1
+
+
+class Worker:
+    def __init__(self, app, index, fixture, admin_id, pools, recorder, seed):
+        self.index = index
+        self.fixture = fixture
+        self.user_id = str(fixtures.user_id(index, fixture['anchor']))
+        self.pools = pools
+        self.recorder = recorder
+        self.rng = random.Random(seed * 100_003 + index)
+        self.submitted = 0
+        self.client = app.test_client()
+        self.admin = app.test_client()
+        self.login_as(self.client, self.user_id, fixtures.username(index), 'user')
+        self.login_as(self.admin, admin_id, fixtures.BENCH_ADMIN, 'admin')
+
+    @staticmethod
+    def login_as(client, user_id, username, role):
+        with client.session_transaction() as session:
+            session['user_id'] = user_id
+            session['username'] = username
+            session['role'] = role
+
+    def request(self, name, client, method, path, **kwargs):
+        _local.commands = 0
+        start = time.perf_counter()
+        try:
+            response = client.open(path, method=method, **kwargs)
+            status = response.status_code
+        except Exception:
+            status = 'exception'
+        elapsed = time.perf_counter() - start
+        commands = _local.commands
+        _local.commands = None
+        self.recorder.add(name, elapsed, status, commands)
+
+    def other_user(self):
+        """A fixture user no worker is logged in as (safe to revoke)"""
+        index = self.rng.randrange(self.fixture['clients'], self.fixture['users'])
+        return str(fixtures.user_id(index, self.fixture['anchor']))
+
+    def take(self, pool, n=1):
+        ids = []
+        try:
+            for _ in range(n):
+                ids.append(self.pools[pool].get_nowait())
+        except queue.Empty:
+            pass
+        return ids
+
+
+# ================= CLIENT OPERATIONS =================
+
+def op_login(w):
+    w.request('login', w.client, 'POST', '/api/login',
+              json={'username': fixtures.username(w.index), 'password': fixtures.BENCH_PASSWORD})
+
+
+def op_logout(w):
+    w.request('logout', w.client, 'POST', '/api/logout')
+    w.login_as(w.client, w.user_id, fixtures.username(w.index), 'user')
+
+
+def op_check_session(w):
+    w.request('check_session', w.client, 'GET', '/api/check-session')
+
+
+def op_submit(w):
+    w.submitted += 1
+    w.request('submit', w.client, 'POST', '/api/returns', json={
+        'order_id': f'BENCH-{w.index}-{w.submitted}',
+        'reason': 'Benchmark submission: wrong size delivered'
+    })
+
+
+def op_my(w):
+    w.request('my', w.client, 'GET', '/api/returns/my?limit=20')
+
+
+def op_all(w):
+    w.request('all', w.admin, 'GET', '/api/returns/all?limit=50')
+
+
+def _op_transition(action, pool):
+    def op(w):
+        ids = w.take(pool)
+        if not ids:
+            w.recorder.skip(action)
+            return
+        w.request(action, w.admin, 'PUT', f'/api/returns/{ids[0]}/{action}')
+    return op
+
+
+def op_bulk(w):
+    ids = w.take('pending', BULK_SIZE)
+    if not ids:
+        w.recorder.skip('bulk')
+        return
+    w.request('bulk', w.admin, 'POST', '/api/returns/bulk', json={'action': 'approve', 'ids': ids})
+
+
+def op_audit_logs(w):
+    w.request('audit_logs', w.admin, 'GET', '/api/admin/audit-logs?limit=100')
+
+
+def op_stats(w):
+    w.request('stats', w.admin, 'GET', '/api/admin/stats')
+
+
+def op_suspicious(w):
+    w.request('suspicious', w.admin, 'GET', '/api/admin/suspicious-users')
+
+
+def op_revoke(w):
+    w.request('revoke', w.admin, 'POST', f'/api/admin/users/{w.other_user()}/revoke-sessions')
+
+
+def op_user_activity(w):
+    w.request('user_activity', w.admin, 'GET', f'/api/admin/user-activity/{w.other_user()}')
+
+
+def op_search(w):
+    since = (w.fixture['anchor'] - timedelta(days=7)).strftime('%Y-%m-%d')
+    query = w.rng.choice(SEARCHES).format(since=since)
+    w.request('search', w.admin, 'GET', f'/api/admin/search?limit=50&{query}')
+
+
+OPERATIONS = {
+    'login': op_login,
+    'logout': op_logout,
+    'check_session': op_check_session,
+    'submit': op_submit,
+    'my': op_my,
+    'all': op_all,
+    'approve': _op_transition('approve', 'pending'),
+    'reject': _op_transition('reject', 'pending'),
+    'refund': _op_transition('refund', 'refundable'),
+    'bulk': op_bulk,
+    'audit_logs': op_audit_logs,
+    'stats': op_stats,
+    'suspicious': op_suspicious,
+    'revoke': op_revoke,
+    'user_activity': op_user_activity,
+    'search': op_search,
+}
+
+
+# ================= RUN =================
+
+def parse_mix(value):
+    """'my=30,all=10' -> {'my': 30, 'all': 10}"""
+    mix = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(
+                f"Unknown operation {name!r}. Expected one of {', '.join(OPERATIONS)}")
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Weight for {name} must be a number")
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+def _id_pool(query):
+    ids = queue.Queue()
+    for doc in db.returns.find(query, {'_id': 1}).sort('_id', 1).limit(POOL_SIZE):
+        ids.put(str(doc['_id']))
+    return ids
+
+
+def percentile(ordered, p):
+    """Nearest-rank percentile of a sorted list"""
+    if not ordered:
+        return None
+    return ordered[max(0, math.ceil(p * len(ordered)) - 1)]
+
+
+def summarize(recorder, elapsed):
+    endpoints = {}
+    total = 0
+    for name in sorted(set(recorder.latencies) | set(recorder.skipped)):
+        latencies = sorted(recorder.latencies.get(name, []))
+        count = len(latencies)
+        total += count
+        statuses = recorder.statuses.get(name, {})
+        errors = sum(n for status, n in statuses.items() if status == 'exception' or status >= 500)
+        endpoints[name] = {
+            'requests': count,
+            'skipped': recorder.skipped.get(name, 0),
+            'errors': errors,
+            'statuses': {str(status): n for status, n in sorted(statuses.items(), key=str)},
+            'rps': round(count / elapsed, 1),
+            'p50_ms': _ms(percentile(latencies, 0.50)),
+            'p95_ms': _ms(percentile(latencies, 0.95)),
+            'p99_ms': _ms(percentile(latencies, 0.99)),
+            'round_trips_per_request': round(recorder.round_trips.get(name, 0) / count, 2) if count else None,
+        }
+    every = sorted(t for latencies in recorder.latencies.values() for t in latencies)
+    return endpoints, {
+        'requests': total,
+        'errors': sum(e['errors'] for e in endpoints.values()),
+        'rps': round(total / elapsed, 1),
+        'p50_ms': _ms(percentile(every, 0.50)),
+        'p95_ms': _ms(percentile(every, 0.95)),
+        'p99_ms': _ms(percentile(every, 0.99)),
+        'round_trips_per_request': round(sum(recorder.round_trips.values()) / total, 2) if total else None,
+    }
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+def _git(*args):
+    try:
+        return subprocess.run(['git', *args], cwd=REPO_DIR, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(app, args, mix, listener):
+    fixture = {**fixtures.current_fixture(), 'clients': args.clients}
+    if args.clients >= fixture['users']:
+        raise SystemExit(f"✗ --clients must be below the fixture's {fixture['users']} users")
+    admin = db.users.find_one({'username': fixtures.BENCH_ADMIN}, {'_id': 1})
+    pools = {
+        'pending': _id_pool({'status': 'Pending'}),
+        'refundable': _id_pool({'status': 'Approved', 'refund_status': 'Refund Initiated'}),
+    }
+    recorder = Recorder()
+    workers = [
+        Worker(app, i, fixture, str(admin['_id']), pools, recorder, args.seed)
+        for i in range(args.clients)
+    ]
+
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    stop = threading.Event()
+
+    def loop(worker):
+        while not stop.is_set():
+            OPERATIONS[worker.rng.choices(names, weights)[0]](worker)
+
+    threads = [threading.Thread(target=loop, args=(w,), daemon=True) for w in workers]
+    for t in threads:
+        t.start()
+    time.sleep(args.warmup)
+
+    background = listener.background
+    recorder.recording = True
+    start = time.perf_counter()
+    time.sleep(args.duration)
+    recorder.recording = False
+    elapsed = time.perf_counter() - start
+    background = listener.background - background
+
+    stop.set()
+    for t in threads:
+        t.join()
+    db.counters.update_one({'_id': fixtures.FIXTURE_ID}, {'$set': {'used': True}})
+
+    endpoints, total = summarize(recorder, elapsed)
+    total['background_round_trips'] = background
+    return endpoints, total
+
+
+def print_table(endpoints, total, baseline=None):
+    columns = ('rps', 'p50_ms', 'p95_ms', 'p99_ms', 'round_trips_per_request')
+    print(f"{'endpoint':<16}{'requests':>9}{'errors':>8}" + ''.join(f'{c[:10]:>12}' for c in columns))
+    rows = list(endpoints.items()) + [('TOTAL', total)]
+    for name, row in rows:
+        line = f"{name:<16}{row['requests']:>9}{row['errors']:>8}"
+        for column in columns:
+            value = row.get(column)
+            line += f"{'-' if value is None else value:>12}"
+        print(line)
+        if baseline:
+            before = baseline['total'] if name == 'TOTAL' else baseline['endpoints'].get(name)
+            if before:
+                print(' ' * 33 + ''.join(f'{_delta(before.get(c), row.get(c)):>12}' for c in columns))
+
+
+def _delta(before, after):
+    if not before or after is None:
+        return ''
+    return f'{(after - before) / before * 100:+.1f}%'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark every API endpoint under a concurrent client mix')
+    parser.add_argument('--scale', choices=fixtures.SCALES, default='10k')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=30, help='Measured seconds')
+    parser.add_argument('--warmup', type=float, default=3, help='Unmeasured seconds before measuring')
+    parser.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX,
+                        help='Operation weights, e.g. my=30,all=10 (default: every endpoint)')
+    parser.add_argument('--reuse', action='store_true',
+                        help='Do not reload a fixture modified by a previous run')
+    parser.add_argument('--compare', help='Baseline results JSON to compare against')
+    parser.add_argument('--output', default=RESULTS_DIR, help='Directory for the results JSON')
+    args = parser.parse_args()
+
+    app = create_app({
+        'DB_NAME': fixtures.bench_db_name(args.scale),
+        'INIT_DB_ON_START': False,
+        'RISK_REFRESH_INTERVAL': 0,
+        'MONGO_MAX_POOL_SIZE': max(100, args.clients * 2),
+    })
+    listener = RoundTrips()
+    database.configure(app.config, listeners=[MongoCommandMetrics(), listener])
+
+    existing = fixtures.current_fixture()
+    fixtures.seed(args.scale, args.seed, force=bool(existing and existing.get('used') and not args.reuse))
+
+    endpoints, total = run(app, args, args.mix, listener)
+
+    result = {
+        'commit': _git('rev-parse', 'HEAD'),
+        'dirty': bool(_git('status', '--porcelain', '--untracked-files=no')),
+        'measured_at': datetime.utcnow().isoformat(),
+        'scale': args.scale,
+        'seed': args.seed,
+        'clients': args.clients,
+        'duration': args.duration,
+        'mix': args.mix,
+        'endpoints': endpoints,
+        'total': total,
+    }
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, f"{args.scale}-{(result['commit'] or 'unknown')[:10]}-"
+                                     f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"Compared with {baseline.get('commit', 'unknown')[:10]} ({args.compare})")
+    print_table(endpoints, total, baseline)
+    print(f"✓ Results written to {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Repeated polling of /api/returns/my and /api/returns/all with and without
+If-None-Match, against a scratch database on a local mongod (dropped
+afterwards).
+
+    python -m benchmarks.bench_etag --returns 200 --polls 2000
+"""
+import argparse
+import os
+import time
+from datetime import datetime
+
+os.environ.setdefault('AUDIT_SYNC', '1')
+
+from app import create_app
+from db import db
+from models.versions import bump_return_versions
+
+BENCH_DB = 'return_refund_bench'
+USER_ID = '1' * 24
+ADMIN_ID = '0' * 24
+
+
+def logged_in(app, user_id, role):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['user_id'] = user_id
+        session['username'] = f'bench-{role}'
+        session['role'] = role
+    return client
+
+
+def poll(client, path, n, conditional):
+    """Polls per second; returns (rate, status of the last poll)"""
+    etag = client.get(path).headers.get('ETag')
+    headers = {'If-None-Match': etag} if conditional else {}
+    start = time.perf_counter()
+    for _ in range(n):
+        response = client.get(path, headers=headers)
+    return n / (time.perf_counter() - start), response.status_code
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--returns', type=int, default=200)
+    parser.add_argument('--polls', type=int, default=2000)
+    args = parser.parse_args()
+
+    app = create_app({'DB_NAME': BENCH_DB, 'RISK_REFRESH_INTERVAL': 0})
+    now = datetime.utcnow()
+    db.returns.insert_many([{
+        'user_id': USER_ID, 'order_id': f'ETAG-{i:06d}', 'reason': 'Benchmark return request',
+        'status': 'Pending', 'refund_status': 'Not Initiated', 'open': True,
+        'created_at': now, 'updated_at': now
+    } for i in range(args.returns)])
+    bump_return_versions([USER_ID])
+
+    try:
+        for label, client, path in (
+            ('user  /returns/my ', logged_in(app, USER_ID, 'user'), '/api/returns/my'),
+            ('admin /returns/all', logged_in(app, ADMIN_ID, 'admin'), '/api/returns/all'),
+        ):
+            full, status = poll(client, path, args.polls, conditional=False)
+            print(f"{label}  full refetch     {full:8.0f} polls/s  ({status})")
+            cached, status = poll(client, path, args.polls, conditional=True)
+            print(f"{label}  If-None-Match    {cached:8.0f} polls/s  ({status})")
+    finally:
+        db.client.drop_database(BENCH_DB)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+"""
+Memory and list-serialization benchmark for the Return model layer.
+
+Compares the original dict-backed Return, the slotted Return built by
+hydrate(), and the raw-dict fast path used by the list endpoints.
+
+    python -m benchmarks.bench_models              # synthetic documents only
+    python -m benchmarks.bench_models --mongo      # also time Return.find_all against local mongod
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from bson import ObjectId
+from models.user import Return, hydrate, serialize
+
+
+class DictReturn:
+    """The pre-slots Return: one __dict__ per instance"""
+
+    def __init__(self, user_id, order_id, reason, status, refund_status, _id, created_at, updated_at):
+        self._id = _id
+        self.user_id = user_id
+        self.order_id = order_id
+        self.reason = reason
+        self.status = status
+        self.refund_status = refund_status
+        self.created_at = created_at
+        self.updated_at = updated_at
+
+    def to_dict(self):
+        return {
+            '_id': str(self._id),
+            'user_id': self.user_id,
+            'order_id': self.order_id,
+            'reason': self.reason,
+            'status': self.status,
+            'refund_status': self.refund_status,
+            'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat()
+        }
+
+
+def make_documents(n, fields=None):
+    base = datetime(2024, 1, 1)
+    docs = []
+    for i in range(n):
+        doc = {
+            '_id': ObjectId(),
+            'user_id': f'{i % 5000:024x}',
+            'order_id': f'ORD-{i:08d}',
+            'reason': 'Item arrived damaged and the packaging was torn open',
+            'status': 'Pending',
+            'refund_status': 'Not Initiated',
+            'created_at': base + timedelta(seconds=i),
+            'updated_at': base + timedelta(seconds=i)
+        }
+        if fields:
+            doc = {k: v for k, v in doc.items() if k == '_id' or k in fields}
+        docs.append(doc)
+    return docs
+
+
+def measure_memory(build, n):
+    """Bytes retained per item after building n items from fresh documents"""
+    docs = make_documents(n)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    items = build(docs)
+    del docs
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    retained = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    del items
+    return retained
+
+
+def measure_throughput(serialize_page, docs, page_size, seconds=2.0):
+    """Pages per second for turning `page_size` documents into a JSON body"""
+    pages = [docs[i:i + page_size] for i in range(0, len(docs), page_size)]
+    done = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for page in pages:
+            # Copy so in-place serialization starts from fresh documents
+            json.dumps(serialize_page([dict(d) for d in page]))
+            done += 1
+    return done / (time.perf_counter() - start)
+
+
+def legacy_objects(docs):
+    return [DictReturn(
+        user_id=r['user_id'], order_id=r['order_id'], reason=r['reason'],
+        status=r['status'], refund_status=r['refund_status'], _id=r['_id'],
+        created_at=r['created_at'], updated_at=r['updated_at']
+    ) for r in docs]
+
+
+def slotted_objects(docs):
+    return [hydrate(Return, r) for r in docs]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', type=int, default=100_000)
+    parser.add_argument('--page-size', type=int, default=50)
+    parser.add_argument('--mongo', action='store_true')
+    args = parser.parse_args()
+
+    print(f"Memory retained for {args.n:,} returns")
+    for label, build in [
+        ('dict-backed objects (before)', legacy_objects),
+        ('slotted objects', slotted_objects),
+        ('raw dicts', lambda docs: [serialize(r) for r in docs]),
+    ]:
+        size = measure_memory(build, args.n)
+        print(f"  {label:<30} {size / 2**20:8.1f} MiB  ({size / args.n:6.0f} B/return)")
+
+    docs = make_documents(10_000)
+    summary_docs = make_documents(10_000, Return.VIEWS['summary'])
+    print(f"\nList serialization, pages of {args.page_size}")
+    for label, page_docs, fn in [
+        ('dict-backed to_dict (before)', docs, lambda page: [r.to_dict() for r in legacy_objects(page)]),
+        ('slotted to_dict', docs, lambda page: [r.to_dict() for r in slotted_objects(page)]),
+        ('raw fast path', docs, lambda page: [serialize(r) for r in page]),
+        ('raw fast path, summary view', summary_docs, lambda page: [serialize(r) for r in page]),
+    ]:
+        rate = measure_throughput(fn, page_docs, args.page_size)
+        print(f"  {label:<30} {rate:10.0f} pages/s")
+
+    if args.mongo:
+        print(f"\nReturn.find_all against mongod, pages of {args.page_size}")
+        for label, kwargs in [
+            ('objects, full view', {'raw': False}),
+            ('raw, full view', {'raw': True}),
+            ('raw, summary view', {'raw': True, 'view': 'summary'}),
+        ]:
+            runs = 200
+            start = time.perf_counter()
+            for _ in range(runs):
+                page, _ = Return.find_all(limit=args.page_size, **kwargs)
+                if not kwargs['raw']:
+                    page = [r.to_dict() for r in page]
+                json.dumps(page)
+            print(f"  {label:<30} {runs / (time.perf_counter() - start):10.0f} pages/s")
+
+
+if __name__ == '__main__':
+    main()
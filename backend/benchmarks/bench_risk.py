@@ -0,0 +1,78 @@
+"""
+Fraud scoring benchmark.
+
+Times the vectorized feature and scoring pass of models.risk on synthetic
+per-user columns, and optionally a full refresh_risk_scores() against a
+benchmark fixture (see benchmarks.fixtures).
+
+    python -m benchmarks.bench_risk --users 1000000             # scoring pass only
+    python -m benchmarks.bench_risk --users 1000000 --scale 1m  # also a full refresh
+"""
+import argparse
+import time
+import numpy as np
+from models.risk import RISK_WINDOW_DAYS, build_features, refresh_risk_scores, score_features
+
+
+def synthetic_columns(n, seed=1):
+    """Aggregates shaped like _return_aggregates() output for n users"""
+    rng = np.random.default_rng(seed)
+    returns = rng.poisson(2, n) + 1
+    decided = rng.binomial(returns, 0.6)
+    first = np.datetime64('2024-01-01T00:00', 'ms') + rng.integers(0, 20 * 86400, n).astype('timedelta64[s]')
+    span = (rng.random(n) * 10 * 86400 * (returns > 1)).astype('timedelta64[s]')
+    columns = {
+        'returns': returns,
+        'orders': returns - rng.binomial(returns - 1, 0.05),
+        'decided': decided,
+        'rejected': rng.binomial(decided, 0.2),
+        'first': first,
+        'last': first + span,
+    }
+    return columns, rng.poisson(0.3, n)
+
+
+def time_scoring(n, repeat):
+    columns, failed_logins = synthetic_columns(n)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        scores, levels = score_features(build_features(columns, failed_logins, RISK_WINDOW_DAYS))
+        timings.append(time.perf_counter() - started)
+    best = min(timings)
+    print(f"Scoring {n} users: best {best * 1000:.1f} ms of {repeat} "
+          f"({n / best / 1e6:.1f}M users/s)")
+    for level in ('HIGH', 'MEDIUM', 'LOW'):
+        print(f"  {level:<6} {int((levels == level).sum())}")
+    print(f"  mean score {scores.mean():.1f}")
+
+
+def time_refresh(scale, seed):
+    from app import create_app
+    from benchmarks import fixtures
+
+    create_app({
+        'DB_NAME': fixtures.bench_db_name(scale),
+        'INIT_DB_ON_START': False,
+        'RISK_REFRESH_INTERVAL': 0
+    })
+    fixtures.seed(scale, seed)
+    for incremental in (False, True):
+        started = time.perf_counter()
+        scored = refresh_risk_scores(incremental=incremental)
+        mode = 'incremental' if incremental else 'full'
+        print(f"Refresh ({mode}): {scored} users in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the vectorized fraud scoring pass')
+    parser.add_argument('--users', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--scale', choices=('10k', '1m', '10m'),
+                        help='Also time a full and an incremental refresh against this fixture')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    time_scoring(args.users, args.repeat)
+    if args.scale:
+        time_refresh(args.scale, args.seed)
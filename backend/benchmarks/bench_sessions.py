@@ -0,0 +1,65 @@
+"""
+Per-request session overhead: signed-cookie sessions vs the Mongo-backed
+store with and without its in-process cache. Needs a local mongod.
+
+    python -m benchmarks.bench_sessions -n 5000
+"""
+import argparse
+import time
+from flask import request
+from flask.sessions import SecureCookieSessionInterface
+from app import create_app
+from models.session import MongoSessionInterface, SessionStore
+
+
+def time_requests(app, interface, cookie, n):
+    """Average microseconds to open and save one logged-in session"""
+    app.session_interface = interface
+    name = app.config['SESSION_COOKIE_NAME']
+    total = 0.0
+    for _ in range(n):
+        with app.test_request_context('/api/returns/my', headers={'Cookie': f'{name}={cookie}'}):
+            start = time.perf_counter()
+            session = interface.open_session(app, request)
+            session.get('user_id')
+            interface.save_session(app, session, app.response_class())
+            total += time.perf_counter() - start
+    return total / n * 1e6
+
+
+def login_cookie(app, interface):
+    """Create one logged-in session with `interface` and return its cookie value"""
+    app.session_interface = interface
+    with app.test_request_context('/api/login'):
+        session = interface.open_session(app, request)
+        session.permanent = True
+        session['user_id'] = '0' * 24
+        session['username'] = 'bench'
+        session['role'] = 'user'
+        response = app.response_class()
+        interface.save_session(app, session, response)
+    name = app.config['SESSION_COOKIE_NAME']
+    header = next(h for h in response.headers.getlist('Set-Cookie') if h.startswith(name + '='))
+    return header.split(';', 1)[0].split('=', 1)[1]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', type=int, default=5000)
+    args = parser.parse_args()
+
+    app = create_app({'INIT_DB_ON_START': False, 'RISK_REFRESH_INTERVAL': 0})
+
+    cases = [
+        ('signed cookie (before)', SecureCookieSessionInterface()),
+        ('mongo store, cached', MongoSessionInterface(SessionStore(cache_ttl=2.0))),
+        ('mongo store, no cache', MongoSessionInterface(SessionStore(cache_ttl=0))),
+    ]
+    for label, interface in cases:
+        cookie = login_cookie(app, interface)
+        per_request = time_requests(app, interface, cookie, args.n)
+        print(f"  {label:<24} {per_request:8.1f} µs/request")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Worker startup time and memory.
+
+Starts N fresh interpreters the way a pre-fork server's workers would,
+each building the app with create_app() and serving one /api/health
+request, and reports time-to-app, time-to-first-response and peak RSS.
+Run once with the per-worker init_db() and once without it to see what
+moving collection/index setup into the master saves.
+
+    python -m benchmarks.bench_startup --workers 8
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+WORKER = r'''
+import json, resource, time
+start = time.perf_counter()
+from app import create_app
+app = create_app({'INIT_DB_ON_START': %(init_db)s, 'RISK_REFRESH_INTERVAL': 0})
+built = time.perf_counter()
+status = app.test_client().get('/api/health').status_code
+served = time.perf_counter()
+print(json.dumps({
+    'create_app_ms': (built - start) * 1000,
+    'first_response_ms': (served - start) * 1000,
+    'status': status,
+    'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+}))
+'''
+
+
+def run_workers(n, init_db):
+    procs = [
+        subprocess.Popen(
+            [sys.executable, '-c', WORKER % {'init_db': init_db}],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+        )
+        for _ in range(n)
+    ]
+    results = []
+    for proc in procs:
+        out, _ = proc.communicate()
+        results.append(json.loads(out.strip().splitlines()[-1]))
+    return results
+
+
+def summarize(label, results):
+    print(f"{label}")
+    for key in ('create_app_ms', 'first_response_ms', 'max_rss_mb'):
+        values = [r[key] for r in results]
+        print(f"  {key:<18} median {statistics.median(values):8.1f}   max {max(values):8.1f}")
+    failed = [r['status'] for r in results if r['status'] != 200]
+    if failed:
+        print(f"  health failures: {failed}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    summarize(f"{args.workers} workers, init_db in every worker", run_workers(args.workers, True))
+    summarize(f"{args.workers} workers, init_db in master only", run_workers(args.workers, False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Parallel return submissions: the old read-then-insert duplicate check vs
+relying on the unique user_order_open index. Runs against a scratch
+database on a local mongod (dropped afterwards).
+
+Every thread submits the same set of (user, order) pairs, so most
+submissions are duplicates and the race between check and insert is hit
+constantly. The legacy path is expected to let some duplicates through.
+
+    python -m benchmarks.bench_submit --orders 2000 --threads 16
+"""
+import argparse
+import os
+import threading
+import time
+from datetime import datetime
+
+os.environ.setdefault('AUDIT_SYNC', '1')
+
+from pymongo.errors import DuplicateKeyError
+from app import create_app
+from db import db
+from models.user import Return
+
+BENCH_DB = 'return_refund_bench'
+
+
+def legacy_save(collection, user_id, order_id):
+    """Return.save as it was: find_one, then insert if nothing open"""
+    existing = collection.find_one({
+        'user_id': user_id,
+        'order_id': order_id,
+        'status': {'$in': ['Pending', 'Approved']}
+    })
+    if existing:
+        raise ValueError(f"A return request for order {order_id} already exists")
+    now = datetime.utcnow()
+    collection.insert_one({
+        'user_id': user_id, 'order_id': order_id, 'reason': 'Benchmark',
+        'status': 'Pending', 'refund_status': 'Not Initiated',
+        'created_at': now, 'updated_at': now
+    })
+
+
+def indexed_save(user_id, order_id):
+    Return(user_id=user_id, order_id=order_id, reason='Benchmark').save()
+
+
+def run(submit, pairs, threads, rejected_errors):
+    """Submit every pair from every thread; returns (seconds, accepted)"""
+    accepted = [0] * threads
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(n):
+        barrier.wait()
+        for user_id, order_id in pairs:
+            try:
+                submit(user_id, order_id)
+                accepted[n] += 1
+            except rejected_errors:
+                pass
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for t in workers:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for t in workers:
+        t.join()
+    return time.perf_counter() - start, sum(accepted)
+
+
+def duplicates(collection):
+    """Number of extra open returns beyond one per (user, order)"""
+    pipeline = [
+        {'$match': {'status': {'$in': ['Pending', 'Approved']}}},
+        {'$group': {'_id': {'u': '$user_id', 'o': '$order_id'}, 'n': {'$sum': 1}}},
+        {'$match': {'n': {'$gt': 1}}},
+        {'$group': {'_id': None, 'extra': {'$sum': {'$subtract': ['$n', 1]}}}}
+    ]
+    rows = list(collection.aggregate(pipeline))
+    return rows[0]['extra'] if rows else 0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--orders', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=16)
+    args = parser.parse_args()
+
+    create_app({'DB_NAME': BENCH_DB, 'RISK_REFRESH_INTERVAL': 0})
+    pairs = [(f'{i % 200:024x}', f'ORD-{i:08d}') for i in range(args.orders)]
+    attempts = len(pairs) * args.threads
+    try:
+        legacy = db.returns_legacy
+        legacy.create_index([('user_id', 1), ('order_id', 1), ('status', 1)])
+        seconds, accepted = run(
+            lambda u, o: legacy_save(legacy, u, o), pairs, args.threads, ValueError)
+        print(f"read-then-insert   {attempts / seconds:8.0f} submits/s   "
+              f"{accepted} accepted, {duplicates(legacy)} duplicates")
+
+        seconds, accepted = run(indexed_save, pairs, args.threads, DuplicateKeyError)
+        print(f"unique index       {attempts / seconds:8.0f} submits/s   "
+              f"{accepted} accepted, {duplicates(db.returns)} duplicates")
+    finally:
+        db.client.drop_database(BENCH_DB)
+
+
+if __name__ == '__main__':
+    main()
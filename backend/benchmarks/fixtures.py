@@ -0,0 +1,279 @@
+"""
+Deterministic benchmark datasets.
+
+A fixture is fully determined by its scale, seed and anchor day: the same
+arguments always produce the same users, returns and audit entries (same
+_ids, order ids, statuses and relative timestamps), so results from
+different commits are measured against identical data.
+
+    python -m benchmarks.fixtures --scale 10k              # seed return_refund_bench_10k
+    python -m benchmarks.fixtures --scale 1m --seed 7
+
+Scales give the number of returns and of audit entries; there is one user
+per RETURNS_PER_USER returns. Every user's password is BENCH_PASSWORD and
+the admin account is BENCH_ADMIN. Derived data (counters, risk scores,
+activity rollups) is rebuilt after loading, and the fixture parameters are
+recorded in the `counters` collection so an identical fixture is not
+loaded twice.
+"""
+import argparse
+import random
+import struct
+import time
+from datetime import datetime, timedelta
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+from constants import OPEN_STATUSES
+from db import db, init_db
+from models.activity import backfill_activity
+from models.counters import reconcile_counters
+from models.risk import refresh_risk_scores
+from models.transitions import TRANSITIONS, REFUND_NOT_INITIATED
+from utils.auth import hash_password
+
+SCALES = {
+    '10k': 10_000,
+    '1m': 1_000_000,
+    '10m': 10_000_000,
+}
+RETURNS_PER_USER = 20
+MIN_USERS = 200
+DAYS = 60
+BATCH = 10_000
+
+# Bumped whenever generated documents change, so older fixtures are reloaded
+FIXTURE_VERSION = 2
+
+BENCH_PASSWORD = 'bench123'
+BENCH_ADMIN = 'bench-admin'
+FIXTURE_ID = 'bench_fixture'
+
+# Share of returns per (status, refund_status); transitions applied in order
+STATE_WEIGHTS = [
+    ((), 50),
+    (('approve',), 20),
+    (('approve', 'refund'), 20),
+    (('reject',), 10),
+]
+AUDIT_WEIGHTS = [
+    ('LOGIN_SUCCESS', 45),
+    ('LOGIN_FAILED', 5),
+    ('LOGOUT', 15),
+    ('RETURN_CREATED', 20),
+    ('RETURN_APPROVED', 7),
+    ('RETURN_REJECTED', 3),
+    ('REFUND_COMPLETED', 5),
+]
+
+REASONS = [
+    'Item arrived damaged and the box was crushed',
+    'Package never arrived at the delivery address',
+    'Wrong size delivered, need a smaller one',
+    'Product does not match the description on the listing',
+    'Received the wrong colour of the item',
+    'Item stopped working after two days of use',
+    'Ordered by mistake, still sealed in original packaging',
+    'Missing parts and accessories in the package',
+]
+
+# Keeps fixture _ids apart from ObjectIds generated at run time
+_USER_TAG = 1
+_RETURN_TAG = 2
+_AUDIT_TAG = 3
+
+
+def _object_id(tag, i, at):
+    """ObjectId derived from (tag, i); sorts by `at` like a generated one"""
+    return ObjectId(struct.pack('>IBxxxI', int(at.timestamp()), tag, i))
+
+
+def user_count(scale):
+    return max(MIN_USERS, SCALES[scale] // RETURNS_PER_USER)
+
+
+def user_id(i, anchor):
+    return _object_id(_USER_TAG, i, anchor - timedelta(days=DAYS))
+
+
+def username(i):
+    return f'bench-user-{i}'
+
+
+def _users(n, anchor, password, kdf):
+    created_at = anchor - timedelta(days=DAYS)
+    yield {
+        '_id': user_id(n, anchor),
+        'username': BENCH_ADMIN,
+        'name': 'Bench Admin',
+        'email': 'bench-admin@example.com',
+        'role': 'admin',
+        'password': password,
+        'password_kdf': kdf,
+        'created_at': created_at
+    }
+    for i in range(n):
+        yield {
+            '_id': user_id(i, anchor),
+            'username': username(i),
+            'name': f'Bench User {i}',
+            'email': f'bench-user-{i}@example.com',
+            'role': 'user',
+            'password': password,
+            'password_kdf': kdf,
+            'created_at': created_at
+        }
+
+
+def _offset(rng):
+    return timedelta(seconds=rng.randrange(DAYS * 86400))
+
+
+def _returns(n, users, anchor, rng):
+    start = anchor - timedelta(days=DAYS)
+    states, weights = zip(*STATE_WEIGHTS)
+    for i in range(n):
+        created_at = start + _offset(rng)
+        doc = {
+            '_id': _object_id(_RETURN_TAG, i, created_at),
+            'user_id': str(user_id(rng.randrange(users), anchor)),
+            'order_id': f'ORD-{i:09d}',
+            'reason': rng.choice(REASONS),
+            'status': 'Pending',
+            'refund_status': REFUND_NOT_INITIATED,
+            'created_at': created_at,
+            'updated_at': created_at
+        }
+        at = created_at
+        for action in rng.choices(states, weights)[0]:
+            transition = TRANSITIONS[action]
+            at = at + timedelta(minutes=rng.randrange(1, 600))
+            doc.update(transition['to'])
+            doc[transition['timestamp']] = at
+            doc['updated_at'] = at
+        if doc['status'] in OPEN_STATUSES:
+            doc['open'] = True
+        yield doc
+
+
+def _audit_logs(n, users, anchor, rng):
+    start = anchor - timedelta(days=DAYS)
+    actions, weights = zip(*AUDIT_WEIGHTS)
+    for i in range(n):
+        at = start + _offset(rng)
+        actor = str(user_id(rng.randrange(users), anchor))
+        action = rng.choices(actions, weights)[0]
+        yield {
+            '_id': _object_id(_AUDIT_TAG, i, at),
+            'action': action,
+            'actor': actor,
+            'details': f'Benchmark {action.lower()}',
+            'target_user': actor,
+            'return_id': None,
+            'timestamp': at
+        }
+
+
+def _insert(collection, docs, total):
+    batch = []
+    inserted = 0
+    started = time.perf_counter()
+    for doc in docs:
+        batch.append(doc)
+        if len(batch) == BATCH:
+            inserted += _flush(collection, batch)
+            batch = []
+            if inserted % (BATCH * 20) == 0:
+                print(f"  {collection.name}: {inserted}/{total} "
+                      f"({inserted / (time.perf_counter() - started):.0f} docs/s)")
+    if batch:
+        inserted += _flush(collection, batch)
+    return inserted
+
+
+def _flush(collection, batch):
+    try:
+        return len(collection.insert_many(batch, ordered=False).inserted_ids)
+    except BulkWriteError as e:
+        return e.details['nInserted']
+
+
+def current_fixture():
+    return db.counters.find_one({'_id': FIXTURE_ID})
+
+
+def seed(scale, seed=1, anchor=None, force=False):
+    """
+    Load a fixture into the configured database, replacing its users,
+    returns, audit entries and derived collections.
+
+    Args:
+        scale: Key of SCALES
+        seed: Random seed
+        anchor: Day the data ends on (defaults to today, UTC)
+        force: Reload even if this exact fixture is already present
+
+    Returns:
+        The fixture description stored in `counters`
+    """
+    now = datetime.utcnow()
+    anchor = anchor or datetime(now.year, now.month, now.day)
+    fixture = {
+        'version': FIXTURE_VERSION,
+        'scale': scale,
+        'seed': seed,
+        'anchor': anchor,
+        'users': user_count(scale),
+        'returns': SCALES[scale],
+        'audit_logs': SCALES[scale],
+    }
+    existing = current_fixture()
+    if existing and not force and all(existing.get(k) == v for k, v in fixture.items()):
+        print(f"✓ Fixture {scale}/seed {seed} already loaded")
+        return existing
+
+    for name in ('users', 'returns', 'audit_logs', 'sessions', 'activity_daily',
+                 'user_risk', 'return_versions', 'counters'):
+        db.drop_collection(name)
+    init_db()
+
+    rng = random.Random(seed)
+    password, kdf = hash_password(BENCH_PASSWORD)
+    started = time.perf_counter()
+    _insert(db.users, _users(fixture['users'], anchor, password, kdf), fixture['users'] + 1)
+    _insert(db.returns, _returns(fixture['returns'], fixture['users'], anchor, rng), fixture['returns'])
+    _insert(db.audit_logs, _audit_logs(fixture['audit_logs'], fixture['users'], anchor, rng),
+            fixture['audit_logs'])
+    print(f"✓ Loaded {fixture['returns']} returns and audit entries in {time.perf_counter() - started:.0f}s")
+
+    reconcile_counters(now)
+    refresh_risk_scores(now)
+    backfill_activity()
+    print("✓ Rebuilt counters, risk scores and activity rollups")
+
+    fixture['loaded_at'] = datetime.utcnow()
+    db.counters.replace_one({'_id': FIXTURE_ID}, fixture, upsert=True)
+    return {'_id': FIXTURE_ID, **fixture}
+
+
+def bench_db_name(scale):
+    return f'return_refund_bench_{scale}'
+
+
+if __name__ == '__main__':
+    from app import create_app
+
+    parser = argparse.ArgumentParser(description='Load a deterministic benchmark dataset')
+    parser.add_argument('--scale', choices=SCALES, default='10k')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--anchor', type=lambda s: datetime.strptime(s, '%Y-%m-%d'),
+                        help='Day the data ends on (YYYY-MM-DD, default today)')
+    parser.add_argument('--db', help='Database name (default return_refund_bench_<scale>)')
+    parser.add_argument('--force', action='store_true', help='Reload even if already present')
+    args = parser.parse_args()
+
+    create_app({
+        'DB_NAME': args.db or bench_db_name(args.scale),
+        'INIT_DB_ON_START': False,
+        'RISK_REFRESH_INTERVAL': 0
+    })
+    seed(args.scale, args.seed, args.anchor, args.force)
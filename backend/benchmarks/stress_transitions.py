@@ -0,0 +1,100 @@
+"""
+Concurrency stress test for Return.transition.
+
+Many threads race to approve, reject and refund the same returns in a
+scratch database on a local mongod. Afterwards every return must have
+been decided exactly once, refunded at most once (and only if approved),
+and have exactly one audit entry per successful transition. Exits
+non-zero on any violation.
+
+    python -m benchmarks.stress_transitions --returns 200 --threads 32
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+from collections import Counter
+from datetime import datetime
+
+os.environ.setdefault('AUDIT_SYNC', '1')
+
+from app import create_app
+from db import db
+from models.transitions import InvalidTransition
+from models.user import Return
+
+BENCH_DB = 'return_refund_stress'
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--returns', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    create_app({'DB_NAME': BENCH_DB, 'RISK_REFRESH_INTERVAL': 0})
+
+    now = datetime.utcnow()
+    ids = [str(oid) for oid in db.returns.insert_many([{
+        'user_id': f'{i:024x}', 'order_id': f'STRESS-{i}', 'reason': 'stress test',
+        'status': 'Pending', 'refund_status': 'Not Initiated',
+        'created_at': now, 'updated_at': now
+    } for i in range(args.returns)]).inserted_ids]
+
+    wins = Counter()
+    lock = threading.Lock()
+    start = threading.Barrier(args.threads)
+
+    def worker(seed):
+        rng = random.Random(seed)
+        start.wait()
+        for _ in range(args.rounds):
+            for return_id in rng.sample(ids, len(ids)):
+                action = rng.choice(('approve', 'reject', 'refund'))
+                try:
+                    Return.transition(return_id, action, f'admin-{seed}')
+                except InvalidTransition:
+                    continue
+                with lock:
+                    wins[(return_id, action)] += 1
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    errors = []
+    audit = Counter(
+        (log['return_id'], log['action'])
+        for log in db.audit_logs.find({'return_id': {'$in': ids}}, {'return_id': 1, 'action': 1})
+    )
+    audit_action = {'approve': 'RETURN_APPROVED', 'reject': 'RETURN_REJECTED', 'refund': 'REFUND_COMPLETED'}
+    for rid in ids:
+        decided = wins[(rid, 'approve')] + wins[(rid, 'reject')]
+        if decided > 1:
+            errors.append(f"{rid}: decided {decided} times")
+        if wins[(rid, 'refund')] > 1:
+            errors.append(f"{rid}: refunded {wins[(rid, 'refund')]} times")
+        if wins[(rid, 'refund')] and not wins[(rid, 'approve')]:
+            errors.append(f"{rid}: refunded without approval")
+        for action, name in audit_action.items():
+            if audit[(rid, name)] != wins[(rid, action)]:
+                errors.append(f"{rid}: {wins[(rid, action)]} {action} wins but {audit[(rid, name)]} audit entries")
+
+    db.client.drop_database(BENCH_DB)
+
+    attempts = args.threads * args.rounds * args.returns
+    print(f"{attempts} transition attempts by {args.threads} threads, {sum(wins.values())} succeeded")
+    if errors:
+        print(f"✗ {len(errors)} violations")
+        for error in errors[:20]:
+            print(f"  {error}")
+        sys.exit(1)
+    print("✓ Every return transitioned at most once per step, audit log consistent")
+
+
+if __name__ == '__main__':
+    main()
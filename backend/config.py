@@ -0,0 +1,88 @@
+import os
+from datetime import timedelta
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value not in (None, '') else default
+
+
+class Config:
+    """Application settings; every value can be overridden from the environment"""
+
+    SECRET_KEY = os.environ.get('SECRET_KEY', 'your-secret-key-change-in-production-12345')
+
+    # Session configuration (server-side, see models/session.py)
+    SESSION_TYPE = 'mongodb'
+    SESSION_CACHE_SIZE = _env_int('SESSION_CACHE_SIZE', 10000)
+    SESSION_CACHE_TTL = float(os.environ.get('SESSION_CACHE_TTL', 2.0))
+    SESSION_REFRESH_SECONDS = _env_int('SESSION_REFRESH_SECONDS', 3600)
+    SESSION_COOKIE_NAME = 'session'
+    SESSION_COOKIE_SAMESITE = None
+    SESSION_COOKIE_SECURE = False
+    SESSION_COOKIE_HTTPONLY = True
+    SESSION_COOKIE_DOMAIN = None
+    PERMANENT_SESSION_LIFETIME = timedelta(hours=24)
+
+    CORS_ORIGINS = ["http://localhost:5173", "http://127.0.0.1:5173"]
+
+    # MongoDB connection
+    MONGO_URL = os.environ.get('MONGO_URL', 'mongodb://localhost:27017/')
+    DB_NAME = os.environ.get('DB_NAME', 'return_refund_db')
+    MONGO_MAX_POOL_SIZE = _env_int('MONGO_MAX_POOL_SIZE', 50)
+    MONGO_MIN_POOL_SIZE = _env_int('MONGO_MIN_POOL_SIZE', 0)
+    MONGO_CONNECT_TIMEOUT_MS = _env_int('MONGO_CONNECT_TIMEOUT_MS', 5000)
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = _env_int('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000)
+    MONGO_SOCKET_TIMEOUT_MS = _env_int('MONGO_SOCKET_TIMEOUT_MS', 10000)
+    MONGO_WRITE_CONCERN = os.environ.get('MONGO_WRITE_CONCERN', 'majority')
+
+    # Collections/indexes are normally created once by the deployment
+    # (python indexes.py or the gunicorn master), not by every worker.
+    INIT_DB_ON_START = os.environ.get('INIT_DB_ON_START', '1') == '1'
+
+    # Optional bearer token required to scrape /api/metrics
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+    # Incremental user_risk rescoring every RISK_REFRESH_INTERVAL seconds
+    # (0 disables), with a full rescore every RISK_FULL_REFRESH_INTERVAL
+    RISK_REFRESH_INTERVAL = _env_int('RISK_REFRESH_INTERVAL', 300)
+    RISK_FULL_REFRESH_INTERVAL = _env_int('RISK_FULL_REFRESH_INTERVAL', 3600)
+
+    # Per-process cache of public user documents (see models/user.py).
+    # USER_CACHE_SYNC_INTERVAL > 0 picks up other workers' writes within
+    # that many seconds; 0 relies on the TTL alone.
+    USER_CACHE_SIZE = _env_int('USER_CACHE_SIZE', 5000)
+    USER_CACHE_TTL = float(os.environ.get('USER_CACHE_TTL', 60.0))
+    USER_CACHE_SYNC_INTERVAL = float(os.environ.get('USER_CACHE_SYNC_INTERVAL', 1.0))
+
+    # Per-process cache of /admin/dashboard results (see models/dashboard.py);
+    # 0 disables it
+    DASHBOARD_CACHE_SIZE = _env_int('DASHBOARD_CACHE_SIZE', 256)
+    DASHBOARD_CACHE_TTL = float(os.environ.get('DASHBOARD_CACHE_TTL', 5.0))
+
+    # /api/events server-sent events (see models/events.py). 'local' only
+    # sees writes made by the same worker; 'changestream' needs a replica set.
+    # Each open stream holds a worker thread for up to EVENTS_MAX_STREAM_SECONDS,
+    # after which the browser reconnects with Last-Event-ID. At most
+    # EVENTS_MAX_STREAMS streams stay open per worker process (503 past it),
+    # so streams cannot take every GUNICORN_THREADS thread.
+    EVENTS_SOURCE = os.environ.get('EVENTS_SOURCE', 'local')
+    EVENTS_BUFFER_SIZE = _env_int('EVENTS_BUFFER_SIZE', 1000)
+    EVENTS_HEARTBEAT_SECONDS = float(os.environ.get('EVENTS_HEARTBEAT_SECONDS', 15.0))
+    EVENTS_MAX_STREAM_SECONDS = float(os.environ.get('EVENTS_MAX_STREAM_SECONDS', 300.0))
+    EVENTS_MAX_STREAMS = _env_int('EVENTS_MAX_STREAMS', 2)
+
+
+def mongo_settings(config):
+    """Pick the MongoDB connection settings out of a Flask config mapping or Config class"""
+    get = config.get if isinstance(config, dict) else lambda key: getattr(config, key)
+    return {
+        'url': get('MONGO_URL'),
+        'db_name': get('DB_NAME'),
+        'max_pool_size': get('MONGO_MAX_POOL_SIZE'),
+        'min_pool_size': get('MONGO_MIN_POOL_SIZE'),
+        'connect_timeout_ms': get('MONGO_CONNECT_TIMEOUT_MS'),
+        'server_selection_timeout_ms': get('MONGO_SERVER_SELECTION_TIMEOUT_MS'),
+        'socket_timeout_ms': get('MONGO_SOCKET_TIMEOUT_MS'),
+        'write_concern': get('MONGO_WRITE_CONCERN'),
+    }
@@ -1,3 +1,17 @@
 STATUS_PENDING = "Pending"
 STATUS_APPROVED = "Approved"
 STATUS_REJECTED = "Rejected"
+
+# A user may have at most one open return per order; open returns carry
+# `open: True`, which the unique partial index user_order_open enforces
+OPEN_STATUSES = (STATUS_PENDING, STATUS_APPROVED)
+
+# Pagination
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Bulk transitions
+BULK_MAX_IDS = 5000
+
+# Admin search
+SEARCH_MAX_QUERY = 200
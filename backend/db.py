@@ -1,31 +1,199 @@
+import os
+import threading
 from pymongo import MongoClient
+from pymongo.monitoring import ConnectionPoolListener
+from config import Config, mongo_settings
+from constants import OPEN_STATUSES
+from indexes import ensure_indexes
 
 # MongoDB connection
-client = MongoClient('mongodb://localhost:27017/')
-db = client['return_refund_db']
+#
+# Clients are created lazily, one per process. A MongoClient must not be
+# carried across fork(), so a worker that inherits one from a pre-fork
+# master simply builds its own on first use.
+_settings = mongo_settings(Config)
+_client = None
+_client_pid = None
+_lock = threading.Lock()
+_listeners = []
+
+
+class PoolStats(ConnectionPoolListener):
+    """Tracks connection pool activity for the health endpoint"""
+
+    def __init__(self):
+        self.open = 0
+        self.checked_out = 0
+        self.created = 0
+        self.checkout_failures = 0
+        self.pool_clears = 0
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self.pool_clears += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self.created += 1
+        self.open += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self.open -= 1
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self.checkout_failures += 1
+
+    def connection_checked_out(self, event):
+        self.checked_out += 1
+
+    def connection_checked_in(self, event):
+        self.checked_out -= 1
+
+    def snapshot(self):
+        return {
+            'open_connections': self.open,
+            'in_use': self.checked_out,
+            'created_total': self.created,
+            'checkout_failures': self.checkout_failures,
+            'pool_clears': self.pool_clears,
+            'max_pool_size': _settings['max_pool_size'],
+            'min_pool_size': _settings['min_pool_size']
+        }
+
+
+pool_stats = None
+
+
+def configure(config, listeners=None):
+    """
+    Set connection settings (and extra pymongo event listeners) for clients
+    created from now on. Drops this process's current client, if any.
+    """
+    global _settings, _listeners
+    with _lock:
+        _settings = mongo_settings(config)
+        if listeners is not None:
+            _listeners = list(listeners)
+    close_client()
+
+
+def _write_concern(value):
+    if not value:
+        return {}
+    return {'w': int(value) if value.isdigit() else value}
+
+
+def client_options(settings, listeners=()):
+    """MongoClient keyword arguments for mongo_settings(); shared with aio/db.py"""
+    return dict(
+        maxPoolSize=settings['max_pool_size'],
+        minPoolSize=settings['min_pool_size'],
+        connectTimeoutMS=settings['connect_timeout_ms'],
+        serverSelectionTimeoutMS=settings['server_selection_timeout_ms'],
+        socketTimeoutMS=settings['socket_timeout_ms'],
+        event_listeners=list(listeners),
+        **_write_concern(settings['write_concern'])
+    )
+
+
+def get_client():
+    """Return this process's MongoClient, creating it on first use"""
+    global _client, _client_pid, pool_stats
+    pid = os.getpid()
+    if _client is not None and _client_pid == pid:
+        return _client
+    with _lock:
+        if _client is None or _client_pid != pid:
+            pool_stats = PoolStats()
+            _client = MongoClient(
+                _settings['url'],
+                **client_options(_settings, [pool_stats] + _listeners)
+            )
+            _client_pid = pid
+    return _client
+
+
+def close_client():
+    """Close this process's client (e.g. in a pre-fork master before forking)"""
+    global _client, _client_pid
+    if _client is not None and _client_pid == os.getpid():
+        _client.close()
+    _client = None
+    _client_pid = None
+
+
+def get_db():
+    """Get database instance"""
+    return get_client()[_settings['db_name']]
+
+
+class _LazyDatabase:
+    """Module-level `db` handle that resolves to this process's database on use"""
+
+    def __getattr__(self, name):
+        return getattr(get_db(), name)
+
+    def __getitem__(self, name):
+        return get_db()[name]
+
+
+class LazyCollection:
+    """Collection handle for long-lived objects that must follow client rebuilds"""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __getattr__(self, attr):
+        return getattr(get_db()[self.name], attr)
+
+
+db = _LazyDatabase()
+
 
 def init_db():
-    """Initialize database and create collections if they don't exist"""
+    """Initialize database, create collections if they don't exist and apply indexes"""
     try:
+        existing = set(db.list_collection_names())
+
         # Create collections
-        if 'users' not in db.list_collection_names():
+        if 'users' not in existing:
             db.create_collection('users')
             print("✓ Created 'users' collection")
-        
-        if 'returns' not in db.list_collection_names():
+
+        if 'returns' not in existing:
             db.create_collection('returns')
             print("✓ Created 'returns' collection")
-        
-        if 'audit_logs' not in db.list_collection_names():
+
+        if 'audit_logs' not in existing:
             db.create_collection('audit_logs')
             print("✓ Created 'audit_logs' collection")
-        
+
+        # Returns written before the `open` flag existed need it before the
+        # unique user_order_open index can see them
+        backfilled = db.returns.update_many(
+            {'status': {'$in': list(OPEN_STATUSES)}, 'open': {'$exists': False}},
+            {'$set': {'open': True}}
+        ).modified_count
+        if backfilled:
+            print(f"✓ Flagged {backfilled} open returns")
+
+        ensure_indexes(db)
+
         print("✓ Database initialized successfully")
         return True
     except Exception as e:
         print(f"✗ Error initializing database: {str(e)}")
         return False
-
-def get_db():
-    """Get database instance"""
-    return db
\ No newline at end of file
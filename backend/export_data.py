@@ -0,0 +1,82 @@
+"""
+Stream returns or audit logs to a CSV / NDJSON file.
+
+    python export_data.py returns --format csv --gzip -o returns.csv.gz
+    python export_data.py audit_logs --format ndjson --action LOGIN_FAILED
+    python export_data.py returns -o part2.csv --cursor <token printed by an interrupted run>
+"""
+import argparse
+import sys
+from db import db
+from models.user import Return
+from models.audit import build_audit_query
+from utils.export import EXPORTS, FORMATS, ExportPosition, export_chunks, select_fields, stream_documents
+from utils.pagination import parse_datetime
+
+
+def build_query(args):
+    if args.collection == 'returns':
+        return Return.build_query(
+            user_id=args.user_id,
+            status=args.status,
+            refund_status=args.refund_status,
+            created_from=parse_datetime(args.date_from),
+            created_to=parse_datetime(args.date_to)
+        )
+    return build_audit_query(
+        action_filter=args.action,
+        actor_filter=args.actor,
+        start=parse_datetime(args.date_from),
+        end=parse_datetime(args.date_to)
+    )
+
+
+def export(args):
+    spec = EXPORTS[args.collection]
+    fields = select_fields(args.fields, spec['fields'])
+    direction = 1 if args.order == 'asc' else -1
+    position = ExportPosition(spec['sort_field'], direction)
+
+    docs = stream_documents(
+        db[args.collection], build_query(args), spec['sort_field'], fields,
+        cursor=args.cursor, direction=direction
+    )
+
+    out = open(args.output, 'wb') if args.output else sys.stdout.buffer
+    try:
+        for chunk in export_chunks(position.track(docs), fields, args.format, args.gzip):
+            out.write(chunk)
+    except (KeyboardInterrupt, Exception) as e:
+        token = position.token()
+        print(f"\n✗ Export stopped after {position.rows} rows: {e!r}", file=sys.stderr)
+        if token:
+            print(f"  Resume with: --cursor {token}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if args.output:
+            out.close()
+
+    print(f"✓ Exported {position.rows} {args.collection}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export returns or audit logs')
+    parser.add_argument('collection', choices=sorted(EXPORTS))
+    parser.add_argument('--format', choices=sorted(FORMATS), default='csv')
+    parser.add_argument('--fields', help='comma-separated field list')
+    parser.add_argument('--gzip', action='store_true')
+    parser.add_argument('--order', choices=['asc', 'desc'], default='desc')
+    parser.add_argument('--cursor', help='resume token from a previous run')
+    parser.add_argument('-o', '--output', help='output file (default stdout)')
+    parser.add_argument('--from', dest='date_from')
+    parser.add_argument('--to', dest='date_to')
+    parser.add_argument('--user-id')
+    parser.add_argument('--status')
+    parser.add_argument('--refund-status')
+    parser.add_argument('--action')
+    parser.add_argument('--actor')
+    export(parser.parse_args())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,31 @@
+"""
+gunicorn settings for running N pre-forked workers:
+
+    WEB_CONCURRENCY=8 gunicorn -c gunicorn.conf.py wsgi:app
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get('BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+worker_class = 'gthread'
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = 30
+
+# Each worker imports the app itself after fork, so no MongoClient,
+# audit writer thread or process pool is ever shared across processes.
+preload_app = False
+
+
+def on_starting(server):
+    """Create collections and indexes once, in the master, then drop its client"""
+    from db import init_db, close_client
+    init_db()
+    close_client()
+
+
+def worker_exit(server, worker):
+    """Flush queued audit entries before a worker goes away"""
+    from models.audit_writer import shutdown_audit_writer
+    shutdown_audit_writer()
@@ -0,0 +1,78 @@
+"""
+Import return requests from a partner CSV / NDJSON feed.
+
+    python import_data.py returns.csv
+    python import_data.py feed.ndjson.gz --errors rejected.ndjson
+    zcat feed.csv.gz | python import_data.py - --format csv
+
+Rows need user_id, order_id and reason. The format and compression are
+taken from the file extension unless --format / --gzip are given. Every
+rejected row is written to --errors as one JSON object per line.
+"""
+import argparse
+import json
+import sys
+from models.audit_writer import shutdown_audit_writer
+from models.imports import ImportReport, import_returns
+from utils.importer import parse_feed
+
+PROGRESS_EVERY = 100_000
+
+
+def detect(path):
+    """(format, compressed) from a file name like feed.ndjson.gz"""
+    name = path.lower()
+    compressed = name.endswith('.gz')
+    if compressed:
+        name = name[:-3]
+    if name.endswith(('.ndjson', '.jsonl')):
+        return 'ndjson', compressed
+    return 'csv', compressed
+
+
+def progress(rows, report):
+    for row in rows:
+        yield row
+        if report.rows % PROGRESS_EVERY == 0:
+            print(f"  {report.rows} rows, {report.inserted} inserted "
+                  f"({report.rows_per_second():.0f} rows/s)", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk import return requests')
+    parser.add_argument('path', help="feed file, or - for stdin")
+    parser.add_argument('--format', choices=['csv', 'ndjson'])
+    parser.add_argument('--gzip', action='store_true', help='feed is gzipped')
+    parser.add_argument('--actor', default='import-cli', help='actor recorded in the audit log')
+    parser.add_argument('--errors', help='write every rejected row to this NDJSON file')
+    args = parser.parse_args()
+
+    fmt, compressed = detect(args.path) if args.path != '-' else ('csv', False)
+    fmt = args.format or fmt
+    compressed = args.gzip or compressed
+
+    errors_out = open(args.errors, 'w', encoding='utf-8') if args.errors else None
+    on_error = (lambda entry: errors_out.write(json.dumps(entry) + '\n')) if errors_out else None
+    report = ImportReport(on_error=on_error)
+
+    stream = sys.stdin.buffer if args.path == '-' else open(args.path, 'rb')
+    try:
+        import_returns(progress(parse_feed(stream, fmt, compressed), report), args.actor, report)
+    except (KeyboardInterrupt, ValueError, OSError, EOFError) as e:
+        report.finish()
+        print(f"\n✗ Import stopped after {report.rows} rows: {e!r}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        stream.close()
+        if errors_out:
+            errors_out.close()
+        shutdown_audit_writer()
+
+    summary = report.to_dict()
+    print(f"✓ Imported {summary['inserted']} of {summary['rows']} rows in {summary['seconds']}s "
+          f"({summary['rows_per_second']:.0f} rows/s): {summary['duplicates']} duplicates, "
+          f"{summary['invalid']} invalid, {summary['failed']} failed", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+"""
+Declarative index registry for the return_refund_db collections.
+
+Run directly to apply indexes (migration) or verify query plans:
+
+    python indexes.py            # create missing indexes
+    python indexes.py --check    # fail if a registered query shape does a COLLSCAN
+"""
+import sys
+from datetime import datetime
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure
+
+# collection -> indexes. Names are explicit so reruns are no-ops.
+INDEXES = {
+    'users': [
+        IndexModel([('username', ASCENDING)], name='username_unique', unique=True),
+    ],
+    'returns': [
+        IndexModel(
+            [('user_id', ASCENDING), ('created_at', DESCENDING), ('_id', DESCENDING)],
+            name='user_created'
+        ),
+        IndexModel(
+            [('created_at', DESCENDING), ('_id', DESCENDING)],
+            name='created'
+        ),
+        IndexModel(
+            [('status', ASCENDING), ('created_at', DESCENDING), ('_id', DESCENDING)],
+            name='status_created'
+        ),
+        # One open (Pending/Approved) return per user and order. Keyed on an
+        # `open: True` flag rather than status because partial indexes only
+        # accept equality/$exists filters on older servers.
+        IndexModel(
+            [('user_id', ASCENDING), ('order_id', ASCENDING)],
+            name='user_order_open',
+            unique=True,
+            partialFilterExpression={'open': True}
+        ),
+        IndexModel(
+            [('created_at', ASCENDING), ('_id', ASCENDING)],
+            name='pending_queue',
+            partialFilterExpression={'status': 'Pending'}
+        ),
+        # Admin search (models/search.py)
+        IndexModel([('reason', TEXT)], name='reason_text'),
+        IndexModel([('order_id', ASCENDING), ('_id', ASCENDING)], name='order_id'),
+    ],
+    'audit_logs': [
+        IndexModel(
+            [('timestamp', DESCENDING), ('_id', DESCENDING)],
+            name='timestamp'
+        ),
+        IndexModel(
+            [('actor', ASCENDING), ('timestamp', DESCENDING), ('_id', DESCENDING)],
+            name='actor_timestamp'
+        ),
+        IndexModel(
+            [('action', ASCENDING), ('timestamp', DESCENDING), ('_id', DESCENDING)],
+            name='action_timestamp'
+        ),
+        IndexModel([('details', TEXT)], name='details_text'),
+    ],
+    'sessions': [
+        IndexModel([('expires_at', ASCENDING)], name='expires_at_ttl', expireAfterSeconds=0),
+        IndexModel([('user_id', ASCENDING)], name='user_id'),
+    ],
+    'activity_daily': [
+        IndexModel([('actor', ASCENDING), ('day', DESCENDING)], name='actor_day'),
+    ],
+    'user_risk': [
+        IndexModel([('user_id', ASCENDING)], name='user_id_unique', unique=True),
+        IndexModel([('score', DESCENDING)], name='score'),
+        IndexModel([('computed_at', ASCENDING)], name='computed_at'),
+    ],
+}
+
+# Hot query shapes issued by the models; each must be answered from an index.
+_SAMPLE_TIME = datetime(2000, 1, 1)
+QUERY_SHAPES = [
+    {
+        'name': 'User.authenticate',
+        'collection': 'users',
+        'filter': {'username': 'x'},
+    },
+    {
+        'name': 'Return.find_by_user',
+        'collection': 'returns',
+        'filter': {'user_id': 'x'},
+        'sort': [('created_at', DESCENDING), ('_id', DESCENDING)],
+    },
+    {
+        'name': 'Return.find_all',
+        'collection': 'returns',
+        'filter': {},
+        'sort': [('created_at', DESCENDING), ('_id', DESCENDING)],
+    },
+    {
+        'name': 'Return.find_all(status)',
+        'collection': 'returns',
+        'filter': {'status': 'Pending'},
+        'sort': [('created_at', DESCENDING), ('_id', DESCENDING)],
+    },
+    {
+        'name': 'Return.get_user_return_count',
+        'collection': 'returns',
+        'filter': {'user_id': 'x', 'created_at': {'$gte': _SAMPLE_TIME}},
+    },
+    {
+        'name': 'refresh_risk_scores window',
+        'collection': 'returns',
+        'filter': {'created_at': {'$gte': _SAMPLE_TIME}},
+    },
+    {
+        'name': 'get_suspicious_users',
+        'collection': 'user_risk',
+        'filter': {'return_count': {'$gte': 5}},
+        'sort': [('score', DESCENDING)],
+    },
+    {
+        'name': 'refresh_risk_scores(incremental) changed users',
+        'collection': 'audit_logs',
+        'filter': {'action': {'$in': ['RETURN_CREATED', 'LOGIN_FAILED']}, 'timestamp': {'$gte': _SAMPLE_TIME}},
+    },
+    {
+        'name': 'get_audit_logs',
+        'collection': 'audit_logs',
+        'filter': {},
+        'sort': [('timestamp', DESCENDING), ('_id', DESCENDING)],
+    },
+    {
+        'name': 'get_audit_logs(actor)',
+        'collection': 'audit_logs',
+        'filter': {'actor': 'x'},
+        'sort': [('timestamp', DESCENDING), ('_id', DESCENDING)],
+    },
+    {
+        'name': 'get_audit_logs(action)',
+        'collection': 'audit_logs',
+        'filter': {'action': 'x'},
+        'sort': [('timestamp', DESCENDING), ('_id', DESCENDING)],
+    },
+    {
+        'name': 'get_user_activity_summary',
+        'collection': 'activity_daily',
+        'filter': {'actor': 'x', 'day': {'$gte': _SAMPLE_TIME}},
+    },
+    {
+        'name': 'search_returns(text)',
+        'collection': 'returns',
+        'filter': {'$text': {'$search': 'x'}, 'status': 'Pending'},
+    },
+    {
+        'name': 'search_returns(order_prefix)',
+        'collection': 'returns',
+        'filter': {'order_id': {'$gte': 'x', '$lt': 'y'}},
+        'sort': [('order_id', ASCENDING), ('_id', ASCENDING)],
+    },
+    {
+        'name': 'search_audit_logs',
+        'collection': 'audit_logs',
+        'filter': {'$text': {'$search': 'x'}},
+    },
+    {
+        'name': 'get_system_stats logins',
+        'collection': 'audit_logs',
+        'filter': {'action': 'LOGIN_SUCCESS', 'timestamp': {'$gte': _SAMPLE_TIME}},
+    },
+]
+
+
+def ensure_indexes(database):
+    """
+    Create every registered index. Safe to run repeatedly: existing indexes
+    with the same name and spec are left alone.
+    """
+    for collection, indexes in INDEXES.items():
+        try:
+            names = database[collection].create_indexes(indexes)
+            print(f"✓ Indexes on '{collection}': {', '.join(names)}")
+        except OperationFailure as e:
+            # Usually an index with the same name but a different spec;
+            # needs a manual drop before the new definition can apply.
+            print(f"✗ Error creating indexes on '{collection}': {str(e)}")
+            raise
+
+
+def _plan_stages(plan):
+    """Yield every stage name in an explain() plan tree"""
+    if isinstance(plan, dict):
+        if 'stage' in plan:
+            yield plan['stage']
+        for value in plan.values():
+            yield from _plan_stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from _plan_stages(item)
+
+
+def check_query_plans(database):
+    """
+    Explain every registered query shape.
+
+    Returns:
+        List of shape names whose winning plan contains a COLLSCAN
+    """
+    failures = []
+    for shape in QUERY_SHAPES:
+        cursor = database[shape['collection']].find(shape['filter'])
+        if shape.get('sort'):
+            cursor = cursor.sort(shape['sort'])
+        winning_plan = cursor.explain()['queryPlanner']['winningPlan']
+        if 'COLLSCAN' in set(_plan_stages(winning_plan)):
+            failures.append(shape['name'])
+    return failures
+
+
+if __name__ == '__main__':
+    from db import db, init_db
+
+    init_db()
+
+    if '--check' in sys.argv[1:]:
+        failures = check_query_plans(db)
+        for name in failures:
+            print(f"✗ COLLSCAN: {name}")
+        if failures:
+            sys.exit(1)
+        print(f"✓ All {len(QUERY_SHAPES)} query shapes use an index")
@@ -0,0 +1,197 @@
+"""
+Per-user daily activity rollups.
+
+Every audit entry bumps one counter in `activity_daily`:
+
+    {
+        '_id': '<actor>|2026-01-02',
+        'actor': '<actor>',
+        'day': datetime(2026, 1, 2),
+        'counts': {'LOGIN_SUCCESS': 3, 'RETURN_CREATED': 1, ...}
+    }
+
+The audit writer calls record_activity() after each batch it stores, so
+get_user_activity_summary() sums at most `days` small documents instead
+of grouping raw audit_logs. Rollups outlive the audit hot window (see
+models.audit_archive), so summaries keep working for archived days.
+
+Counts can drift if a rollup update fails after its audit batch was
+stored. Rebuild them from audit_logs with:
+
+    python -m models.activity            # every day still in audit_logs
+    python -m models.activity --days 7   # just the last week
+
+Flags are raised by ACTIVITY_RULES, overridable with a JSON list in the
+ACTIVITY_RULES environment variable.
+"""
+import argparse
+import json
+import os
+from datetime import datetime, timedelta
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+from db import db
+
+DEFAULT_RULES = [
+    {
+        'action': 'RETURN_CREATED',
+        'threshold': 10,
+        'message': 'High return volume: {count} returns in {days} days'
+    },
+    {
+        'action': 'LOGIN_FAILED',
+        'threshold': 5,
+        'message': 'Multiple failed logins: {count} attempts'
+    },
+]
+
+
+def load_rules():
+    """Flag rules from ACTIVITY_RULES (JSON), falling back to DEFAULT_RULES"""
+    raw = os.environ.get('ACTIVITY_RULES')
+    if not raw:
+        return DEFAULT_RULES
+    rules = json.loads(raw)
+    for rule in rules:
+        missing = {'action', 'threshold', 'message'} - set(rule)
+        if missing:
+            raise ValueError(f"Activity rule {rule} is missing {', '.join(sorted(missing))}")
+    return rules
+
+
+ACTIVITY_RULES = load_rules()
+
+
+def _day(at):
+    return datetime(at.year, at.month, at.day)
+
+
+def _rollup_id(actor, day):
+    return f"{actor}|{day.strftime('%Y-%m-%d')}"
+
+
+def record_activity(entries):
+    """Add a batch of stored audit entries to the daily rollups"""
+    increments = {}
+    for entry in entries:
+        day = _day(entry['timestamp'])
+        key = (entry['actor'], day)
+        counts = increments.setdefault(key, {})
+        counts[entry['action']] = counts.get(entry['action'], 0) + 1
+
+    operations = [
+        UpdateOne(
+            {'_id': _rollup_id(actor, day)},
+            {
+                '$setOnInsert': {'actor': actor, 'day': day},
+                '$inc': {f'counts.{action}': n for action, n in counts.items()}
+            },
+            upsert=True
+        )
+        for (actor, day), counts in increments.items()
+    ]
+    if not operations:
+        return
+    # Like the system counters, rollups never fail the audit write that
+    # triggered them; drift is repaired by backfill_activity().
+    try:
+        db.activity_daily.bulk_write(operations, ordered=False)
+    except PyMongoError as e:
+        print(f"✗ Activity rollup update failed: {str(e)}")
+
+
+def backfill_activity(since=None):
+    """
+    Rebuild rollups from audit_logs, replacing every (actor, day) found.
+
+    Days that have already been archived out of audit_logs are left as
+    they are.
+
+    Args:
+        since: Only rebuild days from this datetime on (defaults to all)
+
+    Returns:
+        Number of rollup documents written
+    """
+    match = {'timestamp': {'$gte': _day(since)}} if since else {}
+    pipeline = [
+        {'$match': match},
+        {'$group': {
+            '_id': {
+                'actor': '$actor',
+                'day': {'$dateToString': {'format': '%Y-%m-%d', 'date': '$timestamp'}},
+                'action': '$action'
+            },
+            'n': {'$sum': 1}
+        }},
+        {'$group': {
+            '_id': {'actor': '$_id.actor', 'day': '$_id.day'},
+            'counts': {'$push': {'k': '$_id.action', 'v': '$n'}}
+        }},
+        {'$project': {
+            '_id': {'$concat': [{'$toString': '$_id.actor'}, '|', '$_id.day']},
+            'actor': '$_id.actor',
+            'day': {'$dateFromString': {'dateString': '$_id.day', 'format': '%Y-%m-%d'}},
+            'counts': {'$arrayToObject': '$counts'}
+        }},
+        {'$merge': {'into': 'activity_daily', 'whenMatched': 'replace', 'whenNotMatched': 'insert'}}
+    ]
+    db.audit_logs.aggregate(pipeline)
+
+    query = {'day': {'$gte': _day(since)}} if since else {}
+    return db.activity_daily.count_documents(query)
+
+
+def activity_query(actor, days, now=None):
+    """Filter selecting the last `days` daily rollups (today included) for one actor"""
+    since = _day(now or datetime.utcnow()) - timedelta(days=days - 1)
+    return {'actor': actor, 'day': {'$gte': since}}
+
+
+def sum_counts(docs):
+    totals = {}
+    for doc in docs:
+        for action, n in doc.get('counts', {}).items():
+            totals[action] = totals.get(action, 0) + n
+    return totals
+
+
+def activity_counts(actor, days, now=None):
+    """Sum the per-action counts of the last `days` daily rollups for one actor"""
+    return sum_counts(db.activity_daily.find(activity_query(actor, days, now), {'counts': 1}))
+
+
+def activity_summary(actor, days, counts, risk=None):
+    """
+    The /admin/user-activity payload for summed rollup counts and the
+    user's stored risk score (see models.risk), if any
+    """
+    flags = evaluate_rules(counts, days)
+    return {
+        'user_id': actor,
+        'period_days': days,
+        'activity_summary': counts,
+        'flags': flags,
+        'risk': risk,
+        'is_suspicious': len(flags) > 0 or (risk is not None and risk['risk_level'] == 'HIGH')
+    }
+
+
+def evaluate_rules(summary, days, rules=None):
+    """Return the flag messages of every rule whose count exceeds its threshold"""
+    flags = []
+    for rule in ACTIVITY_RULES if rules is None else rules:
+        count = summary.get(rule['action'], 0)
+        if count > rule['threshold']:
+            flags.append(rule['message'].format(count=count, days=days, threshold=rule['threshold']))
+    return flags
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Rebuild per-user daily activity rollups')
+    parser.add_argument('--days', type=int, help='Only rebuild the last N days')
+    args = parser.parse_args()
+
+    since = datetime.utcnow() - timedelta(days=args.days) if args.days else None
+    written = backfill_activity(since)
+    print(f"✓ Activity rollups rebuilt: {written} user-days")
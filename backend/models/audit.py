@@ -1,6 +1,12 @@
 from db import db
 from datetime import datetime
-from bson import ObjectId
+from models.activity import activity_counts, activity_summary
+from models.audit_archive import load_manifest, read_archive
+from models.audit_writer import get_audit_writer
+from models.counters import read_system_stats
+from models.risk import top_risk_users, user_risk
+from models.user import User
+from utils.pagination import clamp_limit, date_range, encode_cursor, paginate
 
 def log_action(action, actor, details="", target_user=None, return_id=None):
     """
@@ -13,29 +19,31 @@ def log_action(action, actor, details="", target_user=None, return_id=None):
         target_user: User ID affected by the action (optional)
         return_id: Return request ID affected (optional)
     """
-    audit_entry = {
+    audit_entry = audit_record(action, actor, details, target_user, return_id)
+    
+    # Batched and written off the request thread (see models.audit_writer)
+    get_audit_writer().write(audit_entry)
+
+
+def audit_record(action, actor, details="", target_user=None, return_id=None, timestamp=None):
+    """Build an audit_logs document"""
+    return {
         "action": action,
         "actor": actor,
         "details": details,
-        "timestamp": datetime.utcnow(),
+        "timestamp": timestamp or datetime.utcnow(),
         "target_user": target_user,
         "return_id": return_id
     }
-    
-    db.audit_logs.insert_one(audit_entry)
-    print(f"[AUDIT] {action} by {actor}: {details}")
 
 
-def get_audit_logs(limit=100, skip=0, action_filter=None, actor_filter=None):
-    """
-    Retrieve audit logs with optional filtering
-    
-    Args:
-        limit: Maximum number of logs to return
-        skip: Number of logs to skip (for pagination)
-        action_filter: Filter by action type
-        actor_filter: Filter by actor user ID
-    """
+def log_actions(entries):
+    """Record several audit entries built with audit_record() in one batch"""
+    get_audit_writer().write_many(entries)
+
+
+def build_audit_query(action_filter=None, actor_filter=None, start=None, end=None):
+    """Build an audit_logs filter from optional criteria"""
     query = {}
     
     if action_filter:
@@ -43,10 +51,49 @@ def get_audit_logs(limit=100, skip=0, action_filter=None, actor_filter=None):
     
     if actor_filter:
         query['actor'] = actor_filter
+
+    timestamp = date_range(start, end)
+    if timestamp:
+        query['timestamp'] = timestamp
+
+    return query
+
+
+def get_audit_logs(limit=100, cursor=None, action_filter=None, actor_filter=None,
+                   start=None, end=None, order='desc'):
+    """
+    Retrieve one page of audit logs with optional filtering
     
-    logs = db.audit_logs.find(query).sort('timestamp', -1).skip(skip).limit(limit)
-    
-    return [{
+    Args:
+        limit: Maximum number of logs to return (capped at MAX_PAGE_SIZE)
+        cursor: Continuation token from a previous page
+        action_filter: Filter by action type
+        actor_filter: Filter by actor user ID
+        start: Only include logs at or after this datetime
+        end: Only include logs before this datetime
+        order: 'desc' for newest first, 'asc' for oldest first
+
+    Entries older than the hot window are read from the archive (see
+    models.audit_archive) once a page reaches past it.
+
+    Returns:
+        (logs, next_cursor)
+    """
+    query = build_audit_query(action_filter, actor_filter, start, end)
+    direction = -1 if order == 'desc' else 1
+    logs, next_cursor = paginate(
+        db.audit_logs, query, 'timestamp',
+        limit=limit, cursor=cursor, direction=direction
+    )
+    if reaches_archive(start, end):
+        logs, next_cursor = merge_archive(logs, next_cursor, query, limit, cursor, direction)
+    
+    return [audit_log_dict(log) for log in logs], next_cursor
+
+
+def audit_log_dict(log):
+    """Shape an audit_logs document for the API"""
+    return {
         '_id': str(log['_id']),
         'action': log['action'],
         'actor': log['actor'],
@@ -54,138 +101,107 @@ def get_audit_logs(limit=100, skip=0, action_filter=None, actor_filter=None):
         'timestamp': log['timestamp'].isoformat() if log['timestamp'] else None,
         'target_user': log.get('target_user'),
         'return_id': log.get('return_id')
-    } for log in logs]
+    }
+
+
+def reaches_archive(start, end):
+    """True if [start, end) overlaps anything that has been archived"""
+    manifest = load_manifest()
+    if not manifest.get('partitions'):
+        return False
+    # archived_before is unset only while the first archive run is in
+    # progress; treat the archive as reaching everything until then.
+    archived_before = manifest.get('archived_before')
+    if start and archived_before and start >= datetime.fromisoformat(archived_before):
+        return False
+    if end is None:
+        return True
+    return min(manifest['partitions']) <= end.strftime('%Y-%m-%d')
+
+
+def merge_archive(logs, next_cursor, query, limit, cursor, direction):
+    """
+    Merge one page of hot entries with archived ones.
+
+    When the hot page is full, archived entries only matter if they sort
+    before its last entry, so the archive is read up to that point.
+
+    If the archive read stops at its day budget, nothing past the day it
+    stopped at can be ordered yet, so the page ends there (possibly
+    short, or empty) and the cursor resumes from that day.
+    """
+    limit = clamp_limit(limit)
+    bound = logs[-1]['timestamp'] if next_cursor else None
+    archived, resume = read_archive(query, limit + 1, cursor=cursor, direction=direction, bound=bound)
+    if not archived and resume is None:
+        return logs, next_cursor
+
+    merged = sorted(logs + archived, key=lambda log: (log['timestamp'], log['_id']), reverse=direction < 0)
+    if resume is not None:
+        merged = [
+            log for log in merged
+            if ((log['timestamp'], log['_id']) > resume) == (direction < 0)
+        ]
+    more = next_cursor is not None or resume is not None or len(merged) > limit
+    full = len(merged) >= limit
+    merged = merged[:limit]
+    if more:
+        if full or resume is None:
+            last = merged[-1]
+            next_cursor = encode_cursor(last['timestamp'], last['_id'], direction)
+        else:
+            next_cursor = encode_cursor(resume[0], resume[1], direction)
+    return merged, next_cursor
 
 
 def get_user_activity_summary(user_id, days=30):
     """
     Get summary of user activity for suspicious behavior detection
+
+    Sums the per-day rollups in activity_daily (see models.activity)
+    instead of grouping raw audit logs, flags the user with the
+    configured ACTIVITY_RULES and attaches their stored risk score.
     
     Args:
         user_id: User ID to analyze
         days: Number of days to look back
     """
-    from datetime import timedelta
-    cutoff_date = datetime.utcnow() - timedelta(days=days)
-    
-    # Count different action types
-    pipeline = [
-        {
-            '$match': {
-                'actor': user_id,
-                'timestamp': {'$gte': cutoff_date}
-            }
-        },
-        {
-            '$group': {
-                '_id': '$action',
-                'count': {'$sum': 1}
-            }
-        }
-    ]
-    
-    results = list(db.audit_logs.aggregate(pipeline))
-    
-    summary = {result['_id']: result['count'] for result in results}
-    
-    # Flag suspicious behavior
-    flags = []
-    
-    if summary.get('RETURN_CREATED', 0) > 10:
-        flags.append(f"High return volume: {summary['RETURN_CREATED']} returns in {days} days")
-    
-    if summary.get('LOGIN_FAILED', 0) > 5:
-        flags.append(f"Multiple failed logins: {summary['LOGIN_FAILED']} attempts")
-    
-    return {
-        'user_id': user_id,
-        'period_days': days,
-        'activity_summary': summary,
-        'flags': flags,
-        'is_suspicious': len(flags) > 0
-    }
+    risk = user_risk(user_id)
+    if risk:
+        with_current_names([risk])
+    return activity_summary(user_id, days, activity_counts(user_id, days), risk)
 
 
 def get_system_stats():
     """
-    Get overall system statistics
+    Get overall system statistics from the incrementally maintained
+    counters document (see models.counters)
     """
-    total_users = db.users.count_documents({})
-    total_returns = db.returns.count_documents({})
-    pending_returns = db.returns.count_documents({'status': 'Pending'})
-    approved_returns = db.returns.count_documents({'status': 'Approved'})
-    rejected_returns = db.returns.count_documents({'status': 'Rejected'})
-    
-    # Get recent activity count (last 24 hours)
-    from datetime import timedelta
-    yesterday = datetime.utcnow() - timedelta(hours=24)
-    
-    recent_returns = db.returns.count_documents({
-        'created_at': {'$gte': yesterday}
-    })
-    
-    recent_logins = db.audit_logs.count_documents({
-        'action': 'LOGIN_SUCCESS',
-        'timestamp': {'$gte': yesterday}
-    })
-    
-    return {
-        'total_users': total_users,
-        'total_returns': total_returns,
-        'pending_returns': pending_returns,
-        'approved_returns': approved_returns,
-        'rejected_returns': rejected_returns,
-        'returns_last_24h': recent_returns,
-        'logins_last_24h': recent_logins
-    }
+    return read_system_stats()
 
 
-def get_suspicious_users(threshold=5):
+def get_suspicious_users(threshold=5, limit=100):
     """
     Identify users with suspicious return patterns
     
+    Reads the materialized 30-day scores in user_risk (see models.risk),
+    highest score first, rather than aggregating the returns collection
+    per request. Usernames and names come from the user cache, so they
+    are current rather than as of the last refresh.
+    
     Args:
         threshold: Minimum number of returns to be flagged as suspicious
+        limit: Maximum number of users to return
     """
-    from datetime import timedelta
-    last_30_days = datetime.utcnow() - timedelta(days=30)
-    
-    pipeline = [
-        {
-            '$match': {
-                'created_at': {'$gte': last_30_days}
-            }
-        },
-        {
-            '$group': {
-                '_id': '$user_id',
-                'return_count': {'$sum': 1},
-                'orders': {'$addToSet': '$order_id'}
-            }
-        },
-        {
-            '$match': {
-                'return_count': {'$gte': threshold}
-            }
-        },
-        {
-            '$sort': {'return_count': -1}
-        }
-    ]
-    
-    results = list(db.returns.aggregate(pipeline))
-    
-    suspicious_users = []
-    for result in results:
-        user = db.users.find_one({'_id': ObjectId(result['_id'])})
-        if user:
-            suspicious_users.append({
-                'user_id': result['_id'],
-                'username': user.get('username'),
-                'name': user.get('name'),
-                'return_count': result['return_count'],
-                'unique_orders': len(result['orders']),
-                'risk_level': 'HIGH' if result['return_count'] > 10 else 'MEDIUM'
-            })
-    
-    return suspicious_users
\ No newline at end of file
+    return with_current_names(top_risk_users(threshold, limit))
+
+
+def with_current_names(users):
+    """Overlay current username / name on risk_user() dicts (read through the user cache)"""
+    current = User.find_public(u['user_id'] for u in users)
+    for u in users:
+        user_data = current.get(u['user_id'])
+        if user_data:
+            u['username'] = user_data.get('username')
+            u['name'] = user_data.get('name')
+    return users
@@ -0,0 +1,349 @@
+"""
+Audit log retention.
+
+Only the last AUDIT_HOT_DAYS days of audit entries stay in the
+`audit_logs` collection. Older entries are moved into gzipped NDJSON
+files, one partition per UTC day, under AUDIT_ARCHIVE_DIR:
+
+    audit_archive/
+        manifest.json
+        2026/01/audit-2026-01-02.ndjson.gz
+        2026/01/audit-2026-01-02.1.ndjson.gz   (entries that arrived late)
+
+manifest.json lists every file with its entry count, per-action counts,
+first/last timestamp and sha256, plus `archived_before`: everything older than that
+instant has been moved out of Mongo. A file is written and fsynced, then
+the manifest is updated, and only then are its entries deleted from
+Mongo, so an interrupted run never loses entries; at worst a rerun
+archives some of them twice, and readers drop the repeats by _id.
+
+A single request decompresses at most AUDIT_ARCHIVE_SCAN_DAYS days; a
+page that runs out of that budget comes back short with a cursor that
+resumes at the next unread day.
+
+get_audit_logs() reads archived partitions transparently when a page
+reaches past the hot window. Every worker serving that endpoint needs the
+archive directory (shared volume) for that to work.
+
+Run from cron, e.g. nightly:
+
+    python -m models.audit_archive              # archive, then report
+    python -m models.audit_archive --verify     # check every file's checksum
+"""
+import gzip
+import hashlib
+import json
+import os
+import sys
+import threading
+from datetime import datetime, timedelta
+from bson import ObjectId
+from db import db
+from utils.export import EXPORTS, chunked, gzipped, ndjson_lines
+from utils.pagination import decode_cursor
+
+AUDIT_HOT_DAYS = int(os.environ.get('AUDIT_HOT_DAYS', 90))
+AUDIT_ARCHIVE_DIR = os.environ.get(
+    'AUDIT_ARCHIVE_DIR', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'audit_archive'))
+AUDIT_ARCHIVE_SCAN_DAYS = int(os.environ.get('AUDIT_ARCHIVE_SCAN_DAYS', 31))
+
+MANIFEST = 'manifest.json'
+FIELDS = EXPORTS['audit_logs']['fields']
+DELETE_BATCH = 1000
+ONE_DAY = timedelta(days=1)
+MIN_ID = ObjectId('0' * 24)
+
+_manifest_cache = {}
+_manifest_lock = threading.Lock()
+
+
+def _day(at):
+    return datetime(at.year, at.month, at.day)
+
+
+def _day_key(day):
+    return day.strftime('%Y-%m-%d')
+
+
+def load_manifest(archive_dir=None):
+    """Read the archive manifest (cached until the file changes)"""
+    path = os.path.join(archive_dir or AUDIT_ARCHIVE_DIR, MANIFEST)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return {'archived_before': None, 'partitions': {}}
+    with _manifest_lock:
+        cached = _manifest_cache.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+    with open(path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    with _manifest_lock:
+        _manifest_cache[path] = (mtime, manifest)
+    return manifest
+
+
+def _save_manifest(archive_dir, manifest):
+    path = os.path.join(archive_dir, MANIFEST)
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _write_partition(archive_dir, day, docs, part):
+    """
+    Write one day's documents to a new gzipped NDJSON file.
+
+    Returns:
+        (manifest file entry, list of archived _ids)
+    """
+    relative = os.path.join(
+        day.strftime('%Y'), day.strftime('%m'),
+        f"audit-{_day_key(day)}{'' if part == 0 else f'.{part}'}.ndjson.gz"
+    )
+    path = os.path.join(archive_dir, relative)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    ids = []
+    actions = {}
+    first = last = None
+
+    def track():
+        nonlocal first, last
+        for doc in docs:
+            ids.append(doc['_id'])
+            actions[doc.get('action')] = actions.get(doc.get('action'), 0) + 1
+            first = first or doc['timestamp']
+            last = doc['timestamp']
+            yield doc
+
+    digest = hashlib.sha256()
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        for chunk in gzipped(chunked(ndjson_lines(track(), FIELDS))):
+            digest.update(chunk)
+            f.write(chunk)
+        f.flush()
+        os.fsync(f.fileno())
+
+    if not ids:
+        os.remove(tmp)
+        return None, ids
+    os.replace(tmp, path)
+    return {
+        'file': relative,
+        'count': len(ids),
+        'actions': actions,
+        'first': first.isoformat(),
+        'last': last.isoformat(),
+        'sha256': digest.hexdigest()
+    }, ids
+
+
+def archive_audit_logs(now=None, hot_days=None, archive_dir=None):
+    """
+    Move audit entries older than the hot window into daily archive files.
+
+    Args:
+        now: Reference time (defaults to utcnow)
+        hot_days: Days of entries to keep in Mongo (defaults to AUDIT_HOT_DAYS)
+        archive_dir: Archive location (defaults to AUDIT_ARCHIVE_DIR)
+
+    Returns:
+        Number of entries archived
+    """
+    archive_dir = archive_dir or AUDIT_ARCHIVE_DIR
+    hot_days = AUDIT_HOT_DAYS if hot_days is None else hot_days
+    cutoff = _day((now or datetime.utcnow()) - timedelta(days=hot_days))
+    os.makedirs(archive_dir, exist_ok=True)
+
+    manifest = dict(load_manifest(archive_dir))
+    partitions = {key: list(files) for key, files in manifest.get('partitions', {}).items()}
+
+    archived = 0
+    while True:
+        oldest = db.audit_logs.find_one(
+            {'timestamp': {'$lt': cutoff}}, {'timestamp': 1}, sort=[('timestamp', 1), ('_id', 1)])
+        if oldest is None:
+            break
+
+        day = _day(oldest['timestamp'])
+        key = _day_key(day)
+        docs = (
+            db.audit_logs
+            .find({'timestamp': {'$gte': day, '$lt': min(day + ONE_DAY, cutoff)}})
+            .sort([('timestamp', 1), ('_id', 1)])
+            .batch_size(1000)
+        )
+        entry, ids = _write_partition(archive_dir, day, docs, len(partitions.get(key, [])))
+        if entry is None:
+            continue
+
+        partitions.setdefault(key, []).append(entry)
+        manifest['partitions'] = partitions
+        # Everything before the end of this day is now in the archive
+        # (days are archived oldest first), so readers can rely on
+        # archived_before even if this run is interrupted.
+        archived_before = min(day + ONE_DAY, cutoff).isoformat()
+        if (manifest.get('archived_before') or '') < archived_before:
+            manifest['archived_before'] = archived_before
+        _save_manifest(archive_dir, manifest)
+
+        for i in range(0, len(ids), DELETE_BATCH):
+            db.audit_logs.delete_many({'_id': {'$in': ids[i:i + DELETE_BATCH]}})
+        archived += len(ids)
+        print(f"✓ Archived {len(ids)} audit entries for {key}")
+
+    if (manifest.get('archived_before') or '') < cutoff.isoformat():
+        manifest['partitions'] = partitions
+        manifest['archived_before'] = cutoff.isoformat()
+        _save_manifest(archive_dir, manifest)
+    return archived
+
+
+def _read_file(path):
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            doc = json.loads(line)
+            doc['_id'] = ObjectId(doc['_id'])
+            doc['timestamp'] = datetime.fromisoformat(doc['timestamp'])
+            yield doc
+
+
+def _matches(doc, query):
+    for field, condition in query.items():
+        if field == 'timestamp':
+            if '$gte' in condition and doc['timestamp'] < condition['$gte']:
+                return False
+            if '$lt' in condition and doc['timestamp'] >= condition['$lt']:
+                return False
+        elif doc.get(field) != condition:
+            return False
+    return True
+
+
+def read_archive(query, limit, cursor=None, direction=-1, bound=None, archive_dir=None,
+                 scan_days=None):
+    """
+    Read archived entries matching a build_audit_query() filter, in
+    (timestamp, _id) order, starting after `cursor`.
+
+    Partitions are read one day at a time in sort order and reading stops
+    as soon as `limit` entries are collected, so a page touches only the
+    days it needs. Files whose manifest entry shows no entries for the
+    requested action are skipped unread, and at most `scan_days` days are
+    decompressed; when that budget runs out first, the position after the
+    last day read is returned so the caller can resume from there.
+
+    Args:
+        query: Filter from build_audit_query (equality on action/actor,
+            optional timestamp range)
+        limit: Maximum number of entries to return
+        cursor: Continuation token from get_audit_logs (optional)
+        direction: -1 for newest first, 1 for oldest first
+        bound: Skip days entirely past this timestamp in sort order (optional)
+        archive_dir: Archive location (defaults to AUDIT_ARCHIVE_DIR)
+        scan_days: Most days to decompress (defaults to AUDIT_ARCHIVE_SCAN_DAYS)
+
+    Returns:
+        (entries, resume) where resume is the (timestamp, _id) position
+        after the last day read when the scan budget ran out, else None
+    """
+    archive_dir = archive_dir or AUDIT_ARCHIVE_DIR
+    scan_days = AUDIT_ARCHIVE_SCAN_DAYS if scan_days is None else scan_days
+    partitions = load_manifest(archive_dir).get('partitions', {})
+    if not partitions:
+        return [], None
+
+    after = decode_cursor(cursor, direction) if cursor else None
+
+    # Inclusive timestamp window used only to skip whole days; exact
+    # filtering happens per entry below.
+    timestamp = query.get('timestamp', {})
+    lows = [timestamp.get('$gte')]
+    highs = [timestamp.get('$lt')]
+    for point, is_low in ((bound, direction < 0), (after and after[0], direction > 0)):
+        (lows if is_low else highs).append(point)
+    low = max((t for t in lows if t), default=None)
+    high = min((t for t in highs if t), default=None)
+
+    found = []
+    scanned = 0
+    last_day = None
+    for key in sorted(partitions, reverse=direction < 0):
+        day = datetime.strptime(key, '%Y-%m-%d')
+        if (low and day + ONE_DAY <= low) or (high and day > high):
+            continue
+        entries = [
+            entry for entry in partitions[key]
+            if 'action' not in query or query['action'] in entry.get('actions', {query['action']: 1})
+        ]
+        if not entries:
+            continue
+        if scanned and scanned >= scan_days:
+            resume = last_day if direction < 0 else last_day + ONE_DAY
+            return found[:limit], (resume, MIN_ID)
+        scanned += 1
+        last_day = day
+
+        docs = {}
+        for entry in entries:
+            for doc in _read_file(os.path.join(archive_dir, entry['file'])):
+                if _matches(doc, query):
+                    docs[doc['_id']] = doc
+        ordered = sorted(docs.values(), key=lambda d: (d['timestamp'], d['_id']), reverse=direction < 0)
+        for doc in ordered:
+            if after is not None:
+                position = (doc['timestamp'], doc['_id'])
+                if (direction < 0 and position >= after) or (direction > 0 and position <= after):
+                    continue
+            found.append(doc)
+        if len(found) >= limit:
+            break
+    return found[:limit], None
+
+
+def verify_archive(archive_dir=None):
+    """
+    Recompute every archived file's checksum and entry count.
+
+    Returns:
+        List of problems (empty when the archive is intact)
+    """
+    archive_dir = archive_dir or AUDIT_ARCHIVE_DIR
+    problems = []
+    for key, files in sorted(load_manifest(archive_dir).get('partitions', {}).items()):
+        for entry in files:
+            path = os.path.join(archive_dir, entry['file'])
+            if not os.path.exists(path):
+                problems.append(f"{entry['file']}: missing")
+                continue
+            digest = hashlib.sha256()
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(block)
+            if digest.hexdigest() != entry['sha256']:
+                problems.append(f"{entry['file']}: checksum mismatch")
+                continue
+            count = sum(1 for _ in _read_file(path))
+            if count != entry['count']:
+                problems.append(f"{entry['file']}: {count} entries, manifest says {entry['count']}")
+    return problems
+
+
+if __name__ == '__main__':
+    if '--verify' in sys.argv[1:]:
+        problems = verify_archive()
+        for problem in problems:
+            print(f"✗ {problem}")
+        if problems:
+            sys.exit(1)
+        print("✓ Audit archive intact")
+    else:
+        count = archive_audit_logs()
+        manifest = load_manifest()
+        print(f"✓ Archived {count} audit entries; "
+              f"{len(manifest['partitions'])} days archived before {manifest['archived_before']}")
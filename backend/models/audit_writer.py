@@ -0,0 +1,395 @@
+"""
+Background audit log pipeline.
+
+log_action() hands entries to an AuditWriter instead of inserting them on
+the request thread. A daemon thread drains a bounded queue and writes with
+insert_many once BATCH_SIZE entries are waiting or FLUSH_INTERVAL seconds
+have passed. When the queue is full the backpressure policy decides:
+
+    block  - the request thread waits for room
+    drop   - the entry is discarded and counted
+    spill  - the entry is appended to a local NDJSON file and replayed
+             into Mongo on the next start or shutdown
+
+Failed batches are spilled too. If the spill file cannot be written
+either, the entries are dropped and counted so the flusher thread (and
+every request blocked on a full queue) keeps going.
+
+Every worker process may share one spill path, so appends and the moves
+done by a replay hold an flock on `<spill_path>.lock`. A replay claims
+the file under a name of its own before inserting it, and gives it back
+to `<spill_path>.replay` if the insert fails; files claimed by a process
+that died mid-replay are picked up by the next one.
+
+Configured from the environment (AUDIT_SYNC, AUDIT_BATCH_SIZE,
+AUDIT_FLUSH_INTERVAL, AUDIT_QUEUE_SIZE, AUDIT_BACKPRESSURE,
+AUDIT_SPILL_PATH). AUDIT_SYNC=1 writes inline, which is what tests want.
+
+Listeners are called with every list of entries once it is stored (the
+process-wide writer feeds models.activity rollups this way). Entries that
+landed from a batch that then failed are not reported.
+"""
+import atexit
+import fcntl
+import glob
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from bson import json_util
+from pymongo.errors import BulkWriteError, PyMongoError
+
+BACKPRESSURE_BLOCK = 'block'
+BACKPRESSURE_DROP = 'drop'
+BACKPRESSURE_SPILL = 'spill'
+
+DUPLICATE_KEY = 11000
+
+_STOP = object()
+
+
+class AuditWriter:
+    def __init__(
+        self,
+        collection,
+        batch_size=200,
+        flush_interval=1.0,
+        max_queue=10000,
+        backpressure=BACKPRESSURE_BLOCK,
+        spill_path='audit_spill.ndjson',
+        synchronous=False,
+        listeners=()
+    ):
+        if backpressure not in (BACKPRESSURE_BLOCK, BACKPRESSURE_DROP, BACKPRESSURE_SPILL):
+            raise ValueError(f"Unknown backpressure policy: {backpressure}")
+
+        self.collection = collection
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.backpressure = backpressure
+        self.spill_path = spill_path
+        self.synchronous = synchronous
+        self.listeners = list(listeners)
+
+        self.written = 0
+        self.dropped = 0
+        self.spilled = 0
+        self.failed_batches = 0
+
+        self._lock = threading.Lock()
+        self._replay_lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._thread = None
+
+    # ---------- producer side ----------
+
+    def write(self, entry):
+        """Queue one audit entry (or insert it inline in synchronous mode)"""
+        if self.synchronous:
+            self.collection.insert_one(entry)
+            self._count_written(1)
+            self._stored([entry])
+            return
+
+        self._ensure_started()
+
+        try:
+            self._queue.put_nowait(entry)
+            return
+        except queue.Full:
+            pass
+
+        if self.backpressure == BACKPRESSURE_BLOCK:
+            self._queue.put(entry)
+        elif self.backpressure == BACKPRESSURE_DROP:
+            with self._lock:
+                self.dropped += 1
+        else:
+            self._spill_or_drop([entry])
+
+    def write_many(self, entries):
+        """Queue several audit entries (one insert_many in synchronous mode)"""
+        if not entries:
+            return
+        if self.synchronous:
+            self.collection.insert_many(entries, ordered=False)
+            self._count_written(len(entries))
+            self._stored(entries)
+            return
+        for entry in entries:
+            self.write(entry)
+
+    def shutdown(self, timeout=10.0):
+        """Flush everything queued, stop the flusher and replay any spill file"""
+        if self._thread is None or self._pid != os.getpid():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            print("✗ Audit queue still full at shutdown; flushing on caller thread")
+            self._drain_on_caller()
+        self._thread.join(timeout)
+        self._thread = None
+        self.replay_spill()
+
+    def stats(self):
+        return {
+            'mode': 'sync' if self.synchronous else 'async',
+            'backpressure': self.backpressure,
+            'queued': self._queue.qsize() if self._queue else 0,
+            'max_queue': self.max_queue,
+            'written': self.written,
+            'dropped': self.dropped,
+            'spilled': self.spilled,
+            'failed_batches': self.failed_batches
+        }
+
+    # ---------- flusher side ----------
+
+    def _ensure_started(self):
+        # A forked worker inherits the object but not the thread, so the
+        # queue and flusher are (re)created per process.
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._queue = queue.Queue(maxsize=self.max_queue)
+            self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        try:
+            self.replay_spill()
+        except Exception as e:
+            print(f"✗ Audit spill replay failed: {str(e)}")
+
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                entry = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                entry = None
+
+            if entry is _STOP:
+                self._flush(batch)
+                return
+            if entry is not None:
+                batch.append(entry)
+
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                self._flush(batch)
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+
+    def _drain_on_caller(self):
+        batch = []
+        while True:
+            try:
+                entry = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is not _STOP:
+                batch.append(entry)
+        self._flush(batch)
+
+    def _flush(self, batch):
+        if not batch:
+            return
+        try:
+            self.collection.insert_many(batch, ordered=False)
+        except Exception as e:
+            # Entries already carry their _id, so any that did land are
+            # skipped as duplicates when the spill file is replayed.
+            print(f"✗ Audit batch of {len(batch)} failed, spilling to disk: {str(e)}")
+            with self._lock:
+                self.failed_batches += 1
+            self._spill_or_drop(batch)
+            return
+        self._count_written(len(batch))
+        self._stored(batch)
+
+    def _count_written(self, n):
+        with self._lock:
+            self.written += n
+
+    def _stored(self, entries):
+        for listener in self.listeners:
+            try:
+                listener(entries)
+            except Exception as e:
+                print(f"✗ Audit listener {getattr(listener, '__name__', listener)} failed: {str(e)}")
+
+    # ---------- spill file ----------
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock shared by every process using this spill path"""
+        with open(self.spill_path + '.lock', 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _spill(self, entries):
+        with self._lock, self._file_lock():
+            with open(self.spill_path, 'a', encoding='utf-8') as f:
+                for entry in entries:
+                    f.write(json_util.dumps(entry) + '\n')
+            self.spilled += len(entries)
+
+    def _spill_or_drop(self, entries):
+        try:
+            self._spill(entries)
+        except OSError as e:
+            print(f"✗ Could not spill {len(entries)} audit entries, dropping them: {str(e)}")
+            with self._lock:
+                self.dropped += len(entries)
+
+    def replay_spill(self):
+        """
+        Insert entries from the spill file, removing it once they are stored.
+
+        The spill file is moved into `<spill_path>.replay`, which this
+        process then claims as `<spill_path>.replay.<pid>` before
+        inserting, so no other process appends to or removes it meanwhile.
+        If the insert fails, the claimed file is handed back to
+        `.replay` and retried next time.
+        """
+        if not self.spill_path:
+            return
+        replay_path = self.spill_path + '.replay'
+        claimed = f'{replay_path}.{os.getpid()}'
+        with self._replay_lock:
+            with self._lock, self._file_lock():
+                if os.path.exists(self.spill_path):
+                    _move_into(self.spill_path, replay_path)
+                for orphan in glob.glob(replay_path + '.*'):
+                    if _owner_gone(orphan):
+                        _move_into(orphan, replay_path)
+                if not os.path.exists(replay_path):
+                    return
+                os.replace(replay_path, claimed)
+
+            replayed = 0
+            skipped = 0
+            batch = []
+            try:
+                with open(claimed, encoding='utf-8') as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        try:
+                            batch.append(json_util.loads(line))
+                        except ValueError:
+                            # A torn line from a crash mid-write; nothing to recover
+                            skipped += 1
+                        if len(batch) >= self.batch_size:
+                            replayed += self._insert_replay(batch)
+                            batch = []
+                replayed += self._insert_replay(batch)
+            except PyMongoError as e:
+                print(f"✗ Audit spill replay failed, keeping {replay_path}: {str(e)}")
+                with self._lock, self._file_lock():
+                    _move_into(claimed, replay_path)
+                return
+
+            os.remove(claimed)
+            if skipped:
+                print(f"✗ Skipped {skipped} unreadable spilled audit entries")
+                with self._lock:
+                    self.dropped += skipped
+            if replayed:
+                print(f"✓ Replayed {replayed} spilled audit entries")
+
+    def _insert_replay(self, batch):
+        if not batch:
+            return 0
+        try:
+            self.collection.insert_many(batch, ordered=False)
+            self._stored(batch)
+            return len(batch)
+        except BulkWriteError as e:
+            errors = e.details.get('writeErrors', [])
+            if any(err.get('code') != DUPLICATE_KEY for err in errors):
+                raise
+            duplicates = {err['index'] for err in errors}
+            self._stored([entry for i, entry in enumerate(batch) if i not in duplicates])
+            return e.details.get('nInserted', 0)
+
+
+def _move_into(path, target):
+    """Append `path` to `target` (or rename it there) and remove it"""
+    if os.path.exists(target):
+        with open(path, encoding='utf-8') as src, open(target, 'a', encoding='utf-8') as dst:
+            for line in src:
+                dst.write(line)
+        os.remove(path)
+    else:
+        os.replace(path, target)
+
+
+def _owner_gone(claimed):
+    """True if the process that claimed a `.replay.<pid>` file is no longer running"""
+    try:
+        pid = int(claimed.rsplit('.', 1)[1])
+    except ValueError:
+        return False
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        return False
+    return False
+
+
+_writer = None
+
+
+def _env_flag(name):
+    return os.environ.get(name, '').lower() in ('1', 'true', 'yes')
+
+
+def configure_audit_writer(writer):
+    """Replace the process-wide writer (flushing the previous one)"""
+    global _writer
+    if _writer is not None:
+        _writer.shutdown()
+    _writer = writer
+    return writer
+
+
+def get_audit_writer():
+    """Return the process-wide writer, building it from the environment on first use"""
+    global _writer
+    if _writer is None:
+        from db import LazyCollection
+        from models.activity import record_activity
+        from models.events import publish_audit_entries
+        _writer = AuditWriter(
+            LazyCollection('audit_logs'),
+            batch_size=int(os.environ.get('AUDIT_BATCH_SIZE', 200)),
+            flush_interval=float(os.environ.get('AUDIT_FLUSH_INTERVAL', 1.0)),
+            max_queue=int(os.environ.get('AUDIT_QUEUE_SIZE', 10000)),
+            backpressure=os.environ.get('AUDIT_BACKPRESSURE', BACKPRESSURE_BLOCK),
+            spill_path=os.environ.get('AUDIT_SPILL_PATH', 'audit_spill.ndjson'),
+            synchronous=_env_flag('AUDIT_SYNC'),
+            listeners=[record_activity, publish_audit_entries]
+        )
+    return _writer
+
+
+@atexit.register
+def shutdown_audit_writer():
+    """Flush and stop the process-wide writer, if one was ever created"""
+    if _writer is not None:
+        _writer.shutdown()
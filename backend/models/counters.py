@@ -0,0 +1,220 @@
+"""
+Incrementally maintained system counters.
+
+Everything /admin/stats needs lives in one document in the `counters`
+collection:
+
+    {
+        '_id': 'system',
+        'total_users': int,
+        'total_returns': int,
+        'status': {'pending': int, 'approved': int, 'rejected': int},
+        'refund_status': {'not_initiated': int, 'refund_initiated': int, ...},
+        'returns_hourly': {'h00'..'h23': {'h': 'YYYYMMDDHH', 'n': int}},
+        'logins_hourly': {'h00'..'h23': {'h': 'YYYYMMDDHH', 'n': int}}
+    }
+
+The hourly series are 24-slot rings keyed by hour of day; a slot is reset
+when it is bumped for a newer hour, so the document never grows.
+
+Counters can drift if a write succeeds and its counter update does not.
+Rebuild them from the source collections with:
+
+    python -m models.counters
+"""
+from datetime import datetime, timedelta
+from pymongo.errors import PyMongoError
+from db import db
+
+COUNTERS_ID = 'system'
+
+
+def _key(value):
+    """'Refund Initiated' -> 'refund_initiated'"""
+    return value.lower().replace(' ', '_')
+
+
+def _bucket(at):
+    return at.strftime('%Y%m%d%H')
+
+
+def _slot(series, at):
+    return f'{series}.h{at.hour:02d}'
+
+
+def _bump_hourly(series, at, amount=1):
+    """Pipeline stage incrementing the ring slot for `at`, resetting it if stale"""
+    path = _slot(series, at)
+    bucket = _bucket(at)
+    return {'$set': {path: {'$cond': [
+        {'$eq': [f'${path}.h', bucket]},
+        {'h': bucket, 'n': {'$add': [f'${path}.n', amount]}},
+        {'h': bucket, 'n': amount}
+    ]}}}
+
+
+def _add(path, amount=1):
+    return {'$set': {path: {'$add': [{'$ifNull': [f'${path}', 0]}, amount]}}}
+
+
+def _apply(update):
+    # Counters never fail the request that triggered them; drift is
+    # repaired by reconcile_counters().
+    try:
+        db.counters.update_one({'_id': COUNTERS_ID}, update, upsert=True)
+    except PyMongoError as e:
+        print(f"✗ Counter update failed: {str(e)}")
+
+
+# Update builders, shared with the async app (aio/models.py)
+
+def user_created_update():
+    return {'$inc': {'total_users': 1}}
+
+
+def return_created_update(status, refund_status, created_at=None, count=1):
+    created_at = created_at or datetime.utcnow()
+    return [
+        _add('total_returns', count),
+        _add(f'status.{_key(status)}', count),
+        _add(f'refund_status.{_key(refund_status)}', count),
+        _bump_hourly('returns_hourly', created_at, count)
+    ]
+
+
+def _transition_inc(inc, old_status, new_status, old_refund_status, new_refund_status, count):
+    for field, old, new in (
+        ('status', old_status, new_status),
+        ('refund_status', old_refund_status, new_refund_status)
+    ):
+        if old != new:
+            for key, delta in ((f'{field}.{_key(old)}', -count), (f'{field}.{_key(new)}', count)):
+                inc[key] = inc.get(key, 0) + delta
+
+
+def return_transitions_update(transitions):
+    """
+    Build one update for many transitions, or None if nothing changes.
+
+    Args:
+        transitions: iterable of (old_status, new_status, old_refund_status, new_refund_status)
+    """
+    inc = {}
+    for old_status, new_status, old_refund_status, new_refund_status in transitions:
+        _transition_inc(inc, old_status, new_status, old_refund_status, new_refund_status, 1)
+    inc = {key: delta for key, delta in inc.items() if delta}
+    return {'$inc': inc} if inc else None
+
+
+def login_update(at=None):
+    return [_bump_hourly('logins_hourly', at or datetime.utcnow())]
+
+
+def record_user_created():
+    _apply(user_created_update())
+
+
+def record_return_created(status, refund_status, created_at=None, count=1):
+    _apply(return_created_update(status, refund_status, created_at, count))
+
+
+def record_return_transition(old_status, new_status, old_refund_status, new_refund_status):
+    record_return_transitions([(old_status, new_status, old_refund_status, new_refund_status)])
+
+
+def record_return_transitions(transitions):
+    """
+    Apply many transitions in one update.
+
+    Args:
+        transitions: iterable of (old_status, new_status, old_refund_status, new_refund_status)
+    """
+    update = return_transitions_update(transitions)
+    if update:
+        _apply(update)
+
+
+def record_login(at=None):
+    _apply(login_update(at))
+
+
+def _sum_last_24h(ring, now):
+    oldest = _bucket(now - timedelta(hours=23))
+    return sum(slot['n'] for slot in (ring or {}).values() if slot['h'] >= oldest)
+
+
+def read_system_stats(now=None):
+    """Build the /admin/stats payload from the counters document"""
+    return system_stats(db.counters.find_one({'_id': COUNTERS_ID}), now)
+
+
+def system_stats(doc, now=None):
+    """Shape a counters document into the /admin/stats payload"""
+    now = now or datetime.utcnow()
+    doc = doc or {}
+    status = doc.get('status', {})
+
+    return {
+        'total_users': doc.get('total_users', 0),
+        'total_returns': doc.get('total_returns', 0),
+        'pending_returns': status.get('pending', 0),
+        'approved_returns': status.get('approved', 0),
+        'rejected_returns': status.get('rejected', 0),
+        'returns_by_status': status,
+        'returns_by_refund_status': doc.get('refund_status', {}),
+        'returns_last_24h': _sum_last_24h(doc.get('returns_hourly'), now),
+        'logins_last_24h': _sum_last_24h(doc.get('logins_hourly'), now)
+    }
+
+
+def _hourly_ring(collection, match, time_field, now):
+    since = (now - timedelta(hours=23)).replace(minute=0, second=0, microsecond=0)
+    pipeline = [
+        {'$match': {**match, time_field: {'$gte': since}}},
+        {'$group': {
+            '_id': {'$dateToString': {'format': '%Y%m%d%H', 'date': f'${time_field}'}},
+            'n': {'$sum': 1}
+        }}
+    ]
+    ring = {}
+    for row in collection.aggregate(pipeline):
+        hour = int(row['_id'][-2:])
+        ring[f'h{hour:02d}'] = {'h': row['_id'], 'n': row['n']}
+    return ring
+
+
+def reconcile_counters(now=None):
+    """Rebuild the counters document from the source collections"""
+    now = now or datetime.utcnow()
+
+    status = {}
+    refund_status = {}
+    total_returns = 0
+    pipeline = [{'$group': {
+        '_id': {'status': '$status', 'refund_status': '$refund_status'},
+        'n': {'$sum': 1}
+    }}]
+    for row in db.returns.aggregate(pipeline):
+        n = row['n']
+        total_returns += n
+        s = _key(row['_id'].get('status') or 'Pending')
+        rs = _key(row['_id'].get('refund_status') or 'Not Initiated')
+        status[s] = status.get(s, 0) + n
+        refund_status[rs] = refund_status.get(rs, 0) + n
+
+    doc = {
+        'total_users': db.users.count_documents({}),
+        'total_returns': total_returns,
+        'status': status,
+        'refund_status': refund_status,
+        'returns_hourly': _hourly_ring(db.returns, {}, 'created_at', now),
+        'logins_hourly': _hourly_ring(db.audit_logs, {'action': 'LOGIN_SUCCESS'}, 'timestamp', now),
+        'reconciled_at': now
+    }
+    db.counters.replace_one({'_id': COUNTERS_ID}, doc, upsert=True)
+    return doc
+
+
+if __name__ == '__main__':
+    doc = reconcile_counters()
+    print(f"✓ Counters rebuilt: {doc['total_users']} users, {doc['total_returns']} returns")
@@ -0,0 +1,191 @@
+"""
+Faceted admin dashboard query.
+
+One filter set (user, status, refund status, created date range) is
+answered with a single $facet aggregation over `returns`:
+
+    page           one keyset page of returns, newest first
+    total          number of matching returns
+    by_status      counts per status
+    by_refund      counts per refund_status
+    daily          returns per UTC day of created_at
+
+The $match and $sort in front of the $facet use the same indexes as
+Return.find_all, so the page is read in index order; the facets then
+share that one scan. Without filters
+that is every return, which is what the cache below amortizes.
+
+Results are kept in a per-process DashboardCache for a few seconds, keyed
+by the normalized filters plus the global return version (see
+models.versions), so admins looking at the same queue share one
+computation and any create or transition makes the next request
+recompute. Concurrent misses on the same key wait for the first one
+instead of running the aggregation again.
+"""
+import threading
+import time
+from collections import OrderedDict
+from db import db
+from models.user import Return
+from models.versions import GLOBAL_SCOPE, return_version
+from utils.pagination import clamp_limit, keyset_query, trim_page
+
+REFUND_DEFAULT = 'Not Initiated'
+
+
+class DashboardCache:
+    """Small LRU of dashboard payloads with a TTL and single-flight misses"""
+
+    def __init__(self, size=256, ttl=5.0):
+        self.size = size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self._entries = OrderedDict()  # key -> (payload, cached_at)
+        self._inflight = {}            # key -> threading.Event
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        """
+        The cached payload for `key`, or compute() it once while any
+        concurrent callers for the same key wait for that result.
+        """
+        if self.ttl <= 0 or self.size <= 0:
+            return compute()
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and time.monotonic() - entry[1] <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                event = self._inflight.get(key)
+                if event is None:
+                    event = self._inflight[key] = threading.Event()
+                    self.misses += 1
+                    break
+                self.shared += 1
+            event.wait()
+            with self._lock:
+                entry = self._entries.get(key)
+            if entry is not None:
+                return entry[0]
+            # The computing request failed; try again ourselves
+
+        try:
+            payload = compute()
+            with self._lock:
+                self._entries[key] = (payload, time.monotonic())
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.size:
+                    self._entries.popitem(last=False)
+            return payload
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            event.set()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        return {
+            'cached': len(self._entries),
+            'size': self.size,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'shared': self.shared
+        }
+
+
+_dashboard_cache = None
+
+
+def get_dashboard_cache():
+    global _dashboard_cache
+    if _dashboard_cache is None:
+        _dashboard_cache = DashboardCache()
+    return _dashboard_cache
+
+
+def init_dashboard_cache(config):
+    """Build the process-wide dashboard cache from DASHBOARD_CACHE_* settings"""
+    global _dashboard_cache
+    _dashboard_cache = DashboardCache(
+        size=config['DASHBOARD_CACHE_SIZE'],
+        ttl=config['DASHBOARD_CACHE_TTL']
+    )
+    return _dashboard_cache
+
+
+def _count_by(expression):
+    return [{'$group': {'_id': expression, 'n': {'$sum': 1}}}]
+
+
+def dashboard_pipeline(query, limit, cursor=None):
+    """The $facet aggregation for one filter set and page"""
+    return [
+        {'$match': query},
+        {'$sort': {'created_at': -1, '_id': -1}},
+        {'$facet': {
+            'page': [
+                {'$match': keyset_query({}, 'created_at', cursor)},
+                {'$limit': limit + 1},
+                {'$project': Return.projection('full')},
+            ],
+            'total': [{'$count': 'n'}],
+            'by_status': _count_by('$status'),
+            'by_refund': _count_by({'$ifNull': ['$refund_status', REFUND_DEFAULT]}),
+            'daily': _count_by({'$dateToString': {'format': '%Y-%m-%d', 'date': '$created_at'}}) + [
+                {'$sort': {'_id': 1}}
+            ],
+        }}
+    ]
+
+
+def _counts(rows):
+    return {row['_id']: row['n'] for row in rows}
+
+
+def compute_dashboard(query, limit, cursor=None):
+    """Run the faceted query and shape it for the API"""
+    result = next(db.returns.aggregate(dashboard_pipeline(query, limit, cursor), allowDiskUse=True))
+    docs, next_cursor = trim_page(result['page'], limit, 'created_at', -1)
+    return {
+        'returns': Return.serialize_page(docs, Return.projection('full')),
+        'next_cursor': next_cursor,
+        'total': result['total'][0]['n'] if result['total'] else 0,
+        'by_status': _counts(result['by_status']),
+        'by_refund_status': _counts(result['by_refund']),
+        'daily': [{'day': row['_id'], 'count': row['n']} for row in result['daily']],
+    }
+
+
+def _filter_key(filters):
+    """Hashable, order-independent form of the filters"""
+    return tuple(sorted(
+        (name, value.isoformat() if hasattr(value, 'isoformat') else value)
+        for name, value in filters.items() if value
+    ))
+
+
+def get_dashboard(limit=None, cursor=None, **filters):
+    """
+    Returns page, counts and daily histogram for one filter set
+
+    Args:
+        limit: Page size
+        cursor: Continuation token from a previous page
+        **filters: user_id, status, refund_status, created_from, created_to
+            (see Return.build_query)
+
+    Returns:
+        Dashboard payload (see compute_dashboard)
+    """
+    limit = clamp_limit(limit)
+    query = Return.build_query(**filters)
+    key = (return_version(GLOBAL_SCOPE), limit, cursor, _filter_key(filters))
+    return get_dashboard_cache().get_or_compute(key, lambda: compute_dashboard(query, limit, cursor))
@@ -0,0 +1,336 @@
+"""
+Return lifecycle and audit events for the /api/events SSE stream.
+
+Each process keeps an EventBus: a bounded buffer of recent events that
+streams wait on. Events have string ids that the browser sends back as
+Last-Event-ID when it reconnects. Anything still buffered after that id
+is replayed. If the id is unknown or already evicted, the stream sends
+`reset` and the client refetches its listings.
+
+Event types:
+
+    return.created / return.approved / return.rejected / return.refunded
+        data: return_id, user_id, order_id, status, refund_status, at
+        visible to admins and to the return's owner
+    return.batch
+        one event for a bulk transition or an import batch
+        data: type (one of the above), count, at
+        visible to admins and to the owners of any of the returns
+    audit
+        data: the audit entry (as in /admin/audit-logs)
+        visible to admins
+
+Sources (EVENTS_SOURCE):
+
+    local         the models publish their own writes (Return.save,
+                  Return.transition, bulk transitions, imports) and the
+                  audit writer publishes stored entries. A stream only
+                  sees writes made by its own worker, which is enough for
+                  `python app.py` or a single gunicorn worker.
+    changestream  a thread per worker tails a MongoDB change stream on
+                  `returns` and `audit_logs`, so every worker sees every
+                  write from any process. Needs a replica set. Ids are
+                  cluster times, so Last-Event-ID resumes on any worker;
+                  ids from before the worker's stream opened get `reset`.
+                  Bulk writes arrive as one event per return here, not
+                  as return.batch.
+"""
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pymongo.errors import PyMongoError
+from db import db
+from models.transitions import TRANSITIONS
+
+SOURCE_LOCAL = 'local'
+SOURCE_CHANGE_STREAM = 'changestream'
+
+RETURN_CREATED = 'return.created'
+RETURN_BATCH = 'return.batch'
+AUDIT = 'audit'
+
+
+class Event:
+    # user_id is the return's owner, or a frozenset of owners for RETURN_BATCH
+    __slots__ = ('id', 'key', 'type', 'user_id', 'data')
+
+    def __init__(self, id, key, type, user_id, data):
+        self.id = id
+        self.key = key
+        self.type = type
+        self.user_id = user_id
+        self.data = data
+
+
+def visible(event, user_id, role):
+    """Admins see everything; users only events about their own returns"""
+    if role == 'admin':
+        return True
+    if event.type == RETURN_BATCH:
+        return user_id in event.user_id
+    return event.type != AUDIT and event.user_id == user_id
+
+
+class EventBus:
+    """
+    Bounded in-memory event buffer shared by every stream in the process.
+
+    Keys are tuples that order events: (seq,) for local events, or
+    (cluster time, increment) for change stream events.
+    """
+
+    def __init__(self, source=SOURCE_LOCAL, size=1000):
+        self.source = source
+        self.size = size
+        self.published = 0
+        self.streams = 0
+        self.refused = 0
+        self._events = deque()
+        self._evicted = None  # key of the newest event dropped from the buffer
+        self._started = None  # change stream: cluster time it was opened at
+        self._seq = 0
+        self._epoch = os.urandom(4).hex()
+        self._cond = threading.Condition()
+
+    @property
+    def local(self):
+        return self.source == SOURCE_LOCAL
+
+    def publish(self, type, user_id, data):
+        """Add a locally produced event (ignored when events come from the change stream)"""
+        if not self.local:
+            return
+        with self._cond:
+            self._seq += 1
+            self._append(Event(f'{self._epoch}-{self._seq}', (self._seq,), type, user_id, data))
+
+    def open_stream(self, limit):
+        """Count a new stream in, or return False if `limit` are already open"""
+        with self._cond:
+            if self.streams >= limit:
+                self.refused += 1
+                return False
+            self.streams += 1
+            return True
+
+    def close_stream(self):
+        with self._cond:
+            self.streams -= 1
+
+    def mark_started(self, key):
+        """Record when the change stream opened; older ids cannot be resumed"""
+        with self._cond:
+            self._started = key
+
+    def append(self, event):
+        with self._cond:
+            self._append(event)
+
+    def _append(self, event):
+        self._events.append(event)
+        self.published += 1
+        while len(self._events) > self.size:
+            self._evicted = self._events.popleft().key
+        self._cond.notify_all()
+
+    def parse_id(self, event_id):
+        """Key for an id issued by this bus's source, or None"""
+        try:
+            if self.local:
+                epoch, seq = event_id.split('-')
+                return (int(seq),) if epoch == self._epoch else None
+            seconds, increment = event_id.split('.')
+            return (int(seconds), int(increment))
+        except (AttributeError, ValueError):
+            return None
+
+    def _latest(self):
+        if self._events:
+            return self._events[-1].key
+        return self._evicted or ((self._seq,) if self.local else (0, 0))
+
+    def position(self, last_event_id=None):
+        """
+        Where a stream starts.
+
+        Returns:
+            (key to read after, True if events the client asked for are gone)
+        """
+        with self._cond:
+            if not last_event_id:
+                return self._latest(), False
+            key = self.parse_id(last_event_id)
+            if key is None or (self._evicted is not None and key < self._evicted):
+                return self._latest(), True
+            if not self.local and (self._started is None or key < self._started):
+                # Changes between that id and the stream opening were never seen
+                return self._latest(), True
+            return key, False
+
+    def wait(self, after, timeout):
+        """
+        Events newer than `after`, waiting up to `timeout` seconds for one.
+
+        Returns:
+            (events, new position, reset) where reset means the reader fell
+            behind the buffer and missed events
+        """
+        with self._cond:
+            if not self._newer(after):
+                self._cond.wait(timeout)
+            if self._evicted is not None and after < self._evicted:
+                return [], self._latest(), True
+            events = [event for event in self._events if event.key > after]
+            return events, (events[-1].key if events else after), False
+
+    def _newer(self, after):
+        return bool(self._events) and self._events[-1].key > after
+
+    def stats(self):
+        return {
+            'source': self.source,
+            'buffered': len(self._events),
+            'size': self.size,
+            'published': self.published,
+            'streams': self.streams,
+            'refused_streams': self.refused
+        }
+
+
+# ================= EVENT PAYLOADS =================
+
+def return_event_data(doc):
+    at = doc.get('updated_at') or doc.get('created_at')
+    return {
+        'return_id': str(doc['_id']),
+        'user_id': doc.get('user_id'),
+        'order_id': doc.get('order_id'),
+        'status': doc.get('status'),
+        'refund_status': doc.get('refund_status'),
+        'at': at.isoformat() if at else None
+    }
+
+
+def publish_return_event(type, doc):
+    """Publish a return lifecycle event for a stored return document"""
+    get_event_bus().publish(type, doc.get('user_id'), return_event_data(doc))
+
+
+def publish_return_batch(type, docs):
+    """
+    Publish the returns one bulk write changed: a single return.batch event,
+    or the plain event when there is only one
+    """
+    if len(docs) == 1:
+        publish_return_event(type, docs[0])
+    elif docs:
+        user_ids = frozenset(doc.get('user_id') for doc in docs)
+        data = {'type': type, 'count': len(docs), 'at': datetime.utcnow().isoformat()}
+        get_event_bus().publish(RETURN_BATCH, user_ids, data)
+
+
+def publish_audit_entries(entries):
+    """Audit writer listener: publish stored audit entries"""
+    from models.audit import audit_log_dict
+
+    bus = get_event_bus()
+    if not bus.local:
+        return
+    for entry in entries:
+        bus.publish(AUDIT, None, audit_log_dict(entry))
+
+
+# ================= CHANGE STREAM SOURCE =================
+
+WATCH_PIPELINE = [{'$match': {
+    'ns.coll': {'$in': ['returns', 'audit_logs']},
+    'operationType': {'$in': ['insert', 'update']}
+}}]
+
+
+def transition_event(updated_fields):
+    """Event type of the transition an update applied, or None"""
+    for transition in TRANSITIONS.values():
+        if all(updated_fields.get(field) == value for field, value in transition['to'].items()):
+            return transition['event']
+    return None
+
+
+def event_from_change(change):
+    """Build an Event from a change stream document, or None if it is not one"""
+    collection = change['ns']['coll']
+    doc = change.get('fullDocument')
+    if doc is None:
+        return None
+    cluster_time = change['clusterTime']
+    key = (cluster_time.time, cluster_time.inc)
+    event_id = f'{cluster_time.time}.{cluster_time.inc}'
+
+    if collection == 'audit_logs':
+        from models.audit import audit_log_dict
+        return Event(event_id, key, AUDIT, None, audit_log_dict(doc))
+
+    if change['operationType'] == 'insert':
+        type = RETURN_CREATED
+    else:
+        type = transition_event(change.get('updateDescription', {}).get('updatedFields', {}))
+        if type is None:
+            return None
+    return Event(event_id, key, type, doc.get('user_id'), return_event_data(doc))
+
+
+def _watch():
+    resume_token = None
+    while True:
+        try:
+            with db.watch(WATCH_PIPELINE, full_document='updateLookup', resume_after=resume_token) as stream:
+                if resume_token is None:
+                    # Any cluster time from here on is covered by the stream
+                    opened = db.command('ping')['operationTime']
+                    get_event_bus().mark_started((opened.time, opened.inc))
+                print("✓ Event change stream started")
+                for change in stream:
+                    resume_token = stream.resume_token
+                    event = event_from_change(change)
+                    if event is not None:
+                        get_event_bus().append(event)
+        except PyMongoError as e:
+            print(f"✗ Event change stream failed: {str(e)}")
+            time.sleep(1)
+
+
+# ================= PROCESS-WIDE BUS =================
+
+_bus = None
+_watcher = None
+_watcher_pid = None
+
+
+def get_event_bus():
+    global _bus
+    if _bus is None:
+        _bus = EventBus()
+    return _bus
+
+
+def init_events(config):
+    """Build the process-wide bus from EVENTS_* settings and start its source"""
+    global _bus
+    source = config['EVENTS_SOURCE']
+    if source not in (SOURCE_LOCAL, SOURCE_CHANGE_STREAM):
+        raise ValueError(f"Unknown EVENTS_SOURCE: {source}")
+    _bus = EventBus(source=source, size=config['EVENTS_BUFFER_SIZE'])
+    if source == SOURCE_CHANGE_STREAM:
+        _start_watcher()
+    return _bus
+
+
+def _start_watcher():
+    global _watcher, _watcher_pid
+    if _watcher is not None and _watcher.is_alive() and _watcher_pid == os.getpid():
+        return
+    _watcher = threading.Thread(target=_watch, name='event-change-stream', daemon=True)
+    _watcher.start()
+    _watcher_pid = os.getpid()
@@ -0,0 +1,183 @@
+"""
+Bulk import of return requests from partner feeds.
+
+Rows are validated with utils.validators.validate_return_request and
+written in batches: one users lookup, one insert_many(ordered=False), one
+counters update, one return_versions bulk_write and one audit batch per
+IMPORT_BATCH rows; each stored return is published as a return.created
+event. The unique user_order_open index rejects rows for
+orders that already have an open return; those come back as per-row
+`duplicate` errors while the rest of the batch is still inserted.
+"""
+import time
+from datetime import datetime
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo.errors import BulkWriteError
+from db import db
+from models.audit import audit_record, log_actions
+from models.counters import record_return_created
+from models.events import RETURN_CREATED, publish_return_batch
+from models.user import Return
+from models.versions import bump_return_versions
+from utils.importer import RowError
+from utils.validators import validate_return_request
+
+IMPORT_BATCH = 1000
+DUPLICATE_KEY = 11000
+
+# Errors kept in memory for the report; the rest are only counted unless
+# an on_error callback is given
+MAX_REPORTED_ERRORS = 1000
+
+
+class ImportReport:
+    """Running totals of an import, plus the first MAX_REPORTED_ERRORS row errors"""
+
+    def __init__(self, on_error=None, max_errors=MAX_REPORTED_ERRORS):
+        self.rows = 0
+        self.inserted = 0
+        self.duplicates = 0
+        self.invalid = 0
+        self.failed = 0
+        self.errors = []
+        self.max_errors = max_errors
+        self.on_error = on_error
+        self.started = time.perf_counter()
+        self.seconds = 0.0
+
+    def error(self, row, kind, message, order_id=None):
+        setattr(self, kind, getattr(self, kind) + 1)
+        entry = {'row': row, 'order_id': order_id, 'error': message}
+        if self.on_error:
+            self.on_error(entry)
+        if len(self.errors) < self.max_errors:
+            self.errors.append(entry)
+
+    def finish(self):
+        self.seconds = time.perf_counter() - self.started
+
+    def rows_per_second(self):
+        seconds = self.seconds or (time.perf_counter() - self.started)
+        return round(self.rows / seconds, 1) if seconds else 0.0
+
+    def to_dict(self):
+        error_count = self.duplicates + self.invalid + self.failed
+        return {
+            'rows': self.rows,
+            'inserted': self.inserted,
+            'duplicates': self.duplicates,
+            'invalid': self.invalid,
+            'failed': self.failed,
+            'seconds': round(self.seconds, 3),
+            'rows_per_second': self.rows_per_second(),
+            'errors': self.errors,
+            'errors_truncated': error_count > len(self.errors)
+        }
+
+
+def _check(row):
+    """Validation message for a parsed row, or None"""
+    if not all(isinstance(row.get(f), str) for f in ('user_id', 'order_id', 'reason')):
+        return "user_id, order_id and reason must be strings"
+    error = validate_return_request(row)
+    if error:
+        return error
+    try:
+        ObjectId(row['user_id'])
+    except InvalidId:
+        return "Invalid user_id"
+    return None
+
+
+def _known_users(user_ids):
+    object_ids = [ObjectId(u) for u in user_ids]
+    return {str(u['_id']) for u in db.users.find({'_id': {'$in': object_ids}}, {'_id': 1})}
+
+
+def _write_batch(batch, actor, report):
+    """Insert one batch of validated (row number, row) pairs"""
+    known = _known_users({row['user_id'] for _, row in batch})
+    pending = []
+    for number, row in batch:
+        if row['user_id'] in known:
+            pending.append((number, row))
+        else:
+            report.error(number, 'invalid', 'Unknown user', row['order_id'])
+    if not pending:
+        return
+
+    now = datetime.utcnow()
+    docs = []
+    for _, row in pending:
+        doc = Return(row['user_id'], row['order_id'], row['reason'], created_at=now).document()
+        doc['_id'] = ObjectId()
+        docs.append(doc)
+
+    rejected = set()
+    try:
+        db.returns.insert_many(docs, ordered=False)
+    except BulkWriteError as e:
+        for failure in e.details.get('writeErrors', []):
+            index = failure['index']
+            rejected.add(index)
+            number, row = pending[index]
+            if failure.get('code') == DUPLICATE_KEY:
+                report.error(number, 'duplicates',
+                             f"A return request for order {row['order_id']} already exists", row['order_id'])
+            else:
+                report.error(number, 'failed', failure.get('errmsg', 'Write failed'), row['order_id'])
+
+    stored = [doc for i, doc in enumerate(docs) if i not in rejected]
+    if not stored:
+        return
+    report.inserted += len(stored)
+    record_return_created(stored[0]['status'], stored[0]['refund_status'], now, count=len(stored))
+    bump_return_versions({doc['user_id'] for doc in stored})
+    publish_return_batch(RETURN_CREATED, stored)
+    log_actions([
+        audit_record(
+            action='RETURN_CREATED',
+            actor=actor,
+            details=f"Return imported for order {doc['order_id']}",
+            target_user=doc['user_id'],
+            return_id=str(doc['_id']),
+            timestamp=now
+        )
+        for doc in stored
+    ])
+
+
+def import_returns(rows, actor, report=None, batch_size=IMPORT_BATCH):
+    """
+    Validate and insert return rows in batches.
+
+    Args:
+        rows: Iterator from utils.importer.parse_feed
+        actor: User id recorded as the actor of the audit entries
+        report: ImportReport to update (a new one by default)
+        batch_size: Rows per insert_many
+
+    Returns:
+        The ImportReport
+    """
+    report = report or ImportReport()
+    batch = []
+    for row in rows:
+        report.rows += 1
+        if isinstance(row, RowError):
+            report.error(report.rows, 'invalid', str(row))
+            continue
+        error = _check(row)
+        if error:
+            report.error(report.rows, 'invalid', error,
+                         row.get('order_id') if isinstance(row.get('order_id'), str) else None)
+            continue
+        batch.append((report.rows, row))
+        if len(batch) >= batch_size:
+            _write_batch(batch, actor, report)
+            batch = []
+    if batch:
+        _write_batch(batch, actor, report)
+    report.finish()
+    return report
@@ -0,0 +1,482 @@
+"""
+Materialized per-user fraud scores.
+
+refresh_risk_scores() pulls per-user feature columns for the rolling
+window in bulk (two server-side $group aggregations and one users read),
+scores every user in one vectorized NumPy pass and writes one document
+per user into `user_risk` with unordered bulk_writes:
+
+    return_rate       returns per day in the window
+    reject_ratio      rejected / decided returns
+    failed_logins     LOGIN_FAILED entries (activity_daily rollups)
+    return_gap_hours  mean hours between consecutive returns
+    order_reuse       share of returns for an order returned before
+
+Each signal is scaled to 0..1 against the point where it counts fully
+(RISK_FEATURES) and the weighted sum is a 0-100 score, which RISK_LEVELS
+turns into HIGH / MEDIUM / LOW. get_suspicious_users() and
+get_user_activity_summary() only read these stored documents.
+
+A full run rescores every user with activity in the window and drops the
+rest. An incremental run only rescores users named in audit entries since
+the previous run (new or transitioned returns, failed logins). The
+in-process refresher (started from app.py) runs an incremental pass every
+RISK_REFRESH_INTERVAL seconds and a full one every
+RISK_FULL_REFRESH_INTERVAL, which also ages out returns that left the
+window. From cron:
+
+    python -m models.risk                  # full
+    python -m models.risk --incremental
+
+Only one refresh runs at a time across all workers and cron: each run
+holds a lease document in `counters` and gives up when another process
+holds it. A run that loses its lease (it outlived RISK_LEASE_SECONDS and
+someone else took over) stops before writing more scores or deleting
+anything.
+"""
+import argparse
+import math
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+import numpy as np
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import DESCENDING, ReplaceOne
+from pymongo.errors import DuplicateKeyError, PyMongoError
+from constants import STATUS_PENDING, STATUS_REJECTED
+from db import db
+from models.transitions import TRANSITIONS
+
+RISK_WINDOW_DAYS = 30
+HIGH_RISK_RETURNS = 10
+REFRESH_STATE_ID = 'risk_refresh'
+RISK_PROJECTION = {'_id': 0, 'window_days': 0}
+
+# Returns in quick succession: a gap of 0 hours counts fully, RAPID_RETURN_HOURS not at all
+RAPID_RETURN_HOURS = 72
+
+# signal -> (weight, value at which it counts fully); weights sum to 1
+RISK_FEATURES = {
+    'return_rate': (0.35, HIGH_RISK_RETURNS / RISK_WINDOW_DAYS),
+    'reject_ratio': (0.20, 1.0),
+    'failed_logins': (0.15, 10),
+    'rapid_returns': (0.10, 1.0),
+    'order_reuse': (0.20, 0.5),
+}
+
+# (minimum score, level), highest first; anything lower is LOW
+RISK_LEVELS = [(60, 'HIGH'), (30, 'MEDIUM')]
+
+LOGIN_FAILED = 'LOGIN_FAILED'
+RETURN_ACTIONS = ['RETURN_CREATED'] + [t['audit_action'] for t in TRANSITIONS.values()]
+
+# Incremental runs look this far behind the previous run, so audit entries
+# still in the writer's queue when it ran are not missed
+INCREMENTAL_OVERLAP = timedelta(minutes=5)
+
+RISK_READ_BATCH = 10000
+RISK_WRITE_BATCH = 5000
+
+LEASE_ID = 'risk_refresh_lease'
+RISK_LEASE_SECONDS = 900
+
+
+class RefreshLeaseLost(Exception):
+    """Another process took over the refresh lease while this run was writing"""
+
+
+# ================= LEASE =================
+
+def _acquire_lease(owner):
+    """Take the refresh lease if it is free or expired; False if someone else holds it"""
+    now = datetime.utcnow()
+    try:
+        db.counters.update_one(
+            {'_id': LEASE_ID, '$or': [{'expires_at': {'$lt': now}}, {'owner': owner}]},
+            {'$set': {'owner': owner, 'expires_at': now + timedelta(seconds=RISK_LEASE_SECONDS)}},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        # The lease document exists and is held by a live owner
+        return False
+    return True
+
+
+def _renew_lease(owner):
+    result = db.counters.update_one(
+        {'_id': LEASE_ID, 'owner': owner},
+        {'$set': {'expires_at': datetime.utcnow() + timedelta(seconds=RISK_LEASE_SECONDS)}}
+    )
+    if result.matched_count == 0:
+        raise RefreshLeaseLost("Risk refresh lease was taken over by another process")
+
+
+def _release_lease(owner):
+    db.counters.delete_one({'_id': LEASE_ID, 'owner': owner})
+
+
+# ================= SCORING =================
+
+def score_features(features):
+    """
+    Score feature columns in one vectorized pass.
+
+    Args:
+        features: {name: np.ndarray}, one row per user: return_rate,
+            reject_ratio, failed_logins, return_gap_hours (inf with fewer
+            than two returns) and order_reuse
+
+    Returns:
+        (scores 0-100, risk levels) as arrays
+    """
+    signals = {
+        'return_rate': features['return_rate'],
+        'reject_ratio': features['reject_ratio'],
+        'failed_logins': features['failed_logins'],
+        'rapid_returns': 1 - features['return_gap_hours'] / RAPID_RETURN_HOURS,
+        'order_reuse': features['order_reuse'],
+    }
+    scores = np.zeros(len(features['return_rate']))
+    for name, (weight, full_at) in RISK_FEATURES.items():
+        scores += weight * np.clip(signals[name] / full_at, 0, 1)
+    scores = np.round(scores * 100, 1)
+    levels = np.select([scores >= minimum for minimum, _ in RISK_LEVELS],
+                       [level for _, level in RISK_LEVELS], 'LOW')
+    return scores, levels
+
+
+def build_features(columns, failed_logins, window_days):
+    """
+    Derive the feature columns from the per-user aggregates.
+
+    Args:
+        columns: {name: np.ndarray} with returns, orders, decided,
+            rejected, first and last (datetime64) per user
+        failed_logins: np.ndarray of failed login counts per user
+        window_days: Length of the window the aggregates cover
+    """
+    returns = columns['returns'].astype(float)
+    span_hours = (columns['last'] - columns['first']) / np.timedelta64(1, 'h')
+    return {
+        'return_rate': returns / window_days,
+        'reject_ratio': np.divide(columns['rejected'], columns['decided'],
+                                  out=np.zeros(len(returns)), where=columns['decided'] > 0),
+        'failed_logins': failed_logins.astype(float),
+        'return_gap_hours': np.divide(span_hours, returns - 1,
+                                      out=np.full(len(returns), np.inf), where=returns > 1),
+        'order_reuse': np.divide(returns - columns['orders'], returns,
+                                 out=np.zeros(len(returns)), where=returns > 0),
+    }
+
+
+# ================= BULK READS =================
+
+def _return_aggregates(match):
+    """Per-user return aggregates for the returns matching `match`, by user id"""
+    pipeline = [
+        {'$match': match},
+        # Per (user, order) first, so order reuse needs no $addToSet per user
+        {'$group': {
+            '_id': {'user_id': '$user_id', 'order_id': '$order_id'},
+            'returns': {'$sum': 1},
+            'decided': {'$sum': {'$cond': [{'$eq': ['$status', STATUS_PENDING]}, 0, 1]}},
+            'rejected': {'$sum': {'$cond': [{'$eq': ['$status', STATUS_REJECTED]}, 1, 0]}},
+            'first': {'$min': '$created_at'},
+            'last': {'$max': '$created_at'},
+        }},
+        {'$group': {
+            '_id': '$_id.user_id',
+            'returns': {'$sum': '$returns'},
+            'orders': {'$sum': 1},
+            'decided': {'$sum': '$decided'},
+            'rejected': {'$sum': '$rejected'},
+            'first': {'$min': '$first'},
+            'last': {'$max': '$last'},
+        }},
+    ]
+    cursor = db.returns.aggregate(pipeline, allowDiskUse=True, batchSize=RISK_READ_BATCH)
+    return {row.pop('_id'): row for row in cursor}
+
+
+def _failed_logins(match):
+    """LOGIN_FAILED counts per username (the actor of those entries)"""
+    pipeline = [
+        {'$match': match},
+        {'$group': {'_id': '$actor', 'n': {'$sum': f'$counts.{LOGIN_FAILED}'}}},
+    ]
+    return {row['_id']: row['n'] for row in db.activity_daily.aggregate(pipeline, batchSize=RISK_READ_BATCH)}
+
+
+def _object_ids(user_ids):
+    object_ids = []
+    for user_id in user_ids:
+        try:
+            object_ids.append(ObjectId(user_id))
+        except (InvalidId, TypeError):
+            pass
+    return object_ids
+
+
+def _load_users(user_ids, usernames):
+    """User documents for any of the given ids or usernames, read in batches"""
+    object_ids = _object_ids(user_ids)
+    usernames = list(usernames)
+    users = []
+    projection = {'username': 1, 'name': 1}
+    for i in range(0, len(object_ids), RISK_READ_BATCH):
+        users += db.users.find({'_id': {'$in': object_ids[i:i + RISK_READ_BATCH]}}, projection)
+    seen = {u['_id'] for u in users}
+    for i in range(0, len(usernames), RISK_READ_BATCH):
+        users += [u for u in db.users.find({'username': {'$in': usernames[i:i + RISK_READ_BATCH]}}, projection)
+                  if u['_id'] not in seen]
+    return users
+
+
+def _changed_users(since):
+    """(user ids, usernames) named in return or failed login audit entries since `since`"""
+    user_ids, usernames = set(), set()
+    entries = db.audit_logs.find(
+        {'action': {'$in': RETURN_ACTIONS + [LOGIN_FAILED]}, 'timestamp': {'$gte': since}},
+        {'action': 1, 'actor': 1, 'target_user': 1}
+    )
+    for entry in entries:
+        if entry['action'] == LOGIN_FAILED:
+            usernames.add(entry['actor'])
+        else:
+            # Imports and transitions name the owner as target_user;
+            # submitted returns are logged by the owner
+            user_ids.add(entry.get('target_user') or entry['actor'])
+    return user_ids, usernames
+
+
+def _columns(users, aggregates, failed):
+    """Feature input columns aligned with `users`"""
+    empty = {'returns': 0, 'orders': 0, 'decided': 0, 'rejected': 0, 'first': None, 'last': None}
+    rows = [aggregates.get(str(u['_id']), empty) for u in users]
+    columns = {name: np.fromiter((row[name] for row in rows), dtype=np.int64, count=len(rows))
+               for name in ('returns', 'orders', 'decided', 'rejected')}
+    for name in ('first', 'last'):
+        columns[name] = np.array([row[name] for row in rows], dtype='datetime64[ms]')
+    failed_logins = np.fromiter((failed.get(u.get('username'), 0) for u in users),
+                                dtype=np.int64, count=len(users))
+    return columns, failed_logins
+
+
+# ================= REFRESH =================
+
+def _risk_documents(users, columns, failed_logins, features, scores, levels, window_days, run_at):
+    gaps = [gap if math.isfinite(gap) else None
+            for gap in np.round(features['return_gap_hours'], 2).tolist()]
+    rounded = {name: np.round(features[name], 4).tolist()
+               for name in ('return_rate', 'reject_ratio', 'order_reuse')}
+    returns = columns['returns'].tolist()
+    orders = columns['orders'].tolist()
+    rejected = columns['rejected'].tolist()
+    failed = failed_logins.tolist()
+    scores = scores.tolist()
+    levels = levels.tolist()
+    for i, user in enumerate(users):
+        yield {
+            'user_id': str(user['_id']),
+            'username': user.get('username'),
+            'name': user.get('name'),
+            'return_count': returns[i],
+            'unique_orders': orders[i],
+            'rejected': rejected[i],
+            'failed_logins': failed[i],
+            'features': {
+                'return_rate': rounded['return_rate'][i],
+                'reject_ratio': rounded['reject_ratio'][i],
+                'return_gap_hours': gaps[i],
+                'order_reuse': rounded['order_reuse'][i],
+            },
+            'score': scores[i],
+            'risk_level': levels[i],
+            'window_days': window_days,
+            'computed_at': run_at
+        }
+
+
+def _write_scores(documents, owner):
+    written = 0
+    batch = []
+    for doc in documents:
+        batch.append(ReplaceOne({'user_id': doc['user_id']}, doc, upsert=True))
+        if len(batch) >= RISK_WRITE_BATCH:
+            _renew_lease(owner)
+            db.user_risk.bulk_write(batch, ordered=False)
+            written += len(batch)
+            batch = []
+    if batch:
+        _renew_lease(owner)
+        db.user_risk.bulk_write(batch, ordered=False)
+        written += len(batch)
+    return written
+
+
+def refresh_risk_scores(now=None, window_days=RISK_WINDOW_DAYS, incremental=False):
+    """
+    Recompute user_risk, for every user with activity in the window or
+    (incremental) only for users with audit activity since the last run.
+
+    Falls back to a full run when there is no previous run.
+
+    Returns:
+        Number of users scored, or None if another process is refreshing
+    """
+    owner = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+    if not _acquire_lease(owner):
+        return None
+    try:
+        return _refresh(owner, now, window_days, incremental)
+    finally:
+        _release_lease(owner)
+
+
+def _refresh(owner, now, window_days, incremental):
+    run_at = now or datetime.utcnow()
+    since = run_at - timedelta(days=window_days)
+    state = db.counters.find_one({'_id': REFRESH_STATE_ID}) if incremental else None
+
+    returns_match = {'created_at': {'$gte': since}}
+    logins_match = {
+        'day': {'$gte': datetime(since.year, since.month, since.day)},
+        f'counts.{LOGIN_FAILED}': {'$gt': 0}
+    }
+    if state:
+        user_ids, usernames = _changed_users(state['refreshed_at'] - INCREMENTAL_OVERLAP)
+        users = _load_users(user_ids, usernames)
+        returns_match['user_id'] = {'$in': [str(u['_id']) for u in users]}
+        logins_match['actor'] = {'$in': [u['username'] for u in users]}
+        aggregates = _return_aggregates(returns_match) if users else {}
+        failed = _failed_logins(logins_match) if users else {}
+    else:
+        aggregates = _return_aggregates(returns_match)
+        failed = _failed_logins(logins_match)
+        users = _load_users(aggregates.keys(), failed.keys())
+
+    columns, failed_logins = _columns(users, aggregates, failed)
+    active = (columns['returns'] > 0) | (failed_logins > 0)
+    users = [u for u, keep in zip(users, active.tolist()) if keep]
+    columns = {name: column[active] for name, column in columns.items()}
+    failed_logins = failed_logins[active]
+
+    features = build_features(columns, failed_logins, window_days)
+    scores, levels = score_features(features)
+    scored = _write_scores(_risk_documents(
+        users, columns, failed_logins, features, scores, levels, window_days, run_at), owner)
+    _renew_lease(owner)
+
+    state_update = {'refreshed_at': run_at}
+    if state:
+        # Users rescored because of old activity that has left the window
+        db.user_risk.delete_many({
+            'user_id': {'$in': returns_match['user_id']['$in']},
+            'computed_at': {'$lt': run_at}
+        })
+    else:
+        # Users with no activity left in the window were not rewritten this run
+        db.user_risk.delete_many({'computed_at': {'$lt': run_at}})
+        state_update['full_refreshed_at'] = run_at
+    db.counters.update_one({'_id': REFRESH_STATE_ID}, {'$set': state_update}, upsert=True)
+    return scored
+
+
+# ================= READS =================
+
+def top_risk_users(threshold=5, limit=100):
+    """Read the highest-scoring users with at least `threshold` returns"""
+    if not db.counters.find_one({'_id': REFRESH_STATE_ID}):
+        refresh_risk_scores()
+
+    users = (
+        db.user_risk
+        .find({'return_count': {'$gte': threshold}}, RISK_PROJECTION)
+        .sort('score', DESCENDING)
+        .limit(limit)
+    )
+    return [risk_user(u) for u in users]
+
+
+def user_risk(user_id):
+    """The stored score for one user, or None if they have none"""
+    doc = db.user_risk.find_one({'user_id': user_id}, RISK_PROJECTION)
+    return risk_user(doc) if doc else None
+
+
+def risk_user(u):
+    """Shape a user_risk document for /admin/suspicious-users"""
+    return {
+        'user_id': u['user_id'],
+        'username': u.get('username'),
+        'name': u.get('name'),
+        'return_count': u['return_count'],
+        'unique_orders': u['unique_orders'],
+        'failed_logins': u.get('failed_logins', 0),
+        'score': u.get('score'),
+        'features': u.get('features', {}),
+        'risk_level': u['risk_level'],
+        'computed_at': u['computed_at'].isoformat()
+    }
+
+
+def _full_refresh_due(full_interval):
+    state = db.counters.find_one({'_id': REFRESH_STATE_ID}, {'full_refreshed_at': 1})
+    last_full = state and state.get('full_refreshed_at')
+    return not last_full or datetime.utcnow() - last_full >= timedelta(seconds=full_interval)
+
+
+_refresher = None      # (stop event, thread)
+_refresher_pid = None
+
+
+def start_risk_refresher(interval=None, full_interval=None):
+    """
+    Refresh scores every `interval` seconds on a daemon thread (0 disables):
+    incrementally, with a full run once the last one, by any process, is
+    `full_interval` seconds old. Every worker may start one; the lease
+    lets only one of them refresh at a time. Calling this again in the
+    same process returns the running refresher's stop event.
+    """
+    global _refresher, _refresher_pid
+    if interval is None:
+        interval = int(os.environ.get('RISK_REFRESH_INTERVAL', 300))
+    if full_interval is None:
+        full_interval = int(os.environ.get('RISK_FULL_REFRESH_INTERVAL', 3600))
+    if interval <= 0:
+        return None
+    if _refresher is not None and _refresher[1].is_alive() and _refresher_pid == os.getpid():
+        return _refresher[0]
+
+    stop = threading.Event()
+
+    def run():
+        while not stop.wait(interval):
+            try:
+                refresh_risk_scores(incremental=not _full_refresh_due(full_interval))
+            except (PyMongoError, RefreshLeaseLost) as e:
+                print(f"✗ Risk score refresh failed: {str(e)}")
+
+    thread = threading.Thread(target=run, name='risk-refresher', daemon=True)
+    thread.start()
+    _refresher = (stop, thread)
+    _refresher_pid = os.getpid()
+    return stop
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Rescore users into user_risk')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only rescore users with activity since the last run')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    scored = refresh_risk_scores(incremental=args.incremental)
+    if scored is None:
+        print("✗ Another process is refreshing risk scores; try again later")
+    else:
+        print(f"✓ Scored {scored} users in {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,145 @@
+"""
+Admin search over returns and audit logs.
+
+Free text is matched with the `reason_text` / `details_text` text indexes
+and ranked by relevance (textScore, ties newest first). Order id prefixes
+are matched as a range on the `order_id` index and listed in order id
+order. Status, user, action and date filters are applied on top.
+
+Ranking sorts on textScore directly followed by the page $limit, which
+the server runs as a top-k sort: memory stays bounded by the page size
+however many entries match, and every match is considered.
+
+Pages are keyset paginated on (score, _id) or (order_id, _id), and every
+query runs with maxTimeMS=SEARCH_MAX_TIME_MS: a term too broad to rank
+within the budget fails with SearchTimeout rather than holding a worker,
+and the caller is asked to narrow it with filters.
+
+Only audit entries still in Mongo are searched, not the archive (see
+models.audit_archive).
+"""
+import os
+from pymongo.errors import ExecutionTimeout
+from db import db
+from models.audit import audit_log_dict, build_audit_query
+from models.user import Return
+from utils.pagination import clamp_limit, decode_value_cursor, encode_value_cursor
+
+SEARCH_MAX_TIME_MS = int(os.environ.get('SEARCH_MAX_TIME_MS', 2000))
+
+# Cursor kinds (see utils.pagination.encode_value_cursor)
+BY_SCORE = 'score'
+BY_ORDER = 'order_id'
+
+
+class SearchTimeout(Exception):
+    """The search did not finish within SEARCH_MAX_TIME_MS"""
+
+
+def prefix_range(prefix):
+    """Range condition matching every string that starts with `prefix`"""
+    return {'$gte': prefix, '$lt': prefix[:-1] + chr(ord(prefix[-1]) + 1)}
+
+
+def _after(field, value, last_id, op):
+    return {'$or': [{field: {op: value}}, {field: value, '_id': {op: last_id}}]}
+
+
+def _trim(docs, limit, kind, field):
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_value_cursor(kind, docs[-1][field], docs[-1]['_id'])
+    return docs, next_cursor
+
+
+def _ranked(collection, query, text, limit, cursor, projection=None):
+    """One page of text matches, most relevant first"""
+    pipeline = [
+        {'$match': {'$text': {'$search': text}, **query}},
+        {'$addFields': {'score': {'$meta': 'textScore'}}},
+    ]
+    if cursor:
+        score, last_id = decode_value_cursor(cursor, BY_SCORE)
+        pipeline.append({'$match': _after('score', score, last_id, '$lt')})
+    pipeline += [
+        {'$sort': {'score': {'$meta': 'textScore'}, '_id': -1}},
+        {'$limit': limit + 1},
+    ]
+    if projection:
+        pipeline.append({'$project': {**projection, 'score': 1}})
+    try:
+        docs = list(collection.aggregate(pipeline, maxTimeMS=SEARCH_MAX_TIME_MS))
+    except ExecutionTimeout:
+        raise SearchTimeout("Search took too long; narrow it with a date range or filters")
+    return _trim(docs, limit, BY_SCORE, 'score')
+
+
+def _by_order(query, limit, cursor, projection):
+    """One page of returns in (order_id, _id) order"""
+    if cursor:
+        order_id, last_id = decode_value_cursor(cursor, BY_ORDER)
+        query = {'$and': [query, _after('order_id', order_id, last_id, '$gt')]}
+    try:
+        docs = list(
+            db.returns
+            .find(query, projection)
+            .sort([('order_id', 1), ('_id', 1)])
+            .limit(limit + 1)
+            .max_time_ms(SEARCH_MAX_TIME_MS)
+        )
+    except ExecutionTimeout:
+        raise SearchTimeout("Search took too long; narrow it with a date range or filters")
+    return _trim(docs, limit, BY_ORDER, 'order_id')
+
+
+def search_returns(text=None, order_prefix=None, limit=None, cursor=None, **filters):
+    """
+    Search returns by reason text and/or order id prefix
+
+    Args:
+        text: $text search string (words, "quoted phrases", -negations)
+        order_prefix: Only returns whose order_id starts with this
+        limit: Page size
+        cursor: Continuation token from a previous page
+        **filters: user_id, status, refund_status, created_from, created_to
+            (see Return.build_query)
+
+    Returns:
+        (returns, next_cursor); with text each return carries its `score`
+    """
+    if not text and not order_prefix:
+        raise ValueError('q or order_prefix required')
+    limit = clamp_limit(limit)
+    query = Return.build_query(**filters)
+    if order_prefix:
+        query['order_id'] = prefix_range(order_prefix)
+
+    projection = Return.projection('full')
+    if text:
+        docs, next_cursor = _ranked(db.returns, query, text, limit, cursor, projection)
+    else:
+        docs, next_cursor = _by_order(query, limit, cursor, projection)
+    return Return.serialize_page(docs, projection), next_cursor
+
+
+def search_audit_logs(text, limit=None, cursor=None, action_filter=None, actor_filter=None,
+                      start=None, end=None):
+    """
+    Search audit entry details, most relevant first
+
+    Returns:
+        (logs, next_cursor); each log carries its `score`
+    """
+    if not text:
+        raise ValueError('q required')
+    limit = clamp_limit(limit)
+    query = build_audit_query(action_filter, actor_filter, start, end)
+    docs, next_cursor = _ranked(db.audit_logs, query, text, limit, cursor)
+    return [{**audit_log_dict(log), 'score': log['score']} for log in docs], next_cursor
+
+
+SEARCHES = {
+    'returns': search_returns,
+    'audit_logs': search_audit_logs,
+}
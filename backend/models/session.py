@@ -0,0 +1,275 @@
+"""
+Server-side sessions.
+
+The session cookie carries only a random session id. Session data lives
+in the `sessions` collection (expired documents are removed by a TTL
+index on `expires_at`) and is cached per process in a small LRU for
+SESSION_CACHE_TTL seconds, so most requests never touch Mongo.
+
+Each session records the user's `session_version` at login. Revoking a
+user's sessions bumps that version and deletes their session documents;
+other processes notice the next time their cached copy expires, so
+revocation takes effect everywhere within SESSION_CACHE_TTL seconds.
+Changing a user's role revokes their sessions the same way (User.save).
+
+The session id is rotated whenever the session's user_id is set or
+changes (login), and the old document is deleted, so a session id
+planted before login never becomes an authenticated one.
+"""
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from bson import ObjectId
+from bson.errors import InvalidId
+from flask.sessions import SecureCookieSession, SessionInterface
+from db import db
+
+
+class ServerSession(SecureCookieSession):
+    def __init__(self, initial=None, sid=None, user_version=None, expires_at=None):
+        super().__init__(initial or {})
+        self.sid = sid
+        self.user_version = user_version
+        self.expires_at = expires_at
+        self.loaded_user_id = self.get('user_id')
+
+
+def _user_version(user_id):
+    try:
+        user = db.users.find_one({'_id': ObjectId(user_id)}, {'session_version': 1})
+    except InvalidId:
+        return None
+    if not user:
+        return None
+    return user.get('session_version', 0)
+
+
+class SessionStore:
+    def __init__(self, cache_size=10000, cache_ttl=2.0):
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()  # sid -> (data, user_version, expires_at, cached_at)
+        self._lock = threading.Lock()
+
+    def _cache_put(self, sid, data, user_version, expires_at):
+        if self.cache_ttl <= 0:
+            return
+        with self._lock:
+            self._cache[sid] = (dict(data), user_version, expires_at, time.monotonic())
+            self._cache.move_to_end(sid)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _cache_get(self, sid):
+        with self._lock:
+            entry = self._cache.get(sid)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[3] > self.cache_ttl:
+                del self._cache[sid]
+                return None
+            self._cache.move_to_end(sid)
+            return entry
+
+    def evict(self, sid):
+        with self._lock:
+            self._cache.pop(sid, None)
+
+    def load(self, sid):
+        """Return (data, user_version, expires_at) for a live session, else None"""
+        entry = self._cache_get(sid)
+        now = datetime.utcnow()
+        if entry is not None:
+            data, user_version, expires_at, _ = entry
+            if expires_at > now:
+                self.hits += 1
+                return dict(data), user_version, expires_at
+            self.evict(sid)
+            return None
+
+        self.misses += 1
+        doc = db.sessions.find_one({'_id': sid})
+        if not doc or doc['expires_at'] <= now:
+            return None
+
+        user_id = doc['data'].get('user_id')
+        if user_id and _user_version(user_id) != doc.get('user_version'):
+            # Revoked (or user deleted) since this session was issued
+            self.delete(sid)
+            return None
+
+        self._cache_put(sid, doc['data'], doc.get('user_version'), doc['expires_at'])
+        return doc['data'], doc.get('user_version'), doc['expires_at']
+
+    def save(self, sid, data, user_version, expires_at):
+        db.sessions.update_one(
+            {'_id': sid},
+            {'$set': {
+                'data': data,
+                'user_id': data.get('user_id'),
+                'user_version': user_version,
+                'expires_at': expires_at
+            }},
+            upsert=True
+        )
+        self._cache_put(sid, data, user_version, expires_at)
+
+    def delete(self, sid):
+        db.sessions.delete_one({'_id': sid})
+        self.evict(sid)
+
+    def is_current(self, sid, user_id, user_version):
+        """
+        True if the session still exists in Mongo and its user's sessions
+        have not been revoked since it was issued (never served from cache)
+        """
+        if not db.sessions.find_one({'_id': sid}, {'_id': 1}):
+            return False
+        return _user_version(user_id) == user_version
+
+    def revoke_user(self, user_id):
+        """
+        Invalidate every session belonging to a user
+
+        Returns:
+            False if there is no such user
+        """
+        result = db.users.update_one({'_id': ObjectId(user_id)}, {'$inc': {'session_version': 1}})
+        if result.matched_count == 0:
+            return False
+        db.sessions.delete_many({'user_id': user_id})
+        self.evict_user(user_id)
+        return True
+
+    def evict_user(self, user_id):
+        with self._lock:
+            for sid in [sid for sid, entry in self._cache.items() if entry[0].get('user_id') == user_id]:
+                del self._cache[sid]
+
+    def stats(self):
+        return {
+            'cached': len(self._cache),
+            'cache_size': self.cache_size,
+            'cache_ttl': self.cache_ttl,
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+
+class MongoSessionInterface(SessionInterface):
+    session_class = ServerSession
+
+    def __init__(self, store, refresh_after=timedelta(hours=1)):
+        self.store = store
+        self.refresh_after = refresh_after
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            loaded = self.store.load(sid)
+            if loaded is not None:
+                data, user_version, expires_at = loaded
+                return self.session_class(data, sid=sid, user_version=user_version, expires_at=expires_at)
+        return self.session_class()
+
+    def save_session(self, app, session, response):
+        if not session:
+            if session.sid and session.modified:
+                self.store.delete(session.sid)
+                delete_session_cookie(self, app, response)
+            return
+
+        expires_at = session_expiry(app, session, self.refresh_after)
+        if expires_at is None:
+            return
+
+        previous_sid = rotate_sid(session)
+        if previous_sid:
+            self.store.delete(previous_sid)
+        user_id = session.get('user_id')
+        if session.modified and user_id:
+            session.user_version = _user_version(user_id)
+
+        self.store.save(session.sid, dict(session), session.user_version, expires_at)
+        set_session_cookie(self, app, session, response)
+
+
+# Cookie, id and expiry rules shared with the async interface (aio/session.py)
+
+def rotate_sid(session):
+    """
+    Give the session a fresh id if it has none or its user changed since
+    it was loaded.
+
+    Returns:
+        The id it replaced, whose document the caller deletes, or None
+    """
+    previous_sid = session.sid
+    if previous_sid is not None and session.get('user_id') == session.loaded_user_id:
+        return None
+    session.sid = secrets.token_urlsafe(32)
+    session.loaded_user_id = session.get('user_id')
+    return previous_sid
+
+
+def session_expiry(app, session, refresh_after):
+    """
+    The new expires_at if the session has to be written, else None.
+
+    An unmodified session is only rewritten to slide its expiry once it
+    is `refresh_after` older than a fresh one.
+    """
+    expires_at = datetime.utcnow() + app.permanent_session_lifetime
+    stale = (
+        session.expires_at is None or
+        expires_at - session.expires_at > refresh_after
+    )
+    return expires_at if session.modified or stale else None
+
+
+def set_session_cookie(interface, app, session, response):
+    response.set_cookie(
+        interface.get_cookie_name(app),
+        session.sid,
+        expires=interface.get_expiration_time(app, session),
+        httponly=interface.get_cookie_httponly(app),
+        domain=interface.get_cookie_domain(app),
+        path=interface.get_cookie_path(app),
+        secure=interface.get_cookie_secure(app),
+        samesite=interface.get_cookie_samesite(app)
+    )
+
+
+def delete_session_cookie(interface, app, response):
+    response.delete_cookie(
+        interface.get_cookie_name(app),
+        domain=interface.get_cookie_domain(app),
+        path=interface.get_cookie_path(app)
+    )
+
+
+_store = None
+
+
+def get_session_store():
+    global _store
+    if _store is None:
+        _store = SessionStore()
+    return _store
+
+
+def init_sessions(app):
+    """Install the Mongo-backed session interface on `app`"""
+    global _store
+    _store = SessionStore(
+        cache_size=app.config['SESSION_CACHE_SIZE'],
+        cache_ttl=app.config['SESSION_CACHE_TTL']
+    )
+    app.session_interface = MongoSessionInterface(
+        _store,
+        refresh_after=timedelta(seconds=app.config['SESSION_REFRESH_SECONDS'])
+    )
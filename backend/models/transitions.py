@@ -0,0 +1,186 @@
+"""
+Allowed return state transitions.
+
+    Pending --approve--> Approved / Refund Initiated --refund--> Refund Successful
+    Pending --reject---> Rejected / Rejected
+
+Each action lists the state a return must be in (`from`), the fields it
+sets (`to`) and clears (`unset`), the timestamp field it stamps, the
+audit entry it writes and the event it publishes (see models.events).
+"""
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import UpdateOne
+from constants import STATUS_PENDING, STATUS_APPROVED, STATUS_REJECTED
+
+REFUND_NOT_INITIATED = 'Not Initiated'
+REFUND_INITIATED = 'Refund Initiated'
+REFUND_SUCCESSFUL = 'Refund Successful'
+REFUND_REJECTED = 'Rejected'
+
+
+class ReturnNotFound(LookupError):
+    """No return with the given id"""
+
+
+class InvalidTransition(ValueError):
+    """The return is not in a state the action can be applied to"""
+
+
+TRANSITIONS = {
+    'approve': {
+        'from': {'status': STATUS_PENDING},
+        'to': {'status': STATUS_APPROVED, 'refund_status': REFUND_INITIATED},
+        'timestamp': 'approved_at',
+        'audit_action': 'RETURN_APPROVED',
+        'audit_details': 'Return approved, refund initiated',
+        'message': 'Approved & refund initiated',
+        'event': 'return.approved',
+    },
+    'reject': {
+        'from': {'status': STATUS_PENDING},
+        'to': {'status': STATUS_REJECTED, 'refund_status': REFUND_REJECTED},
+        'unset': ('open',),
+        'timestamp': 'rejected_at',
+        'audit_action': 'RETURN_REJECTED',
+        'audit_details': 'Return rejected',
+        'message': 'Rejected',
+        'event': 'return.rejected',
+    },
+    'refund': {
+        'from': {'status': STATUS_APPROVED, 'refund_status': REFUND_INITIATED},
+        'to': {'refund_status': REFUND_SUCCESSFUL},
+        'timestamp': 'refunded_at',
+        'audit_action': 'REFUND_COMPLETED',
+        'audit_details': 'Refund completed',
+        'message': 'Refund completed',
+        'event': 'return.refunded',
+    },
+}
+
+
+def get_transition(action):
+    transition = TRANSITIONS.get(action)
+    if transition is None:
+        raise ValueError(f"Unknown action: {action}. Expected one of {', '.join(TRANSITIONS)}")
+    return transition
+
+
+def build_update(transition, now):
+    """
+    Build the update for a transition applied at `now`.
+
+    Returns:
+        (changes, update): the fields set, and the Mongo update document
+    """
+    changes = {**transition['to'], 'updated_at': now, transition['timestamp']: now}
+    update = {'$set': changes}
+    if transition.get('unset'):
+        update['$unset'] = dict.fromkeys(transition['unset'], '')
+    return changes, update
+
+
+def allows(transition, doc):
+    """True if a return document is in the transition's source state"""
+    return all(doc.get(field) == value for field, value in transition['from'].items())
+
+
+def counter_change(transition, before):
+    """(old_status, new_status, old_refund_status, new_refund_status) for models.counters"""
+    old_status = before.get('status')
+    old_refund_status = before.get('refund_status', REFUND_NOT_INITIATED)
+    return (
+        old_status, transition['to'].get('status', old_status),
+        old_refund_status, transition['to'].get('refund_status', old_refund_status)
+    )
+
+
+def transition_failure(action, return_id, current):
+    """The exception for a conditional update that matched nothing"""
+    if current is None:
+        return ReturnNotFound(f"Return {return_id} not found")
+    return InvalidTransition(
+        f"Cannot {action} a return that is {current.get('status')} "
+        f"(refund: {current.get('refund_status', REFUND_NOT_INITIATED)})"
+    )
+
+
+def after_transition(transition, before, changes):
+    """The return document as it is after a transition applied to `before`"""
+    after = {**before, **changes}
+    for field in transition.get('unset', ()):
+        after.pop(field, None)
+    return after
+
+
+# Bulk transitions are planned and settled here so the sync and async
+# models only differ in how they talk to Mongo.
+
+def parse_return_ids(return_ids):
+    """
+    Returns:
+        ({ObjectId: return_id}, {return_id: 'invalid_id'} for ids that do not parse)
+    """
+    object_ids = {}
+    results = {}
+    for return_id in return_ids:
+        try:
+            object_ids[ObjectId(return_id)] = return_id
+        except (InvalidId, TypeError):
+            results[return_id] = 'invalid_id'
+    return object_ids, results
+
+
+def plan_bulk(transition, object_ids, current, update, results):
+    """
+    Build the conditional updates for every return the transition allows,
+    recording 'not_found' / 'invalid_transition' in `results` for the rest.
+
+    Returns:
+        (candidate ObjectIds, UpdateOne operations)
+    """
+    candidates = []
+    operations = []
+    for oid, return_id in object_ids.items():
+        doc = current.get(oid)
+        if doc is None:
+            results[return_id] = 'not_found'
+        elif not allows(transition, doc):
+            results[return_id] = 'invalid_transition'
+        else:
+            candidates.append(oid)
+            operations.append(UpdateOne({'_id': oid, **transition['from']}, update))
+    return candidates, operations
+
+
+def settle_bulk(transition, object_ids, candidates, applied, current, admin_id, now, results):
+    """
+    Record 'updated' / 'conflict' in `results` and build the side effects
+    of the updates that landed.
+
+    Returns:
+        (audit entries, counter changes, affected user ids)
+    """
+    from models.audit import audit_record
+
+    audit_entries = []
+    counter_changes = []
+    user_ids = set()
+    for oid in candidates:
+        return_id = object_ids[oid]
+        if oid not in applied:
+            results[return_id] = 'conflict'
+            continue
+        results[return_id] = 'updated'
+        doc = current[oid]
+        counter_changes.append(counter_change(transition, doc))
+        user_ids.add(doc.get('user_id'))
+        audit_entries.append(audit_record(
+            action=transition['audit_action'],
+            actor=admin_id,
+            details=f"{transition['audit_details']} (bulk)",
+            target_user=doc.get('user_id'),
+            return_id=return_id,
+            timestamp=now
+        ))
+    return audit_entries, counter_changes, user_ids
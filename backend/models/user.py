@@ -1,73 +1,387 @@
 from db import db
-from utils.auth import verify_password
+from utils.auth import get_password_pool, needs_rehash, PasswordPoolBusy, PasswordPoolTimeout
+from utils.pagination import paginate, date_range
+from models.counters import record_user_created, record_return_transition, record_return_transitions
+from models.versions import bump_return_versions
+from models.session import get_session_store
+from models.events import RETURN_CREATED, publish_return_batch, publish_return_event
+from models.transitions import (
+    ReturnNotFound, after_transition, build_update, counter_change, get_transition,
+    parse_return_ids, plan_bulk, settle_bulk, transition_failure
+)
 from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument
+from pymongo.errors import PyMongoError
+from constants import OPEN_STATUSES
+from collections import OrderedDict
 from datetime import datetime
+import threading
+import time
+
+def hydrate(cls, doc):
+    """
+    Build a slotted model instance straight from a Mongo document.
+
+    Fields left out by the query projection are set to the class default
+    (or None) rather than raising, so partial reads hydrate cheaply.
+    """
+    obj = object.__new__(cls)
+    defaults = cls._defaults
+    for name in cls.__slots__:
+        setattr(obj, name, doc.get(name, defaults.get(name)))
+    return obj
+
+
+def serialize(doc):
+    """Convert a raw document to JSON-safe values in place"""
+    for key, value in doc.items():
+        if isinstance(value, datetime):
+            doc[key] = value.isoformat()
+        elif isinstance(value, ObjectId):
+            doc[key] = str(value)
+    return doc
+
+
+def _projection(fields):
+    return {name: 1 for name in fields}
+
+
+USER_CACHE_VERSION_ID = 'user_cache'
+USER_CACHE_LOG = 256
+
+
+class UserCache:
+    """
+    Per-process LRU of public user documents, keyed by _id with a
+    username index. Entries expire after `ttl` seconds.
+
+    Only PUBLIC_FIELDS are ever stored, so the password hash cannot leak
+    out of the cache even if an auth document is passed to put().
+
+    User.save invalidates locally and, in one update of the counters
+    document, bumps a version number and appends the user's id to a log of
+    the last USER_CACHE_LOG changed users. With sync_interval > 0, every
+    process reads that document at most once per interval and drops just
+    the users changed since its last read, so writes from other workers
+    are visible within that interval. Only a process that fell more than
+    USER_CACHE_LOG changes behind (or cannot read the document) clears its
+    whole cache.
+    """
+
+    PUBLIC_FIELDS = ('_id', 'username', 'name', 'email', 'role', 'created_at')
+
+    def __init__(self, size=5000, ttl=60.0, sync_interval=0):
+        self.size = size
+        self.ttl = ttl
+        self.sync_interval = sync_interval
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()  # _id str -> (doc, cached_at)
+        self._by_username = {}         # username -> _id str
+        self._lock = threading.Lock()
+        self._version = None
+        self._checked_at = 0.0
+
+    def _sync(self):
+        if self.sync_interval <= 0 or time.monotonic() - self._checked_at < self.sync_interval:
+            return
+        self._checked_at = time.monotonic()
+        try:
+            doc = db.counters.find_one({'_id': USER_CACHE_VERSION_ID}, {'version': 1, 'changed': 1}) or {}
+        except PyMongoError:
+            self.clear()
+            self._version = None
+            return
+        version = doc.get('version', 0)
+        previous, self._version = self._version, version
+        if previous is None or version == previous:
+            return
+        changed = doc.get('changed', [])
+        behind = version - previous
+        if 0 < behind <= len(changed):
+            for user_id in changed[-behind:]:
+                self.invalidate(user_id, publish=False)
+        else:
+            self.clear()
+
+    def _drop(self, key):
+        doc, _ = self._entries.pop(key)
+        if self._by_username.get(doc.get('username')) == key:
+            del self._by_username[doc['username']]
+
+    def get(self, user_id=None, username=None):
+        """Return a copy of the cached public document, or None on a miss"""
+        if self.ttl <= 0:
+            return None
+        self._sync()
+        with self._lock:
+            key = str(user_id) if user_id is not None else self._by_username.get(username)
+            entry = self._entries.get(key) if key else None
+            if entry is not None and time.monotonic() - entry[1] <= self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return dict(entry[0])
+            if entry is not None:
+                self._drop(key)
+            self.misses += 1
+            return None
+
+    def put(self, doc):
+        if self.ttl <= 0 or not doc or '_id' not in doc:
+            return
+        public = {name: doc[name] for name in self.PUBLIC_FIELDS if name in doc}
+        key = str(public['_id'])
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (public, time.monotonic())
+            if public.get('username'):
+                self._by_username[public['username']] = key
+            while len(self._entries) > self.size:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, user_id, publish=True):
+        """Forget one user here and, with publish, tell other processes"""
+        with self._lock:
+            key = str(user_id)
+            if key in self._entries:
+                self._drop(key)
+            self.invalidations += 1
+        if publish:
+            db.counters.update_one(
+                {'_id': USER_CACHE_VERSION_ID},
+                {'$inc': {'version': 1},
+                 '$push': {'changed': {'$each': [key], '$slice': -USER_CACHE_LOG}}},
+                upsert=True
+            )
+
+    def clear(self):
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._by_username.clear()
+
+    def stats(self):
+        return {
+            'cached': len(self._entries),
+            'size': self.size,
+            'ttl': self.ttl,
+            'sync_interval': self.sync_interval,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations
+        }
+
+
+_user_cache = None
+
+
+def get_user_cache():
+    global _user_cache
+    if _user_cache is None:
+        _user_cache = UserCache()
+    return _user_cache
+
+
+def init_user_cache(config):
+    """Build the process-wide user cache from USER_CACHE_* settings"""
+    global _user_cache
+    _user_cache = UserCache(
+        size=config['USER_CACHE_SIZE'],
+        ttl=config['USER_CACHE_TTL'],
+        sync_interval=config['USER_CACHE_SYNC_INTERVAL']
+    )
+    return _user_cache
+
 
 class User:
-    def __init__(self, username, password, name, email, role='user', _id=None, created_at=None):
+    # _changed is last so hydrate() leaves it None; loaded users get an empty set
+    __slots__ = ('_id', 'username', 'password', 'password_kdf', 'name', 'email', 'role', 'created_at',
+                 '_changed')
+    _defaults = {'role': 'user'}
+
+    FIELDS = ('username', 'password', 'password_kdf', 'name', 'email', 'role', 'created_at')
+    PASSWORD_FIELDS = ('password', 'password_kdf')
+
+    # The password hash is only ever read by authenticate()
+    AUTH_PROJECTION = _projection((
+        'username', 'password', 'password_kdf', 'name', 'email', 'role', 'created_at'
+    ))
+    PUBLIC_PROJECTION = _projection(('username', 'name', 'email', 'role', 'created_at'))
+
+    def __init__(self, username, password, name, email, role='user', _id=None, created_at=None,
+                 password_kdf=None):
+        object.__setattr__(self, '_changed', set())
         self._id = _id
         self.username = username
         self.password = password
+        self.password_kdf = password_kdf
         self.name = name
         self.email = email
         self.role = role
         self.created_at = created_at or datetime.utcnow()
-    
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        changed = getattr(self, '_changed', None)
+        if changed is not None and name in User.FIELDS:
+            changed.add(name)
+
+    @staticmethod
+    def _loaded(user_data):
+        """Hydrate a stored user; nothing counts as changed until assigned"""
+        user = hydrate(User, user_data)
+        object.__setattr__(user, '_changed', set())
+        return user
+
     def save(self):
-        """Save user to database"""
-        user_data = {
-            'username': self.username,
-            'password': self.password,
-            'name': self.name,
-            'email': self.email,
-            'role': self.role,
-            'created_at': self.created_at
-        }
-        
+        """
+        Save user to database
+
+        An existing user only has the fields assigned since it was loaded
+        or built written back, so a user read without its password hash
+        (find_by_id / find_by_username) cannot wipe it. A password or
+        password_kdf that is None is left out of the write, on insert
+        as well as update, so neither is ever stored as None.
+        """
+        fields = [
+            name for name in User.FIELDS
+            if name in self._changed
+            and not (name in User.PASSWORD_FIELDS and getattr(self, name) is None)
+        ]
+        user_data = {name: getattr(self, name) for name in fields}
+
         if self._id:
-            db.users.update_one({'_id': ObjectId(self._id)}, {'$set': user_data})
+            if user_data:
+                db.users.update_one({'_id': ObjectId(self._id)}, {'$set': user_data})
+                if any(name in UserCache.PUBLIC_FIELDS for name in user_data):
+                    get_user_cache().invalidate(self._id)
+            if 'role' in user_data:
+                # Sessions carry the role from login; make the user log in again
+                get_session_store().revoke_user(str(self._id))
         else:
             result = db.users.insert_one(user_data)
             self._id = result.inserted_id
-        
+            record_user_created()
+
+        self._changed.clear()
         return self
     
     @staticmethod
     def authenticate(username, password):
-        """Authenticate user"""
-        user_data = db.users.find_one({'username': username})
-        
-        if user_data and verify_password(password, user_data['password']):
-            return User(
-                username=user_data['username'],
-                password=user_data['password'],
-                name=user_data['name'],
-                email=user_data['email'],
-                role=user_data['role'],
-                _id=user_data['_id'],
-                created_at=user_data.get('created_at')
-            )
-        return None
+        """
+        Authenticate user
+
+        Hashing runs on the password worker pool, which raises
+        PasswordPoolBusy / PasswordPoolTimeout when it is saturated.
+        The hash itself is always read from Mongo, never from the user
+        cache; a successful login warms the cache with the public fields.
+        """
+        user_data = db.users.find_one({'username': username}, User.AUTH_PROJECTION)
+        if not user_data:
+            return None
+
+        pool = get_password_pool()
+        kdf = user_data.get('password_kdf')
+        if not pool.verify(password, user_data['password'], kdf):
+            return None
+
+        if needs_rehash(kdf):
+            User._rehash(user_data, password)
+        get_user_cache().put(user_data)
+        return User._loaded(user_data)
+
+    @staticmethod
+    def _rehash(user_data, password):
+        """Upgrade a stored hash to the current KDF; retried on a later login if busy"""
+        try:
+            hashed, kdf = get_password_pool().hash(password)
+        except (PasswordPoolBusy, PasswordPoolTimeout):
+            return
+        db.users.update_one(
+            {'_id': user_data['_id'], 'password': user_data['password']},
+            {'$set': {'password': hashed, 'password_kdf': kdf}}
+        )
+        user_data['password'] = hashed
+        user_data['password_kdf'] = kdf
     
     @staticmethod
     def find_by_id(user_id):
-        """Find user by ID"""
-        user_data = db.users.find_one({'_id': ObjectId(user_id)})
+        """Find user by ID (without the password hash), through the user cache"""
+        cache = get_user_cache()
+        user_data = cache.get(user_id=user_id)
+        if user_data is None:
+            user_data = db.users.find_one({'_id': ObjectId(user_id)}, User.PUBLIC_PROJECTION)
+            cache.put(user_data)
         
         if user_data:
-            return User(
-                username=user_data['username'],
-                password=user_data['password'],
-                name=user_data['name'],
-                email=user_data['email'],
-                role=user_data['role'],
-                _id=user_data['_id'],
-                created_at=user_data.get('created_at')
-            )
+            return User._loaded(user_data)
         return None
 
+    @staticmethod
+    def find_by_username(username):
+        """Find user by username (without the password hash), through the user cache"""
+        cache = get_user_cache()
+        user_data = cache.get(username=username)
+        if user_data is None:
+            user_data = db.users.find_one({'username': username}, User.PUBLIC_PROJECTION)
+            cache.put(user_data)
+
+        if user_data:
+            return User._loaded(user_data)
+        return None
+
+    @staticmethod
+    def find_public(user_ids):
+        """
+        Public documents for many users, through the user cache; the misses
+        are read with one query. Unknown and malformed ids are left out.
+
+        Returns:
+            {user_id str: public user document}
+        """
+        cache = get_user_cache()
+        found, missing = {}, []
+        for user_id in user_ids:
+            user_data = cache.get(user_id=user_id)
+            if user_data is not None:
+                found[str(user_id)] = user_data
+                continue
+            try:
+                missing.append(ObjectId(user_id))
+            except (InvalidId, TypeError):
+                pass
+        if missing:
+            for user_data in db.users.find({'_id': {'$in': missing}}, User.PUBLIC_PROJECTION):
+                cache.put(user_data)
+                found[str(user_data['_id'])] = user_data
+        return found
+
 
 class Return:
+    __slots__ = (
+        '_id', 'user_id', 'order_id', 'reason', 'status', 'refund_status',
+        'created_at', 'updated_at', 'approved_at', 'rejected_at', 'refunded_at'
+    )
+    _defaults = {'refund_status': 'Not Initiated'}
+
+    # Named projections; every listing view includes created_at for paging
+    VIEWS = {
+        'full': _projection((
+            'user_id', 'order_id', 'reason', 'status', 'refund_status',
+            'created_at', 'updated_at', 'approved_at', 'rejected_at', 'refunded_at'
+        )),
+        'summary': _projection((
+            'user_id', 'order_id', 'status', 'refund_status', 'created_at', 'updated_at'
+        )),
+        'status': _projection(('order_id', 'status', 'refund_status', 'created_at')),
+    }
+
     def __init__(
         self,
         user_id,
@@ -87,20 +401,12 @@ class Return:
         self.refund_status = refund_status
         self.created_at = created_at or datetime.utcnow()
         self.updated_at = updated_at or datetime.utcnow()
+        self.approved_at = None
+        self.rejected_at = None
+        self.refunded_at = None
 
-    
-    def save(self):
-        """Save return request to database"""
-        # Check for duplicate order_id for this user
-        existing = db.returns.find_one({
-            'user_id': self.user_id,
-            'order_id': self.order_id,
-            'status': {'$in': ['Pending', 'Approved']}
-        })
-        
-        if existing:
-            raise ValueError(f"A return request for order {self.order_id} already exists")
-        
+    def document(self):
+        """The fields save() writes (everything but _id)"""
         return_data = {
             'user_id': self.user_id,
             'order_id': self.order_id,
@@ -110,101 +416,236 @@ class Return:
             'created_at': self.created_at,
             'updated_at': datetime.utcnow()
         }
+        if self.approved_at:
+            return_data['approved_at'] = self.approved_at
+        if self.rejected_at:
+            return_data['rejected_at'] = self.rejected_at
+        if self.refunded_at:
+            return_data['refunded_at'] = self.refunded_at
+        if self.status in OPEN_STATUSES:
+            return_data['open'] = True
+        return return_data
 
-        
+    def save(self):
+        """
+        Save return request to database
+
+        The one-open-return-per-order rule is enforced by the unique
+        user_order_open index, so a duplicate raises
+        pymongo.errors.DuplicateKeyError instead of being checked first.
+        """
+        return_data = self.document()
+        created = not self._id
         if self._id:
-            db.returns.update_one({'_id': ObjectId(self._id)}, {'$set': return_data})
+            update = {'$set': return_data}
+            if 'open' not in return_data:
+                update['$unset'] = {'open': ''}
+            db.returns.update_one({'_id': ObjectId(self._id)}, update)
         else:
             result = db.returns.insert_one(return_data)
             self._id = result.inserted_id
+        bump_return_versions([self.user_id])
+        if created:
+            # After the bump, so a refetch it triggers cannot get a stale 304
+            publish_return_event(RETURN_CREATED, {**return_data, '_id': self._id})
         
         return self
     
     def approve(self, admin_id):
         """Approve return request"""
-        from models.audit import log_action
-        
-        self.status = 'Approved'
-        self.updated_at = datetime.utcnow()
-        db.returns.update_one(
-            {'_id': ObjectId(self._id)},
-            {'$set': {'status': 'Approved', 'updated_at': self.updated_at}}
-        )
-        
-        # Log the action
-        log_action(
-            action='RETURN_APPROVED',
-            actor=admin_id,
-            details=f'Approved return request {self._id} for order {self.order_id}',
-            target_user=self.user_id,
-            return_id=str(self._id)
-        )
+        self._apply(Return.transition(self._id, 'approve', admin_id))
     
     def reject(self, admin_id):
         """Reject return request"""
+        self._apply(Return.transition(self._id, 'reject', admin_id))
+
+    def refund(self, admin_id):
+        """Mark the refund for an approved return as completed"""
+        self._apply(Return.transition(self._id, 'refund', admin_id))
+
+    def _apply(self, doc):
+        for name in Return.__slots__:
+            if name in doc:
+                setattr(self, name, doc[name])
+
+    @staticmethod
+    def transition(return_id, action, admin_id):
+        """
+        Atomically move a return through one transition from TRANSITIONS.
+
+        A single conditional find_one_and_update both checks the source
+        state and applies the change, so two admins acting on the same
+        return at once cannot both succeed. Only the failure path makes a
+        second read, to tell a missing return from a wrong state.
+
+        Returns:
+            The updated return document
+
+        Raises:
+            ReturnNotFound, InvalidTransition
+        """
         from models.audit import log_action
-        
-        self.status = 'Rejected'
-        self.updated_at = datetime.utcnow()
-        db.returns.update_one(
-            {'_id': ObjectId(self._id)},
-            {'$set': {'status': 'Rejected', 'updated_at': self.updated_at}}
+
+        transition = get_transition(action)
+        try:
+            oid = ObjectId(return_id)
+        except (InvalidId, TypeError):
+            raise ReturnNotFound(f"Return {return_id} not found")
+
+        now = datetime.utcnow()
+        changes, update = build_update(transition, now)
+        before = db.returns.find_one_and_update(
+            {'_id': oid, **transition['from']},
+            update,
+            projection={'reason': 0},
+            return_document=ReturnDocument.BEFORE
         )
-        
-        # Log the action
+
+        if before is None:
+            current = db.returns.find_one({'_id': oid}, {'status': 1, 'refund_status': 1})
+            raise transition_failure(action, return_id, current)
+
+        record_return_transition(*counter_change(transition, before))
+        bump_return_versions([before.get('user_id')])
         log_action(
-            action='RETURN_REJECTED',
+            action=transition['audit_action'],
             actor=admin_id,
-            details=f'Rejected return request {self._id} for order {self.order_id}',
-            target_user=self.user_id,
-            return_id=str(self._id)
+            details=transition['audit_details'],
+            target_user=before.get('user_id'),
+            return_id=str(oid)
         )
+        after = after_transition(transition, before, changes)
+        publish_return_event(transition['event'], after)
+        return after
     
     @staticmethod
-    def find_by_user(user_id):
-        """Find all returns for a user"""
-        returns = db.returns.find({'user_id': user_id}).sort('created_at', -1)
-        return [Return(
-            user_id=r['user_id'],
-            order_id=r['order_id'],
-            reason=r['reason'],
-            status=r['status'],
-            _id=r['_id'],
-            created_at=r.get('created_at'),
-            updated_at=r.get('updated_at')
-        ) for r in returns]
-    
+    def build_query(user_id=None, status=None, refund_status=None, created_from=None, created_to=None):
+        """Build a returns filter from optional criteria"""
+        query = {}
+        if user_id:
+            query['user_id'] = user_id
+        if status:
+            query['status'] = status
+        if refund_status:
+            query['refund_status'] = refund_status
+        created = date_range(created_from, created_to)
+        if created:
+            query['created_at'] = created
+        return query
+
     @staticmethod
-    def find_all():
-        """Find all return requests"""
-        returns = db.returns.find().sort('created_at', -1)
-        return [Return(
-            user_id=r['user_id'],
-            order_id=r['order_id'],
-            reason=r['reason'],
-            status=r['status'],
-            _id=r['_id'],
-            created_at=r.get('created_at'),
-            updated_at=r.get('updated_at')
-        ) for r in returns]
-    
+    def find_page(query, limit=None, cursor=None, view='full', raw=False):
+        """
+        Fetch one page of returns, newest first
+
+        Args:
+            query: returns filter (see build_query)
+            limit: Page size
+            cursor: Continuation token from a previous page
+            view: Projection name from Return.VIEWS
+            raw: Return serialized dicts instead of Return objects, skipping
+                 object construction entirely (list endpoints)
+
+        Returns:
+            (returns, next_cursor)
+        """
+        projection = Return.projection(view)
+        docs, next_cursor = paginate(
+            db.returns, query, 'created_at',
+            limit=limit, cursor=cursor, projection=projection
+        )
+
+        if raw:
+            return Return.serialize_page(docs, projection), next_cursor
+        return [hydrate(Return, r) for r in docs], next_cursor
+
+    @staticmethod
+    def projection(view):
+        """The projection for a named view, or ValueError"""
+        if view not in Return.VIEWS:
+            raise ValueError(f"Unknown view: {view}")
+        return Return.VIEWS[view]
+
+    @staticmethod
+    def serialize_page(docs, projection):
+        """Raw listing documents as JSON-safe dicts"""
+        if 'refund_status' in projection:
+            for r in docs:
+                r.setdefault('refund_status', 'Not Initiated')
+        return [serialize(r) for r in docs]
+
+    @staticmethod
+    def find_by_user(user_id, limit=None, cursor=None, view='full', raw=False, **filters):
+        """Find one page of returns for a user"""
+        query = Return.build_query(user_id=user_id, **filters)
+        return Return.find_page(query, limit=limit, cursor=cursor, view=view, raw=raw)
+
+    @staticmethod
+    def find_all(limit=None, cursor=None, view='full', raw=False, **filters):
+        """Find one page of return requests across all users"""
+        query = Return.build_query(**filters)
+        return Return.find_page(query, limit=limit, cursor=cursor, view=view, raw=raw)
+
     @staticmethod
     def find_by_id(return_id):
         """Find return by ID"""
-        return_data = db.returns.find_one({'_id': ObjectId(return_id)})
+        return_data = db.returns.find_one({'_id': ObjectId(return_id)}, Return.VIEWS['full'])
         
         if return_data:
-            return Return(
-                user_id=return_data['user_id'],
-                order_id=return_data['order_id'],
-                reason=return_data['reason'],
-                status=return_data['status'],
-                _id=return_data['_id'],
-                created_at=return_data.get('created_at'),
-                updated_at=return_data.get('updated_at')
-            )
+            return hydrate(Return, return_data)
         return None
     
+    @staticmethod
+    def bulk_transition(return_ids, action, admin_id):
+        """
+        Apply one transition to many returns with a single bulk_write.
+
+        Every update is conditional on the return still being in the
+        transition's source state, so concurrent changes are reported as
+        conflicts rather than overwritten.
+
+        Returns:
+            {return_id: result} where result is 'updated', 'invalid_id',
+            'not_found', 'invalid_transition' or 'conflict'
+        """
+        from models.audit import log_actions
+
+        transition = get_transition(action)
+        object_ids, results = parse_return_ids(return_ids)
+
+        current = {
+            doc['_id']: doc for doc in db.returns.find(
+                {'_id': {'$in': list(object_ids)}},
+                {'user_id': 1, 'order_id': 1, 'status': 1, 'refund_status': 1}
+            )
+        }
+
+        now = datetime.utcnow()
+        changes, update = build_update(transition, now)
+        candidates, operations = plan_bulk(transition, object_ids, current, update, results)
+
+        applied = set()
+        if operations:
+            outcome = db.returns.bulk_write(operations, ordered=False)
+            if outcome.modified_count == len(operations):
+                applied = set(candidates)
+            else:
+                # Someone else moved some of these first; find which updates landed
+                applied = {doc['_id'] for doc in db.returns.find(
+                    {'_id': {'$in': candidates}, 'updated_at': now, **transition['to']},
+                    {'_id': 1}
+                )}
+
+        audit_entries, counter_changes, user_ids = settle_bulk(
+            transition, object_ids, candidates, applied, current, admin_id, now, results)
+        log_actions(audit_entries)
+        record_return_transitions(counter_changes)
+        if user_ids:
+            bump_return_versions(user_ids)
+        publish_return_batch(
+            transition['event'], [after_transition(transition, current[oid], changes) for oid in applied])
+        return results
+
     @staticmethod
     def get_user_return_count(user_id, days=30):
         """Get count of returns submitted by user in last N days"""
@@ -218,13 +659,4 @@ class Return:
         return count
     
     def to_dict(self):
-        return {
-        '_id': str(self._id),
-        'user_id': self.user_id,
-        'order_id': self.order_id,
-        'reason': self.reason,
-        'status': self.status,
-        'refund_status': self.refund_status,
-        'created_at': self.created_at.isoformat(),
-        'updated_at': self.updated_at.isoformat()
-    }
+        return serialize({name: getattr(self, name) for name in Return.__slots__})
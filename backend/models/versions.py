@@ -0,0 +1,39 @@
+"""
+Change versions for the return listings.
+
+`return_versions` holds one counter per user plus a global one:
+
+    {'_id': 'all', 'v': 42}
+    {'_id': '<user_id>', 'v': 7}
+
+Every write that changes what a listing shows (a new return, a
+transition) bumps the owner's counter and the global one. The listing
+endpoints derive their ETags from these, so a conditional GET costs one
+_id lookup here instead of a query on `returns`.
+"""
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+from db import db
+
+GLOBAL_SCOPE = 'all'
+
+
+def version_bumps(user_ids):
+    """bulk_write operations bumping the global version and each user's"""
+    scopes = {GLOBAL_SCOPE, *(str(user_id) for user_id in user_ids if user_id)}
+    return [UpdateOne({'_id': scope}, {'$inc': {'v': 1}}, upsert=True) for scope in sorted(scopes)]
+
+
+def bump_return_versions(user_ids):
+    """Bump the global version and each listed user's version"""
+    try:
+        db.return_versions.bulk_write(version_bumps(user_ids), ordered=False)
+    except PyMongoError as e:
+        # The next write bumps again; until then pollers may see a 304
+        print(f"✗ Return version bump failed: {str(e)}")
+
+
+def return_version(scope=GLOBAL_SCOPE):
+    """Current version for a user id (or the global scope); 0 if never bumped"""
+    doc = db.return_versions.find_one({'_id': scope})
+    return doc['v'] if doc else 0
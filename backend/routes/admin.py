@@ -1,10 +1,20 @@
 from flask import Blueprint, request, jsonify, session
-from db import db
+from bson.errors import InvalidId
 from models.audit import (
+    get_audit_logs,
     get_system_stats,
     get_suspicious_users,
-    get_user_activity_summary
+    get_user_activity_summary,
+    log_action
 )
+from models.audit_writer import get_audit_writer
+from models.dashboard import get_dashboard, get_dashboard_cache
+from models.events import get_event_bus
+from models.search import SEARCHES, SearchTimeout
+from models.session import get_session_store
+from models.user import get_user_cache
+from utils.auth import get_password_pool
+from utils.validation import audit_log_options, dashboard_options, search_options, suspicious_options
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -23,42 +33,69 @@ def get_audit():
         return auth_error
 
     try:
-        limit = int(request.args.get('limit', 50))
-        skip = int(request.args.get('skip', 0))
-        order = request.args.get('order', 'desc')  # asc | desc
-
-        sort_order = -1 if order == 'desc' else 1
-
-        logs = (
-            db.audit_logs
-            .find({})
-            .sort('timestamp', sort_order)
-            .skip(skip)
-            .limit(limit)
-        )
-
-        result = []
-        for log in logs:
-            result.append({
-                '_id': str(log['_id']),
-                'action': log['action'],
-                'actor': log['actor'],
-                'details': log['details'],
-                'timestamp': log['timestamp'].isoformat()
-            })
-
-        return jsonify(result), 200
+        logs, next_cursor = get_audit_logs(**audit_log_options(request.args))
 
+        response = jsonify(logs)
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response, 200
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+@admin_bp.route('/admin/dashboard', methods=['GET'])
+def dashboard():
+    auth_error = require_admin()
+    if auth_error:
+        return auth_error
+
+    try:
+        data = get_dashboard(**dashboard_options(request.args))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    response = jsonify(data)
+    if data['next_cursor']:
+        response.headers['X-Next-Cursor'] = data['next_cursor']
+    return response, 200
+
+
+@admin_bp.route('/admin/search', methods=['GET'])
+def search():
+    auth_error = require_admin()
+    if auth_error:
+        return auth_error
+
+    try:
+        scope, options = search_options(request.args)
+        results, next_cursor = SEARCHES[scope](**options)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except SearchTimeout as e:
+        return jsonify({'error': str(e)}), 503
+
+    response = jsonify(results)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response, 200
+
+
 @admin_bp.route('/admin/stats', methods=['GET'])
 def get_stats():
     auth_error = require_admin()
     if auth_error:
         return auth_error
-    return jsonify(get_system_stats()), 200
+    stats = get_system_stats()
+    stats['audit_pipeline'] = get_audit_writer().stats()
+    stats['password_pool'] = get_password_pool().stats()
+    stats['session_cache'] = get_session_store().stats()
+    stats['user_cache'] = get_user_cache().stats()
+    stats['dashboard_cache'] = get_dashboard_cache().stats()
+    stats['event_bus'] = get_event_bus().stats()
+    return jsonify(stats), 200
 
 
 @admin_bp.route('/admin/suspicious-users', methods=['GET'])
@@ -66,8 +103,29 @@ def get_suspicious():
     auth_error = require_admin()
     if auth_error:
         return auth_error
-    threshold = int(request.args.get('threshold', 5))
-    return jsonify(get_suspicious_users(threshold)), 200
+    threshold, limit = suspicious_options(request.args)
+    return jsonify(get_suspicious_users(threshold, limit)), 200
+
+
+@admin_bp.route('/admin/users/<user_id>/revoke-sessions', methods=['POST'])
+def revoke_sessions(user_id):
+    auth_error = require_admin()
+    if auth_error:
+        return auth_error
+
+    try:
+        if not get_session_store().revoke_user(user_id):
+            return jsonify({'error': 'User not found'}), 404
+    except InvalidId:
+        return jsonify({'error': 'Invalid user id'}), 400
+
+    log_action(
+        action='SESSIONS_REVOKED',
+        actor=session['user_id'],
+        details=f'Revoked all sessions for user {user_id}',
+        target_user=user_id
+    )
+    return jsonify({'message': 'Sessions revoked'}), 200
 
 
 @admin_bp.route('/admin/user-activity/<user_id>', methods=['GET'])
@@ -1,6 +1,8 @@
 from flask import Blueprint, request, jsonify, session
 from models.user import User
+from utils.auth import PasswordPoolBusy, PasswordPoolTimeout
 from models.audit import log_action
+from models.counters import record_login
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -16,7 +18,11 @@ def login():
         
         print(f"Login attempt for username: {username}")
         
-        user = User.authenticate(username, data['password'])
+        try:
+            user = User.authenticate(username, data['password'])
+        except (PasswordPoolBusy, PasswordPoolTimeout) as e:
+            print(f"Login deferred: {str(e)}")
+            return jsonify({'error': str(e)}), 503, {'Retry-After': '1'}
         
         if user:
             # Make session permanent
@@ -31,9 +37,9 @@ def login():
                 actor=str(user._id),
                 details=f'User {username} logged in successfully'
             )
+            record_login()
             
             print(f"Login successful!")
-            print(f"Session data: {dict(session)}")
             
             return jsonify({
                 'user': {
@@ -91,15 +97,15 @@ def check_session():
     if request.method == 'OPTIONS':
         return '', 204
         
-    print(f"=== CHECK SESSION ===")
-    print(f"Session data: {dict(session)}")
-    
     if 'user_id' in session:
+        # Read through the user cache so a renamed user sees the new name
+        user = User.find_by_id(session['user_id'])
         return jsonify({
             'logged_in': True,
             'user': {
                 'user_id': session['user_id'],
-                'username': session.get('username'),
+                'username': user.username if user else session.get('username'),
+                'name': user.name if user else None,
                 'role': session.get('role')
             }
         }), 200
@@ -0,0 +1,100 @@
+import json
+import time
+from pymongo.errors import PyMongoError
+from flask import Blueprint, Response, current_app, request, jsonify, session, stream_with_context
+from models.events import get_event_bus, visible
+from models.session import get_session_store
+
+events_bp = Blueprint('events', __name__)
+
+# Browsers wait this long before reconnecting a dropped stream
+RETRY_MS = 3000
+
+
+def _frame(event_id, event_type, data):
+    lines = []
+    if event_id:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event_type}')
+    lines.append(f'data: {json.dumps(data)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+def _stream(bus, user_id, role, last_event_id, heartbeat, max_seconds, still_valid):
+    """
+    Yield SSE frames until max_seconds have passed.
+
+    Starts after last_event_id when it is still buffered; otherwise sends
+    `reset` so the client refetches instead of missing changes. The
+    session is re-checked with still_valid() every heartbeat, and the
+    stream ends as soon as it was logged out or revoked; the browser's
+    reconnect then gets a 401.
+    """
+    after, reset = bus.position(last_event_id)
+    yield f'retry: {RETRY_MS}\n\n'
+    if reset:
+        yield _frame(None, 'reset', {})
+
+    deadline = time.monotonic() + max_seconds
+    checked_at = time.monotonic()
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        if time.monotonic() - checked_at >= heartbeat:
+            try:
+                valid = still_valid()
+            except PyMongoError:
+                valid = False  # the browser reconnects and is checked again
+            if not valid:
+                return
+            checked_at = time.monotonic()
+        events, after, reset = bus.wait(after, min(heartbeat, remaining))
+        if reset:
+            yield _frame(None, 'reset', {})
+        sent = False
+        for event in events:
+            if visible(event, user_id, role):
+                yield _frame(event.id, event.type, event.data)
+                sent = True
+        if not sent:
+            yield ': keep-alive\n\n'
+
+
+@events_bp.route('/events', methods=['GET'])
+def stream_events():
+    """
+    Server-sent events for returns the caller can see (all of them plus
+    audit entries for admins). Resumes after the Last-Event-ID header, or
+    the `last_event_id` query parameter for clients that cannot set it.
+
+    Each stream holds a worker thread, so at most EVENTS_MAX_STREAMS are
+    open per process; past that the request gets 503 and Retry-After.
+    """
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    bus = get_event_bus()
+    if not bus.open_stream(current_app.config['EVENTS_MAX_STREAMS']):
+        retry_after = str(int(current_app.config['EVENTS_HEARTBEAT_SECONDS']))
+        return jsonify({'error': 'Too many open event streams'}), 503, {'Retry-After': retry_after}
+
+    user_id = session['user_id']
+    sid, user_version = session.sid, session.user_version
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    frames = _stream(
+        bus,
+        user_id,
+        session.get('role'),
+        last_event_id,
+        current_app.config['EVENTS_HEARTBEAT_SECONDS'],
+        current_app.config['EVENTS_MAX_STREAM_SECONDS'],
+        lambda: get_session_store().is_current(sid, user_id, user_version)
+    )
+    response = Response(
+        stream_with_context(frames),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+    response.call_on_close(bus.close_stream)
+    return response
@@ -0,0 +1,78 @@
+from flask import Blueprint, Response, request, jsonify, session, stream_with_context
+from db import db
+from models.user import Return
+from models.audit import build_audit_query, log_action
+from routes.admin import require_admin
+from utils.export import EXPORTS, FORMATS, cursor_after, export_chunks, select_fields, stream_documents
+from utils.pagination import parse_datetime
+
+export_bp = Blueprint('export', __name__)
+
+
+def _stream_export(name, query):
+    """Validate export options and stream `name` matching `query`"""
+    spec = EXPORTS[name]
+    collection = db[name]
+    fmt = request.args.get('format', 'csv')
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+    fields = select_fields(request.args.get('fields'), spec['fields'])
+    direction = 1 if request.args.get('order') == 'asc' else -1
+    compress = request.args.get('gzip') in ('1', 'true')
+
+    cursor = request.args.get('cursor')
+    if not cursor and request.args.get('after'):
+        cursor = cursor_after(collection, spec['sort_field'], request.args['after'], direction)
+
+    docs = stream_documents(collection, query, spec['sort_field'], fields, cursor, direction)
+
+    log_action(
+        action='DATA_EXPORTED',
+        actor=session['user_id'],
+        details=f'Exported {name} as {fmt} with filter {query}'
+    )
+
+    filename = f"{name}.{fmt}" + ('.gz' if compress else '')
+    return Response(
+        stream_with_context(export_chunks(docs, fields, fmt, compress)),
+        mimetype='application/gzip' if compress else FORMATS[fmt],
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
+
+
+@export_bp.route('/admin/export/returns', methods=['GET'])
+def export_returns():
+    auth_error = require_admin()
+    if auth_error:
+        return auth_error
+
+    try:
+        query = Return.build_query(
+            user_id=request.args.get('user_id'),
+            status=request.args.get('status'),
+            refund_status=request.args.get('refund_status'),
+            created_from=parse_datetime(request.args.get('from')),
+            created_to=parse_datetime(request.args.get('to'))
+        )
+        return _stream_export('returns', query)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+
+@export_bp.route('/admin/export/audit-logs', methods=['GET'])
+def export_audit_logs():
+    auth_error = require_admin()
+    if auth_error:
+        return auth_error
+
+    try:
+        query = build_audit_query(
+            action_filter=request.args.get('action'),
+            actor_filter=request.args.get('actor'),
+            start=parse_datetime(request.args.get('from')),
+            end=parse_datetime(request.args.get('to'))
+        )
+        return _stream_export('audit_logs', query)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
@@ -0,0 +1,45 @@
+from flask import Blueprint, request, jsonify, session
+from models.audit import log_action
+from models.imports import ImportReport, import_returns
+from routes.admin import require_admin
+from utils.importer import parse_feed
+
+import_bp = Blueprint('import', __name__)
+
+
+@import_bp.route('/admin/import/returns', methods=['POST'])
+def import_returns_feed():
+    """
+    Import a CSV / NDJSON feed of returns (columns user_id, order_id, reason).
+
+    The feed is either the raw request body or a multipart `file` field.
+    Query params: format=csv|ndjson (default csv), gzip=1 for a gzipped
+    feed (also implied by Content-Encoding: gzip).
+    """
+    auth_error = require_admin()
+    if auth_error:
+        return auth_error
+
+    fmt = request.args.get('format', 'csv')
+    compressed = (
+        request.args.get('gzip') in ('1', 'true')
+        or request.headers.get('Content-Encoding') == 'gzip'
+    )
+    upload = request.files.get('file') if request.mimetype == 'multipart/form-data' else None
+    stream = upload.stream if upload else request.stream
+
+    report = ImportReport()
+    try:
+        import_returns(parse_feed(stream, fmt, compressed), session['user_id'], report)
+    except (ValueError, OSError, EOFError) as e:
+        report.finish()
+        return jsonify({'error': f'Import stopped: {e}', **report.to_dict()}), 400
+
+    summary = report.to_dict()
+    log_action(
+        action='RETURNS_IMPORTED',
+        actor=session['user_id'],
+        details=(f"Imported {summary['inserted']} of {summary['rows']} returns from {fmt} feed "
+                 f"({summary['duplicates']} duplicates, {summary['invalid'] + summary['failed']} errors)")
+    )
+    return jsonify(summary), 200
@@ -1,7 +1,12 @@
-from flask import Blueprint, request, jsonify, session
+from flask import Blueprint, current_app, request, jsonify, session
 from models.user import Return
 from models.audit import log_action
+from models.counters import record_return_created
+from models.transitions import TRANSITIONS, InvalidTransition, ReturnNotFound
+from models.versions import GLOBAL_SCOPE, return_version
+from utils.validation import bulk_request, list_options, listing_etag, return_submission
 from datetime import datetime
+from pymongo.errors import DuplicateKeyError
 import traceback
 
 returns_bp = Blueprint('returns', __name__)
@@ -14,24 +19,33 @@ def submit_return():
         if 'user_id' not in session:
             return jsonify({'error': 'Unauthorized'}), 401
 
-        data = request.get_json()
-        if not data or 'order_id' not in data or 'reason' not in data:
-            return jsonify({'error': 'order_id and reason required'}), 400
+        try:
+            order_id, reason = return_submission(request.get_json())
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
 
         return_request = Return(
             user_id=session['user_id'],
-            order_id=data['order_id'],
-            reason=data['reason'],
+            order_id=order_id,
+            reason=reason,
             status='Pending',
             refund_status='Not Initiated',
             created_at=datetime.utcnow()
         )
-        return_request.save()
+        try:
+            return_request.save()
+        except DuplicateKeyError:
+            return jsonify({'error': f"A return request for order {order_id} already exists"}), 409
+        record_return_created(
+            return_request.status,
+            return_request.refund_status,
+            return_request.created_at
+        )
 
         log_action(
             action="RETURN_CREATED",
             actor=session['user_id'],
-            details=f"Return created for order {data['order_id']}",
+            details=f"Return created for order {order_id}",
             return_id=str(return_request._id)
         )
 
@@ -42,6 +56,32 @@ def submit_return():
         return jsonify({'error': str(e)}), 500
 
 
+# ================= LISTING HELPERS =================
+
+def _listing_etag(scope):
+    # The version is read before the page itself, so a write racing the
+    # read can only make the tag older than the body, never newer.
+    return listing_etag(scope, return_version(scope), request.query_string)
+
+
+def _not_modified(etag):
+    response = current_app.response_class(status=304)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def _page_response(returns, next_cursor, etag=None):
+    """Send a page of raw return dicts; the continuation token travels in X-Next-Cursor"""
+    response = jsonify(returns)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    if etag:
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+    return response, 200
+
+
 # ================= USER RETURNS =================
 
 @returns_bp.route('/returns/my', methods=['GET'])
@@ -49,8 +89,16 @@ def get_my_returns():
     if 'user_id' not in session:
         return jsonify({'error': 'Unauthorized'}), 401
 
-    returns = Return.find_by_user(session['user_id'])
-    return jsonify([r.to_dict() for r in returns]), 200
+    etag = _listing_etag(session['user_id'])
+    if request.if_none_match.contains(etag):
+        return _not_modified(etag)
+
+    try:
+        returns, next_cursor = Return.find_by_user(session['user_id'], **list_options(request.args))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return _page_response(returns, next_cursor, etag)
 
 
 # ================= ADMIN RETURNS =================
@@ -60,90 +108,89 @@ def get_all_returns():
     if 'user_id' not in session or session.get('role') != 'admin':
         return jsonify({'error': 'Admin only'}), 403
 
-    returns = Return.find_all()
-    return jsonify([r.to_dict() for r in returns]), 200
-
+    etag = _listing_etag(GLOBAL_SCOPE)
+    if request.if_none_match.contains(etag):
+        return _not_modified(etag)
 
-# ================= APPROVE RETURN =================
-
-@returns_bp.route('/returns/<return_id>/approve', methods=['PUT'])
-def approve_return(return_id):
     try:
-        if 'user_id' not in session or session.get('role') != 'admin':
-            return jsonify({'error': 'Admin only'}), 403
+        returns, next_cursor = Return.find_all(
+            user_id=request.args.get('user_id'),
+            **list_options(request.args)
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
-        r = Return.find_by_id(return_id)
-        if not r:
-            return jsonify({'error': 'Return not found'}), 404
+    return _page_response(returns, next_cursor, etag)
 
-        if r.status != "Pending":
-            return jsonify({'error': 'Already processed'}), 400
 
-        # ✅ APPROVE + AUTO REFUND INITIATE
-        r.status = "Approved"
-        r.refund_status = "Refund Initiated"
-        r.approved_at = datetime.utcnow()
-        r.save()
+# ================= TRANSITIONS =================
 
-        log_action(
-            action="RETURN_APPROVED",
-            actor=session['user_id'],
-            details="Return approved, refund initiated",
-            return_id=return_id
-        )
+def _transition(return_id, action):
+    """Apply one transition from models.transitions on behalf of the session admin"""
+    try:
+        if 'user_id' not in session or session.get('role') != 'admin':
+            return jsonify({'error': 'Admin only'}), 403
 
-        return jsonify({'message': 'Approved & refund initiated'}), 200
+        Return.transition(return_id, action, session['user_id'])
+        return jsonify({'message': TRANSITIONS[action]['message']}), 200
 
+    except ReturnNotFound:
+        return jsonify({'error': 'Return not found'}), 404
+    except InvalidTransition as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         traceback.print_exc()
         return jsonify({'error': str(e)}), 500
 
 
-# ================= REJECT RETURN =================
-
-@returns_bp.route('/returns/<return_id>/reject', methods=['PUT'])
-def reject_return(return_id):
-    if 'user_id' not in session or session.get('role') != 'admin':
-        return jsonify({'error': 'Admin only'}), 403
+# ================= APPROVE RETURN =================
 
-    r = Return.find_by_id(return_id)
-    if not r:
-        return jsonify({'error': 'Return not found'}), 404
+@returns_bp.route('/returns/<return_id>/approve', methods=['PUT'])
+def approve_return(return_id):
+    # ✅ APPROVE + AUTO REFUND INITIATE
+    return _transition(return_id, 'approve')
 
-    r.status = "Rejected"
-    r.refund_status = "Rejected"
-    r.save()
 
-    log_action(
-        action="RETURN_REJECTED",
-        actor=session['user_id'],
-        details="Return rejected",
-        return_id=return_id
-    )
+# ================= REJECT RETURN =================
 
-    return jsonify({'message': 'Rejected'}), 200
+@returns_bp.route('/returns/<return_id>/reject', methods=['PUT'])
+def reject_return(return_id):
+    return _transition(return_id, 'reject')
 
 
 # ================= COMPLETE REFUND =================
 
 @returns_bp.route('/returns/<return_id>/refund', methods=['PUT'])
 def complete_refund(return_id):
+    return _transition(return_id, 'refund')
+
+
+# ================= BULK TRANSITION =================
+
+@returns_bp.route('/returns/bulk', methods=['POST'])
+def bulk_transition():
     if 'user_id' not in session or session.get('role') != 'admin':
         return jsonify({'error': 'Admin only'}), 403
 
-    r = Return.find_by_id(return_id)
-    if not r:
-        return jsonify({'error': 'Return not found'}), 404
+    try:
+        action, ids = bulk_request(request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
-    r.refund_status = "Refund Successful"
-    r.refunded_at = datetime.utcnow()
-    r.save()
+    try:
+        results = Return.bulk_transition(ids, action, session['user_id'])
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
 
-    log_action(
-        action="REFUND_COMPLETED",
-        actor=session['user_id'],
-        details="Refund completed",
-        return_id=return_id
-    )
+    summary = {}
+    for result in results.values():
+        summary[result] = summary.get(result, 0) + 1
 
-    return jsonify({'message': 'Refund completed'}), 200
+    return jsonify({
+        'action': action,
+        'summary': summary,
+        'results': [{'id': return_id, 'result': result} for return_id, result in results.items()]
+    }), 200
@@ -1,10 +1,11 @@
 from db import db, init_db
+from models.counters import reconcile_counters
 from datetime import datetime
-import hashlib
+from utils.auth import hash_password
 
-def hash_password(password):
-    """Hash a password using SHA-256"""
-    return hashlib.sha256(password.encode()).hexdigest()
+def _with_password(user, password):
+    user['password'], user['password_kdf'] = hash_password(password)
+    return user
 
 def seed_users():
     """Seed database with test users"""
@@ -18,35 +19,35 @@ def seed_users():
     
     # Create test users
     users = [
-        {
+        _with_password({
             'username': 'user1',
-            'password': hash_password('user123'),
             'name': 'User One',
             'email': 'user1@example.com',
             'role': 'user',
             'created_at': datetime.utcnow()
-        },
-        {
+        }, 'user123'),
+        _with_password({
             'username': 'admin1',
-            'password': hash_password('admin123'),
             'name': 'Admin One',
             'email': 'admin1@example.com',
             'role': 'admin',
             'created_at': datetime.utcnow()
-        },
-        {
+        }, 'admin123'),
+        _with_password({
             'username': 'user2',
-            'password': hash_password('user123'),
             'name': 'User Two',
             'email': 'user2@example.com',
             'role': 'user',
             'created_at': datetime.utcnow()
-        }
+        }, 'user123')
     ]
     
     # Insert users
     result = db.users.insert_many(users)
     print(f"✓ Created {len(result.inserted_ids)} users")
+
+    # Users were replaced wholesale, so rebuild the counters
+    reconcile_counters()
     
     # Display created users
     print("\n=== Test Users ===")
@@ -0,0 +1,40 @@
+"""
+Shared fixtures. These tests run against a real mongod (MONGO_URL, default
+mongodb://localhost:27017/) in a scratch database that is dropped
+afterwards; they are skipped when no server answers.
+
+    docker run -d -p 27017:27017 mongo:7
+    python -m pytest -q
+"""
+import os
+
+# Audit entries are written inline so tests can read them back at once
+os.environ.setdefault('AUDIT_SYNC', '1')
+
+import pytest
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+from app import create_app
+from config import Config
+from db import db
+
+TEST_DB = 'return_refund_test'
+
+
+@pytest.fixture(scope='session')
+def app():
+    try:
+        MongoClient(Config.MONGO_URL, serverSelectionTimeoutMS=1000).admin.command('ping')
+    except PyMongoError:
+        pytest.skip(f"No mongod at {Config.MONGO_URL}")
+    app = create_app({'DB_NAME': TEST_DB, 'INIT_DB_ON_START': True, 'RISK_REFRESH_INTERVAL': 0})
+    yield app
+    db.client.drop_database(TEST_DB)
+
+
+@pytest.fixture
+def clean_db(app):
+    """Empty collections (indexes kept) before each test"""
+    for name in ('returns', 'audit_logs', 'counters'):
+        db[name].delete_many({})
+    return db
@@ -0,0 +1,43 @@
+"""One open return per (user, order), enforced by the user_order_open index"""
+import threading
+from pymongo.errors import DuplicateKeyError
+from models.user import Return
+
+THREADS = 16
+
+
+def test_concurrent_duplicate_submissions_store_one(clean_db):
+    saved = []
+    rejected = []
+    lock = threading.Lock()
+    start = threading.Barrier(THREADS)
+
+    def worker():
+        start.wait()
+        try:
+            Return(user_id='b' * 24, order_id='ORD-DUP', reason='duplicate submission test').save()
+        except DuplicateKeyError:
+            with lock:
+                rejected.append(1)
+            return
+        with lock:
+            saved.append(1)
+
+    threads = [threading.Thread(target=worker) for _ in range(THREADS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(saved) == 1
+    assert len(rejected) == THREADS - 1
+    assert clean_db.returns.count_documents({'user_id': 'b' * 24, 'order_id': 'ORD-DUP'}) == 1
+
+
+def test_rejected_return_can_be_resubmitted(clean_db):
+    first = Return(user_id='c' * 24, order_id='ORD-AGAIN', reason='first submission here').save()
+    Return.transition(str(first._id), 'reject', 'admin')
+
+    Return(user_id='c' * 24, order_id='ORD-AGAIN', reason='second submission here').save()
+
+    assert clean_db.returns.count_documents({'order_id': 'ORD-AGAIN'}) == 2
@@ -0,0 +1,69 @@
+"""Concurrency guarantees of Return.transition (see models.transitions)"""
+import threading
+from datetime import datetime
+import pytest
+from bson import ObjectId
+from models.transitions import TRANSITIONS, InvalidTransition
+from models.user import Return
+
+THREADS = 16
+
+
+def pending_return(db):
+    now = datetime.utcnow()
+    return str(db.returns.insert_one({
+        'user_id': 'a' * 24, 'order_id': 'ORD-RACE', 'reason': 'concurrency test',
+        'status': 'Pending', 'refund_status': 'Not Initiated', 'open': True,
+        'created_at': now, 'updated_at': now
+    }).inserted_id)
+
+
+def race(return_id, actions):
+    """Run Return.transition for each action at once; returns the actions that won"""
+    won = []
+    lock = threading.Lock()
+    start = threading.Barrier(len(actions))
+
+    def worker(n, action):
+        start.wait()
+        try:
+            Return.transition(return_id, action, f'admin-{n}')
+        except InvalidTransition:
+            return
+        with lock:
+            won.append(action)
+
+    threads = [threading.Thread(target=worker, args=(n, a)) for n, a in enumerate(actions)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return won
+
+
+@pytest.mark.parametrize('actions', [
+    ['approve'] * THREADS,
+    ['approve', 'reject'] * (THREADS // 2),
+])
+def test_exactly_one_concurrent_decision_succeeds(clean_db, actions):
+    return_id = pending_return(clean_db)
+
+    won = race(return_id, actions)
+
+    assert len(won) == 1
+    stored = clean_db.returns.find_one({'_id': ObjectId(return_id)})
+    assert stored['status'] == ('Approved' if won[0] == 'approve' else 'Rejected')
+    audit_actions = [TRANSITIONS[a]['audit_action'] for a in set(actions)]
+    assert clean_db.audit_logs.count_documents(
+        {'return_id': return_id, 'action': {'$in': audit_actions}}) == 1
+
+
+def test_refund_races_apply_once(clean_db):
+    return_id = pending_return(clean_db)
+    Return.transition(return_id, 'approve', 'admin')
+
+    won = race(return_id, ['refund'] * THREADS)
+
+    assert won == ['refund']
+    assert clean_db.audit_logs.count_documents(
+        {'return_id': return_id, 'action': TRANSITIONS['refund']['audit_action']}) == 1
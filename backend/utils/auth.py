@@ -1,9 +1,205 @@
+"""
+Password hashing.
+
+Each user document stores its hash in `password` and the algorithm,
+parameters and salt used to produce it in `password_kdf`. Documents from
+before `password_kdf` existed are unsalted SHA-256 and are upgraded to
+the current default the next time the user logs in.
+
+Memory-hard hashing is slow on purpose, so logins run it on a bounded
+process pool (see PasswordWorkerPool). Configured from the environment:
+
+    PASSWORD_HASHER          scrypt (default) | pbkdf2_sha256
+    PASSWORD_WORKERS         worker processes, 0 hashes inline (default: CPU count)
+    PASSWORD_MAX_PENDING     queued + running jobs before logins get a 503
+    PASSWORD_VERIFY_TIMEOUT  seconds to wait for a worker (default 2.0)
+"""
+import asyncio
 import hashlib
+import hmac
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+
+LEGACY_KDF = {'algorithm': 'sha256'}
+
+DEFAULT_PARAMS = {
+    'scrypt': {'n': 2 ** 14, 'r': 8, 'p': 1},
+    'pbkdf2_sha256': {'iterations': 600000},
+    'sha256': {},
+}
+
+DEFAULT_ALGORITHM = os.environ.get('PASSWORD_HASHER', 'scrypt')
+
+SCRYPT_MAXMEM = 64 * 1024 * 1024
+
+
+class PasswordPoolBusy(Exception):
+    """Too many password checks are already queued"""
+
+
+class PasswordPoolTimeout(Exception):
+    """A password check did not finish in time"""
 
-def hash_password(password):
-    """Hash a password using SHA-256"""
-    return hashlib.sha256(password.encode()).hexdigest()
 
-def verify_password(password, hashed_password):
+def _derive(password, kdf):
+    algorithm = kdf['algorithm']
+    data = password.encode()
+
+    if algorithm == 'sha256':
+        return hashlib.sha256(data).hexdigest()
+
+    salt = bytes.fromhex(kdf['salt'])
+    if algorithm == 'scrypt':
+        return hashlib.scrypt(
+            data, salt=salt, n=kdf['n'], r=kdf['r'], p=kdf['p'],
+            maxmem=SCRYPT_MAXMEM, dklen=32
+        ).hex()
+    if algorithm == 'pbkdf2_sha256':
+        return hashlib.pbkdf2_hmac('sha256', data, salt, kdf['iterations']).hex()
+
+    raise ValueError(f"Unknown password algorithm: {algorithm}")
+
+
+def hash_password(password, algorithm=None):
+    """
+    Hash a password with the configured KDF
+
+    Returns:
+        (hashed_password, kdf) where kdf is stored as users.password_kdf
+    """
+    algorithm = algorithm or DEFAULT_ALGORITHM
+    kdf = {'algorithm': algorithm, **DEFAULT_PARAMS[algorithm]}
+    if algorithm != 'sha256':
+        kdf['salt'] = os.urandom(16).hex()
+    return _derive(password, kdf), kdf
+
+
+def verify_password(password, hashed_password, kdf=None):
     """Verify a password against its hash"""
-    return hash_password(password) == hashed_password
\ No newline at end of file
+    return hmac.compare_digest(_derive(password, kdf or LEGACY_KDF), hashed_password)
+
+
+def needs_rehash(kdf):
+    """True if a hash was made with anything other than the current default"""
+    kdf = kdf or LEGACY_KDF
+    if kdf['algorithm'] != DEFAULT_ALGORITHM:
+        return True
+    return any(kdf.get(k) != v for k, v in DEFAULT_PARAMS[DEFAULT_ALGORITHM].items())
+
+
+class PasswordWorkerPool:
+    """
+    Runs hashing on a process pool so request threads only wait, they
+    never burn CPU. At most `max_pending` jobs are admitted; beyond that
+    callers get PasswordPoolBusy immediately instead of queueing behind a
+    login storm.
+    """
+
+    def __init__(self, workers, max_pending, timeout):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.rejected = 0
+        self.timed_out = 0
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+
+    def _get_executor(self):
+        # Never reuse a pool inherited across fork
+        if self._executor is None or self._pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._pid != os.getpid():
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                    self._pid = os.getpid()
+        return self._executor
+
+    def _release(self, _future=None):
+        with self._lock:
+            self._pending -= 1
+        self._slots.release()
+
+    def _submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            raise PasswordPoolBusy("Too many concurrent logins, try again shortly")
+        with self._lock:
+            self._pending += 1
+
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._release()
+            raise
+        # The slot is freed when the job really finishes, even if we stop waiting
+        future.add_done_callback(self._release)
+        return future
+
+    def _timed_out(self, future):
+        future.cancel()
+        self.timed_out += 1
+        return PasswordPoolTimeout("Password check timed out")
+
+    def _run(self, fn, *args):
+        if self.workers <= 0:
+            return fn(*args)
+        future = self._submit(fn, *args)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            raise self._timed_out(future)
+
+    async def _run_async(self, fn, *args):
+        # Same admission and timeout rules, awaited instead of blocking a thread
+        if self.workers <= 0:
+            return fn(*args)
+        future = self._submit(fn, *args)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            raise self._timed_out(future)
+
+    def verify(self, password, hashed_password, kdf=None):
+        return self._run(verify_password, password, hashed_password, kdf)
+
+    def hash(self, password, algorithm=None):
+        return self._run(hash_password, password, algorithm)
+
+    async def verify_async(self, password, hashed_password, kdf=None):
+        return await self._run_async(verify_password, password, hashed_password, kdf)
+
+    async def hash_async(self, password, algorithm=None):
+        return await self._run_async(hash_password, password, algorithm)
+
+    def stats(self):
+        return {
+            'workers': self.workers,
+            'pending': self._pending,
+            'max_pending': self.max_pending,
+            'rejected': self.rejected,
+            'timed_out': self.timed_out
+        }
+
+    def shutdown(self):
+        if self._executor is not None and self._pid == os.getpid():
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+
+
+_pool = None
+
+
+def get_password_pool():
+    """Return the process-wide password pool, building it from the environment on first use"""
+    global _pool
+    if _pool is None:
+        workers = int(os.environ.get('PASSWORD_WORKERS', os.cpu_count() or 1))
+        _pool = PasswordWorkerPool(
+            workers=workers,
+            max_pending=int(os.environ.get('PASSWORD_MAX_PENDING', max(1, workers) * 4)),
+            timeout=float(os.environ.get('PASSWORD_VERIFY_TIMEOUT', 2.0))
+        )
+    return _pool
@@ -0,0 +1,175 @@
+"""
+Constant-memory export of returns and audit logs.
+
+Documents are read from a single Mongo cursor in index order and encoded
+row by row into CSV or NDJSON, buffered into ~64KB chunks and optionally
+gzipped, so nothing larger than one cursor batch is held at a time.
+
+Every row carries its `_id`, so an interrupted download can be resumed
+with `after=<last _id received>` whatever fields were asked for. CSV cells
+that a spreadsheet would read as a formula are prefixed with a quote.
+"""
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from bson import ObjectId
+from bson.errors import InvalidId
+from utils.pagination import encode_cursor, keyset_query
+
+EXPORTS = {
+    'returns': {
+        'sort_field': 'created_at',
+        'fields': ['_id', 'user_id', 'order_id', 'reason', 'status',
+                   'refund_status', 'created_at', 'updated_at'],
+    },
+    'audit_logs': {
+        'sort_field': 'timestamp',
+        'fields': ['_id', 'action', 'actor', 'details', 'timestamp',
+                   'target_user', 'return_id'],
+    },
+}
+
+FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+CHUNK_SIZE = 64 * 1024
+
+# Leading characters that make spreadsheets evaluate a cell as a formula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def select_fields(requested, allowed):
+    """
+    Parse a comma-separated field list, defaulting to every allowed field.
+    `_id` is always included (first) as the resume position.
+    """
+    if not requested:
+        return list(allowed)
+    fields = [f.strip() for f in requested.split(',') if f.strip()]
+    unknown = [f for f in fields if f not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    if '_id' not in fields:
+        fields.insert(0, '_id')
+    return fields
+
+
+def cursor_after(collection, sort_field, doc_id, direction=-1):
+    """Build a resume token positioned after the document with this _id"""
+    try:
+        doc = collection.find_one({'_id': ObjectId(doc_id)}, {sort_field: 1})
+    except InvalidId:
+        doc = None
+    if not doc:
+        raise ValueError(f"Unknown resume position: {doc_id}")
+    return encode_cursor(doc[sort_field], doc['_id'], direction)
+
+
+class ExportPosition:
+    """Remembers the last streamed document so an export can be resumed"""
+
+    def __init__(self, sort_field, direction):
+        self.sort_field = sort_field
+        self.direction = direction
+        self.last = None
+        self.rows = 0
+
+    def track(self, docs):
+        for doc in docs:
+            self.last = doc
+            self.rows += 1
+            yield doc
+
+    def token(self):
+        if self.last is None:
+            return None
+        return encode_cursor(self.last[self.sort_field], self.last['_id'], self.direction)
+
+
+def stream_documents(collection, query, sort_field, fields, cursor=None, direction=-1, batch_size=1000):
+    """Open a cursor over `query` in (sort_field, _id) order starting after `cursor`"""
+    projection = {f: 1 for f in fields}
+    projection[sort_field] = 1
+    query = keyset_query(query, sort_field, cursor, direction)
+    return (
+        collection
+        .find(query, projection)
+        .sort([(sort_field, direction), ('_id', direction)])
+        .batch_size(batch_size)
+    )
+
+
+def _plain(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, ObjectId):
+        return str(value)
+    return value
+
+
+def _csv_cell(value):
+    if value is None:
+        return ''
+    value = _plain(value)
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def ndjson_lines(docs, fields):
+    for doc in docs:
+        row = {f: _plain(doc.get(f)) for f in fields}
+        yield json.dumps(row, separators=(',', ':'), default=str) + '\n'
+
+
+def csv_lines(docs, fields):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def take():
+        line = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return line
+
+    writer.writerow(fields)
+    yield take()
+    for doc in docs:
+        writer.writerow([_csv_cell(doc.get(f)) for f in fields])
+        yield take()
+
+
+def chunked(lines, size=CHUNK_SIZE):
+    """Join encoded lines into chunks of roughly `size` bytes"""
+    parts = []
+    pending = 0
+    for line in lines:
+        data = line.encode('utf-8')
+        parts.append(data)
+        pending += len(data)
+        if pending >= size:
+            yield b''.join(parts)
+            parts = []
+            pending = 0
+    if parts:
+        yield b''.join(parts)
+
+
+def gzipped(chunks, level=6):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31 = gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_chunks(docs, fields, fmt, compress=False):
+    """Encode documents as byte chunks in the requested format"""
+    lines = csv_lines(docs, fields) if fmt == 'csv' else ndjson_lines(docs, fields)
+    chunks = chunked(lines)
+    return gzipped(chunks) if compress else chunks
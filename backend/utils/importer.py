@@ -0,0 +1,85 @@
+"""
+Constant-memory parsing of return feeds (the inverse of utils.export).
+
+A feed is a byte stream of CSV (with a header row) or NDJSON, optionally
+gzipped. It is decoded incrementally and yielded one row at a time, so
+only the current row is held in memory whatever the size of the file.
+"""
+import csv
+import gzip
+import io
+import json
+
+IMPORT_FIELDS = ['user_id', 'order_id', 'reason']
+
+# Longest accepted row; longer NDJSON lines / CSV fields are rejected
+MAX_ROW_BYTES = 64 * 1024
+
+
+class RowError(ValueError):
+    """A row that could not be parsed; the feed continues after it"""
+
+
+def _text(stream, compressed):
+    if compressed:
+        stream = gzip.GzipFile(fileobj=stream, mode='rb')
+    return io.TextIOWrapper(stream, encoding='utf-8', newline='')
+
+
+def csv_rows(text):
+    csv.field_size_limit(MAX_ROW_BYTES)
+    reader = csv.DictReader(text)
+    missing = [f for f in IMPORT_FIELDS if f not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f"CSV header is missing: {', '.join(missing)}")
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            yield RowError(str(e))
+            continue
+        yield {f: row.get(f) for f in IMPORT_FIELDS}
+
+
+def ndjson_rows(text):
+    while True:
+        line = text.readline(MAX_ROW_BYTES)
+        if not line:
+            return
+        if not line.endswith('\n') and len(line) >= MAX_ROW_BYTES:
+            while line and not line.endswith('\n'):
+                line = text.readline(MAX_ROW_BYTES)
+            yield RowError(f"Row longer than {MAX_ROW_BYTES} bytes")
+            continue
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield RowError(f"Invalid JSON: {e}")
+            continue
+        if not isinstance(row, dict):
+            yield RowError("Row is not a JSON object")
+            continue
+        yield {f: row.get(f) for f in IMPORT_FIELDS}
+
+
+def parse_feed(stream, fmt, compressed=False):
+    """
+    Iterate over the rows of a feed.
+
+    Args:
+        stream: Binary file-like object
+        fmt: 'csv' or 'ndjson'
+        compressed: True if the stream is gzipped
+
+    Returns:
+        Iterator of dicts with IMPORT_FIELDS, or RowError for rows that
+        could not be parsed
+    """
+    if fmt not in ('csv', 'ndjson'):
+        raise ValueError(f"Unsupported format: {fmt}")
+    text = _text(stream, compressed)
+    return csv_rows(text) if fmt == 'csv' else ndjson_rows(text)
@@ -0,0 +1,169 @@
+"""
+In-process request and MongoDB metrics, exposed in Prometheus text format.
+
+Recording is a dict lookup, a bisect and a few integer increments under
+one lock; all formatting happens only when /api/metrics is scraped.
+Metrics are per process: with several gunicorn workers, scrape each
+worker (or accept that one scrape sees one worker).
+"""
+import bisect
+import os
+import threading
+import time
+from flask import Response, g, request
+from pymongo import monitoring
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+
+def _labels(**labels):
+    parts = []
+    for key, value in labels.items():
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{key}="{value}"')
+    return '{' + ','.join(parts) + '}'
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.request_latency = {}   # (endpoint, method) -> Histogram
+        self.responses = {}         # (endpoint, method, status) -> count
+        self.in_flight = {}         # endpoint -> gauge
+        self.mongo_latency = {}     # (collection, command) -> Histogram
+        self.mongo_failures = {}    # (collection, command) -> count
+
+    def request_started(self, endpoint):
+        with self._lock:
+            self.in_flight[endpoint] = self.in_flight.get(endpoint, 0) + 1
+
+    def request_finished(self, endpoint, method, status, seconds):
+        with self._lock:
+            self.in_flight[endpoint] -= 1
+            key = (endpoint, method)
+            histogram = self.request_latency.get(key)
+            if histogram is None:
+                histogram = self.request_latency[key] = Histogram()
+            histogram.observe(seconds)
+            key = (endpoint, method, status)
+            self.responses[key] = self.responses.get(key, 0) + 1
+
+    def command_finished(self, collection, command, seconds, failed=False):
+        key = (collection, command)
+        with self._lock:
+            histogram = self.mongo_latency.get(key)
+            if histogram is None:
+                histogram = self.mongo_latency[key] = Histogram()
+            histogram.observe(seconds)
+            if failed:
+                self.mongo_failures[key] = self.mongo_failures.get(key, 0) + 1
+
+    def _histogram_lines(self, name, series, label_names):
+        lines = [f'# TYPE {name} histogram']
+        for key, h in sorted(series.items()):
+            labels = dict(zip(label_names, key))
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, h.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{_labels(**labels, le=bound)} {cumulative}')
+            lines.append(f'{name}_bucket{_labels(**labels, le="+Inf")} {h.count}')
+            lines.append(f'{name}_sum{_labels(**labels)} {h.sum:.6f}')
+            lines.append(f'{name}_count{_labels(**labels)} {h.count}')
+        return lines
+
+    def render(self):
+        with self._lock:
+            lines = self._histogram_lines(
+                'http_request_duration_seconds', self.request_latency, ('endpoint', 'method'))
+
+            lines.append('# TYPE http_responses_total counter')
+            for (endpoint, method, status), count in sorted(self.responses.items()):
+                lines.append(
+                    f'http_responses_total{_labels(endpoint=endpoint, method=method, status=status)} {count}')
+
+            lines.append('# TYPE http_requests_in_flight gauge')
+            for endpoint, count in sorted(self.in_flight.items()):
+                lines.append(f'http_requests_in_flight{_labels(endpoint=endpoint)} {count}')
+
+            lines += self._histogram_lines(
+                'mongodb_command_duration_seconds', self.mongo_latency, ('collection', 'command'))
+
+            lines.append('# TYPE mongodb_command_failures_total counter')
+            for (collection, command), count in sorted(self.mongo_failures.items()):
+                lines.append(
+                    f'mongodb_command_failures_total{_labels(collection=collection, command=command)} {count}')
+
+        lines.append('# TYPE process_id gauge')
+        lines.append(f'process_id {os.getpid()}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Times every command sent by the client, keyed by collection and command name"""
+
+    def __init__(self, metrics=registry):
+        self.metrics = metrics
+        self._pending = {}
+
+    def started(self, event):
+        target = event.command.get(event.command_name)
+        collection = target if isinstance(target, str) else '-'
+        self._pending[(event.request_id, event.connection_id)] = collection
+
+    def _finish(self, event, failed):
+        collection = self._pending.pop((event.request_id, event.connection_id), '-')
+        self.metrics.command_finished(collection, event.command_name, event.duration_micros / 1e6, failed)
+
+    def succeeded(self, event):
+        self._finish(event, False)
+
+    def failed(self, event):
+        self._finish(event, True)
+
+
+def init_metrics(app, metrics=registry):
+    """Install request timing hooks and the /api/metrics endpoint on `app`"""
+
+    @app.before_request
+    def _start_timer():
+        g.metrics_endpoint = request.endpoint or 'unmatched'
+        g.metrics_start = time.perf_counter()
+        g.metrics_status = 500
+        metrics.request_started(g.metrics_endpoint)
+
+    @app.after_request
+    def _record_status(response):
+        g.metrics_status = response.status_code
+        return response
+
+    @app.teardown_request
+    def _stop_timer(exc):
+        start = g.pop('metrics_start', None)
+        if start is None:
+            return
+        metrics.request_finished(
+            g.metrics_endpoint, request.method, g.metrics_status, time.perf_counter() - start)
+
+    @app.route('/api/metrics', methods=['GET'])
+    def metrics_endpoint():
+        token = app.config.get('METRICS_TOKEN')
+        if token and request.headers.get('Authorization') != f'Bearer {token}':
+            return Response('Unauthorized\n', status=401, mimetype='text/plain')
+        return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,140 @@
+import base64
+import json
+from datetime import datetime
+from bson import ObjectId
+from bson.errors import InvalidId
+from constants import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+
+class InvalidCursor(ValueError):
+    """Raised when a continuation token cannot be decoded"""
+
+
+def clamp_limit(limit):
+    """Clamp a requested page size to [1, MAX_PAGE_SIZE]"""
+    if limit is None:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(int(limit), MAX_PAGE_SIZE))
+
+
+def parse_datetime(value):
+    """Parse an ISO-8601 query parameter, returning None when absent"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).replace(tzinfo=None)
+    except ValueError:
+        raise ValueError(f"Invalid date: {value}")
+
+
+def date_range(start=None, end=None):
+    """Build a Mongo range condition for [start, end), or None if unbounded"""
+    condition = {}
+    if start:
+        condition['$gte'] = start
+    if end:
+        condition['$lt'] = end
+    return condition or None
+
+
+def encode_cursor(sort_value, doc_id, direction):
+    """Encode the position after (sort_value, doc_id) as an opaque token"""
+    payload = [direction, sort_value.isoformat(), str(doc_id)]
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token, direction):
+    """Decode a continuation token produced by encode_cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        token_direction, sort_value, doc_id = json.loads(raw)
+        if token_direction != direction:
+            raise InvalidCursor("Cursor was issued for a different sort order")
+        return datetime.fromisoformat(sort_value), ObjectId(doc_id)
+    except InvalidCursor:
+        raise
+    except (ValueError, TypeError, InvalidId):
+        raise InvalidCursor("Invalid cursor")
+
+
+def keyset_query(query, sort_field, cursor, direction=-1):
+    """Restrict `query` to documents strictly after the cursor position"""
+    if not cursor:
+        return query
+    sort_value, last_id = decode_cursor(cursor, direction)
+    op = '$lt' if direction < 0 else '$gt'
+    after = {
+        '$or': [
+            {sort_field: {op: sort_value}},
+            {sort_field: sort_value, '_id': {op: last_id}}
+        ]
+    }
+    return {'$and': [query, after]} if query else after
+
+
+def paginate(collection, query, sort_field, limit=None, cursor=None, direction=-1, projection=None):
+    """
+    Fetch one page of documents ordered by (sort_field, _id).
+
+    Keyset pagination: instead of skipping over earlier pages, the cursor
+    carries the last (sort_field, _id) pair seen and the next page starts
+    strictly after it, so every page costs the same regardless of depth.
+
+    Args:
+        collection: pymongo collection to read from
+        query: Filter document (not modified)
+        sort_field: Datetime field to order by, tie-broken on _id
+        limit: Requested page size, clamped to MAX_PAGE_SIZE
+        cursor: Continuation token from a previous page (optional)
+        direction: -1 for newest first, 1 for oldest first
+        projection: Fields to return (optional)
+
+    Returns:
+        (documents, next_cursor) where next_cursor is None on the last page
+    """
+    limit = clamp_limit(limit)
+    query = keyset_query(query, sort_field, cursor, direction)
+
+    docs = list(
+        collection
+        .find(query, projection)
+        .sort([(sort_field, direction), ('_id', direction)])
+        .limit(limit + 1)
+    )
+    return trim_page(docs, limit, sort_field, direction)
+
+
+def trim_page(docs, limit, sort_field, direction):
+    """Split up to limit + 1 fetched documents into (page, next_cursor)"""
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        last = docs[-1]
+        next_cursor = encode_cursor(last[sort_field], last['_id'], direction)
+
+    return docs, next_cursor
+
+
+def encode_value_cursor(kind, value, doc_id):
+    """
+    Token for the position after (value, doc_id) in a non-datetime ordering,
+    e.g. a relevance score or an order id. `kind` names the ordering so a
+    token cannot be replayed against another one.
+    """
+    raw = json.dumps([kind, value, str(doc_id)], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_value_cursor(token, kind):
+    """Decode a token produced by encode_value_cursor for the same `kind`"""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        token_kind, value, doc_id = json.loads(raw)
+        if token_kind != kind:
+            raise InvalidCursor("Cursor was issued for a different search")
+        return value, ObjectId(doc_id)
+    except InvalidCursor:
+        raise
+    except (ValueError, TypeError, InvalidId):
+        raise InvalidCursor("Invalid cursor")
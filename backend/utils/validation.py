@@ -0,0 +1,120 @@
+"""
+Request validation shared by the Flask routes and the async app (aio/),
+so both enforce the same rules and return the same messages.
+
+Each function takes already-parsed input (a JSON body or the query-string
+MultiDict) and either returns the cleaned values or raises ValueError with
+the message sent back as a 400.
+"""
+import hashlib
+from constants import BULK_MAX_IDS, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, SEARCH_MAX_QUERY
+from utils.pagination import parse_datetime
+from utils.validators import validate_return_request
+
+
+def return_submission(data):
+    """(order_id, reason) from a POST /returns body, checked like imported rows"""
+    error = validate_return_request(data if isinstance(data, dict) else None)
+    if error:
+        raise ValueError(error)
+    return data['order_id'], data['reason']
+
+
+def bulk_request(data):
+    """(action, ids) from a POST /returns/bulk body"""
+    data = data or {}
+    action = data.get('action')
+    ids = data.get('ids')
+    if not action or not isinstance(ids, list) or not ids or not all(isinstance(i, str) for i in ids):
+        raise ValueError('action and a non-empty list of string ids required')
+    if len(ids) > BULK_MAX_IDS:
+        raise ValueError(f'At most {BULK_MAX_IDS} ids per request')
+    return action, ids
+
+
+def list_options(args):
+    """Paging, listing filters and projection view for /returns/my and /returns/all"""
+    return {
+        'limit': int(args.get('limit', DEFAULT_PAGE_SIZE)),
+        'cursor': args.get('cursor'),
+        'status': args.get('status'),
+        'refund_status': args.get('refund_status'),
+        'created_from': parse_datetime(args.get('from')),
+        'created_to': parse_datetime(args.get('to')),
+        'view': args.get('view', 'full'),
+        'raw': True
+    }
+
+
+def dashboard_options(args):
+    """Paging and filters for /admin/dashboard"""
+    return {
+        'limit': int(args.get('limit', DEFAULT_PAGE_SIZE)),
+        'cursor': args.get('cursor'),
+        'user_id': args.get('user_id'),
+        'status': args.get('status'),
+        'refund_status': args.get('refund_status'),
+        'created_from': parse_datetime(args.get('from')),
+        'created_to': parse_datetime(args.get('to'))
+    }
+
+
+def audit_log_options(args):
+    """Keyword arguments for get_audit_logs from the /admin/audit-logs query string"""
+    return {
+        'limit': int(args.get('limit', DEFAULT_PAGE_SIZE)),
+        'cursor': args.get('cursor'),
+        'action_filter': args.get('action'),
+        'actor_filter': args.get('actor'),
+        'start': parse_datetime(args.get('from')),
+        'end': parse_datetime(args.get('to')),
+        'order': args.get('order', 'desc')  # asc | desc
+    }
+
+
+def search_options(args):
+    """(scope, keyword arguments for models.search.SEARCHES[scope]) from /admin/search"""
+    scope = args.get('scope', 'returns')
+    text = (args.get('q') or '').strip() or None
+    if text and len(text) > SEARCH_MAX_QUERY:
+        raise ValueError(f'q is limited to {SEARCH_MAX_QUERY} characters')
+    paging = {
+        'text': text,
+        'limit': int(args.get('limit', DEFAULT_PAGE_SIZE)),
+        'cursor': args.get('cursor'),
+    }
+    if scope == 'returns':
+        return scope, {
+            **paging,
+            'order_prefix': args.get('order_prefix') or None,
+            'user_id': args.get('user_id'),
+            'status': args.get('status'),
+            'refund_status': args.get('refund_status'),
+            'created_from': parse_datetime(args.get('from')),
+            'created_to': parse_datetime(args.get('to'))
+        }
+    if scope == 'audit_logs':
+        return scope, {
+            **paging,
+            'action_filter': args.get('action'),
+            'actor_filter': args.get('actor'),
+            'start': parse_datetime(args.get('from')),
+            'end': parse_datetime(args.get('to'))
+        }
+    raise ValueError(f'Unknown scope: {scope}. Expected returns or audit_logs')
+
+
+def suspicious_options(args):
+    """(threshold, limit) for /admin/suspicious-users"""
+    return int(args.get('threshold', 5)), min(int(args.get('limit', 100)), MAX_PAGE_SIZE)
+
+
+def listing_etag(scope, version, query_string):
+    """
+    ETag for a return listing at a change version (see models.versions).
+
+    The query string is folded in because filters, view and cursor all
+    change the body.
+    """
+    query = hashlib.sha1(query_string).hexdigest()[:16]
+    return f"{scope}-{version}-{query}"
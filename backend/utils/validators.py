@@ -8,7 +8,7 @@ def validate_return_request(data):
     if not data.get("reason"):
         return "Return reason is required"
 
-    if len(data.get("reason")) < 10:
+    if not isinstance(data.get("reason"), str) or len(data.get("reason")) < 10:
         return "Reason must be at least 10 characters"
 
     return None
@@ -0,0 +1,12 @@
+"""
+Production WSGI entry point, meant to be run by gunicorn with the
+settings in gunicorn.conf.py:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+The gunicorn master initializes collections and indexes once before
+forking (see on_starting there), so workers skip init_db().
+"""
+from app import create_app
+
+app = create_app({'INIT_DB_ON_START': False})
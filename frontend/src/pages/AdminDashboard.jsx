@@ -1,11 +1,12 @@
 import { useEffect, useState } from "react";
 import {
-  fetchAllReturns,
+  fetchDashboard,
   approveReturn,
   rejectReturn,
   completeRefund,
   logoutUser,
-  fetchAuditLogs
+  fetchAuditLogs,
+  subscribeRefetch
 } from "../services/api";
 
 import {
@@ -19,17 +20,30 @@ import {
 
 export default function AdminDashboard({ user, onLogout }) {
   const [returns, setReturns] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [counts, setCounts] = useState({ total: 0, by_status: {}, by_refund_status: {} });
   const [auditLogs, setAuditLogs] = useState([]);
   const [activeTab, setActiveTab] = useState("returns");
   const [message, setMessage] = useState("");
 
   const loadData = async () => {
-    setReturns(await fetchAllReturns());
+    const dashboard = await fetchDashboard();
+    setReturns(dashboard.returns || []);
+    setNextCursor(dashboard.next_cursor);
+    setCounts(dashboard);
     setAuditLogs(await fetchAuditLogs());
   };
 
+  const loadMore = async () => {
+    const dashboard = await fetchDashboard({ cursor: nextCursor });
+    setReturns((loaded) => [...loaded, ...(dashboard.returns || [])]);
+    setNextCursor(dashboard.next_cursor);
+  };
+
   useEffect(() => {
     loadData();
+    // Refetch when another admin or a user changes something
+    return subscribeRefetch(loadData);
   }, []);
 
   const statusBadge = (status) => {
@@ -80,6 +94,22 @@ export default function AdminDashboard({ user, onLogout }) {
           </div>
         )}
 
+        {/* COUNTS */}
+        <div className="grid grid-cols-2 md:grid-cols-5 gap-4 mb-6">
+          {[
+            ["Total", counts.total, "text-gray-800"],
+            ["Pending", counts.by_status?.Pending || 0, "text-yellow-700"],
+            ["Approved", counts.by_status?.Approved || 0, "text-green-700"],
+            ["Rejected", counts.by_status?.Rejected || 0, "text-red-700"],
+            ["Refunds Pending", counts.by_refund_status?.["Refund Initiated"] || 0, "text-blue-700"]
+          ].map(([label, value, color]) => (
+            <div key={label} className="bg-white border rounded-lg p-4 shadow-sm">
+              <p className="text-xs text-gray-500">{label}</p>
+              <p className={`text-2xl font-bold ${color}`}>{value}</p>
+            </div>
+          ))}
+        </div>
+
         {/* TABS */}
         <div className="flex gap-4 mb-6">
           <button
@@ -182,6 +212,14 @@ export default function AdminDashboard({ user, onLogout }) {
                 </div>
               ))
             )}
+            {nextCursor && (
+              <button
+                onClick={loadMore}
+                className="w-full py-2 text-indigo-600 hover:text-indigo-800 font-medium"
+              >
+                Load more
+              </button>
+            )}
           </div>
         )}
 
@@ -1,5 +1,5 @@
 import { useEffect, useState } from "react";
-import { fetchMyReturns, logoutUser } from "../services/api";
+import { fetchMyReturns, logoutUser, subscribeRefetch } from "../services/api";
 import ReturnForm from "../components/ReturnForm";
 import ReturnCard from "../components/ReturnCard";
 import {
@@ -12,6 +12,7 @@ import {
 
 export default function UserDashboard({ user, onLogout }) {
   const [returns, setReturns] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [activeTab, setActiveTab] = useState("requests");
   const [success, setSuccess] = useState("");
   const [error, setError] = useState("");
@@ -23,8 +24,19 @@ export default function UserDashboard({ user, onLogout }) {
 
   const loadReturns = async () => {
     try {
-      const data = await fetchMyReturns();
-      setReturns(data);
+      const page = await fetchMyReturns();
+      setReturns(page.returns);
+      setNextCursor(page.nextCursor);
+    } catch (err) {
+      setError("Failed to load returns");
+    }
+  };
+
+  const loadMore = async () => {
+    try {
+      const page = await fetchMyReturns(nextCursor);
+      setReturns((loaded) => [...loaded, ...page.returns]);
+      setNextCursor(page.nextCursor);
     } catch (err) {
       setError("Failed to load returns");
     }
@@ -32,6 +44,8 @@ export default function UserDashboard({ user, onLogout }) {
 
   useEffect(() => {
     loadReturns();
+    // Status changes made by admins show up without a reload
+    return subscribeRefetch(loadReturns);
   }, []);
 
   const handleLogout = async () => {
@@ -135,6 +149,14 @@ export default function UserDashboard({ user, onLogout }) {
                     {returns.map((r) => (
                       <ReturnCard key={r._id} data={r} />
                     ))}
+                    {nextCursor && (
+                      <button
+                        onClick={loadMore}
+                        className="w-full py-2 text-indigo-600 hover:text-indigo-800 font-medium"
+                      >
+                        Load more
+                      </button>
+                    )}
                   </div>
                 )}
               </div>
@@ -31,18 +31,25 @@ export async function submitReturn(data) {
   return json;
 }
 
-export async function fetchMyReturns() {
-  const res = await fetch(`${API_BASE}/returns/my`, {
+// Listings come one page at a time. Pass the previous page's nextCursor
+// to get the next one; it is null on the last page.
+async function fetchReturnsPage(path, cursor) {
+  const params = cursor ? `?cursor=${encodeURIComponent(cursor)}` : "";
+  const res = await fetch(`${API_BASE}${path}${params}`, {
     credentials: "include"
   });
-  return res.json();
+  return {
+    returns: await res.json(),
+    nextCursor: res.headers.get("X-Next-Cursor")
+  };
 }
 
-export async function fetchAllReturns() {
-  const res = await fetch(`${API_BASE}/returns/all`, {
-    credentials: "include"
-  });
-  return res.json();
+export function fetchMyReturns(cursor) {
+  return fetchReturnsPage("/returns/my", cursor);
+}
+
+export function fetchAllReturns(cursor) {
+  return fetchReturnsPage("/returns/all", cursor);
 }
 
 export async function approveReturn(id) {
@@ -76,3 +83,71 @@ export async function fetchAuditLogs(limit = 50, order = "desc") {
   );
   return res.json();
 }
+
+export async function fetchDashboard(filters = {}) {
+  const params = new URLSearchParams(filters);
+  const res = await fetch(`${API_BASE}/admin/dashboard?${params}`, {
+    credentials: "include"
+  });
+  return res.json();
+}
+
+const RETURN_EVENTS = [
+  "return.created",
+  "return.approved",
+  "return.rejected",
+  "return.refunded",
+  "return.batch"
+];
+
+// Browsers give up on a stream refused with 503 (the worker has too many
+// open); try again after this long.
+const EVENTS_RETRY_MS = 30000;
+
+// Calls onEvent(type, data) for return changes, audit entries (admins) and
+// "reset" (events were missed; refetch). Returns a function that closes it.
+export function subscribeEvents(onEvent) {
+  let source = null;
+  let retry = null;
+  const open = () => {
+    source = new EventSource(`${API_BASE}/events`, {
+      withCredentials: true
+    });
+    [...RETURN_EVENTS, "audit", "reset"].forEach((type) => {
+      source.addEventListener(type, (e) => onEvent(type, JSON.parse(e.data)));
+    });
+    source.onerror = () => {
+      if (source.readyState === EventSource.CLOSED) {
+        retry = setTimeout(() => {
+          // Changes made while disconnected are only seen by refetching
+          onEvent("reset", {});
+          open();
+        }, EVENTS_RETRY_MS);
+      }
+    };
+  };
+  open();
+  return () => {
+    clearTimeout(retry);
+    source.close();
+  };
+}
+
+// Calls refetch() once return events stop arriving for `wait` ms (at most
+// once per `wait` ms while they keep coming), so a bulk transition or an
+// import costs one refetch per tab instead of one per return. Audit events
+// are ignored. Returns a function that closes the stream.
+export function subscribeRefetch(refetch, wait = 500) {
+  let timer = null;
+  const close = subscribeEvents((type) => {
+    if (type === "audit" || timer) return;
+    timer = setTimeout(() => {
+      timer = null;
+      refetch();
+    }, wait);
+  });
+  return () => {
+    clearTimeout(timer);
+    close();
+  };
+}